@@ -1,13 +1,16 @@
-import socket
-import struct
+import os
+import sys
 import numpy as np
-import time
-from collections import deque
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QLabel, QTableWidget, QTableWidgetItem)
 from PyQt5.QtCore import QTimer
 from PyQt5.QtGui import QColor
 
+# 帧源、协议解析和读取线程统一使用本体感知系统显示程序中的实现，传输方式见config_utils.FRAME_TRANSPORT
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '本体感知系统显示程序'))
+import data_display_gui
+import frame_source
+
 # 必须与ESP32代码中的定义一致！
 ROWS = 6   # 数组行数
 COLS = 4   # 数组列数
@@ -56,9 +59,9 @@ class SimpleTactileDisplay(QMainWindow):
 
         self.layout.addWidget(self.table)
 
-        # 数据缓冲区
-        self.buffer = bytearray()
-        self.fps_tracker = deque(maxlen=30)
+        # 数据接收
+        self.receiver = data_display_gui.HighSpeedReceiver()
+        self.reader_thread = None
         self.current_data = np.zeros((ROWS, COLS))
 
         # 定时器
@@ -67,88 +70,31 @@ class SimpleTactileDisplay(QMainWindow):
         self.timer.start(50)  # 20Hz刷新
 
         # 网络连接
-        self.socket = None
-        self.connect_to_esp32()
+        self.source = frame_source.create_frame_source()
+        self.status_label.setText("等待连接...")
 
-    def connect_to_esp32(self):
-        HOST, PORT = '0.0.0.0', 8888
-        try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-            self.socket.bind((HOST, PORT))
-            self.socket.listen(1)
-            self.status_label.setText(f"监听 {HOST}:{PORT}...")
-
-            # 异步接受连接
-            QTimer.singleShot(100, self.accept_connection)
-        except Exception as e:
-            self.status_label.setText(f"连接错误: {str(e)}")
+        # 异步接受连接
+        QTimer.singleShot(100, self.accept_connection)
 
     def accept_connection(self):
         try:
-            conn, addr = self.socket.accept()
-            self.conn = conn
-            self.status_label.setText(f"已连接: {addr[0]}:{addr[1]}")
-            # 开始接收数据
-            QTimer.singleShot(0, self.receive_data)
+            self.source.open()
+            self.status_label.setText(f"已连接: {self.source.description}")
+            # 开始接收数据：独立线程阻塞读取，收到新帧后通知界面
+            self.reader_thread = data_display_gui.ReceiverThread(self.receiver, self.source)
+            self.reader_thread.frames_ready.connect(self.receive_data)
+            self.reader_thread.connection_closed.connect(lambda: self.status_label.setText("连接已关闭"))
+            self.reader_thread.start()
         except Exception as e:
-            self.status_label.setText(f"接受连接错误: {str(e)}")
+            self.status_label.setText(f"连接错误: {str(e)}")
 
     def receive_data(self):
-        try:
-            data = self.conn.recv(4096)
-            if not data:
-                self.status_label.setText("连接已关闭")
-                return
-
-            self.buffer.extend(data)
-
-            while True:
-                frame = self.extract_frame()
-                if frame is None:
-                    break
-
-                self.current_data = frame
-                current_time = time.time()
-                self.fps_tracker.append(current_time)
-
-            # 继续接收数据
-            QTimer.singleShot(0, self.receive_data)
-        except Exception as e:
-            self.status_label.setText(f"接收错误: {str(e)}")
-
-    def extract_frame(self):
-        start = self.buffer.find(b'\xAA')
-        if start == -1:
-            return None
-
-        if len(self.buffer) < start + 3:
-            return None
-
-        data_len = struct.unpack('<H', self.buffer[start+1:start+3])[0]
-        total_len = 3 + data_len + 1
-
-        if len(self.buffer) < start + total_len:
-            return None
-
-        if self.buffer[start + total_len - 1] != 0x55:
-            print("帧尾错误!")
-            del self.buffer[:start + total_len]
-            return None
-
-        data = self.buffer[start+3:start+3+data_len]
-        del self.buffer[:start + total_len]
-
-        arr = np.frombuffer(data, dtype=np.float32).reshape((ROWS, COLS))
-        return arr
+        frames = self.reader_thread.take_frames()
+        if len(frames) and self.receiver.latest_frame is not None:
+            self.current_data = self.receiver.latest_frame
 
     def get_fps(self):
-        if len(self.fps_tracker) < 2:
-            return 0
-        time_diff = self.fps_tracker[-1] - self.fps_tracker[0]
-        if time_diff <= 0:
-            return 0
-        return (len(self.fps_tracker) - 1) / time_diff
+        return self.receiver.get_fps()
 
     def update_display(self):
         # 更新FPS
@@ -178,10 +124,9 @@ class SimpleTactileDisplay(QMainWindow):
                 self.table.setItem(i, j, item)
 
     def closeEvent(self, event):
-        if hasattr(self, 'conn'):
-            self.conn.close()
-        if hasattr(self, 'socket'):
-            self.socket.close()
+        if self.reader_thread is not None:
+            self.reader_thread.stop()
+        self.source.close()
         event.accept()
 
 if __name__ == "__main__":
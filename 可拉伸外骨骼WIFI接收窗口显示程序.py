@@ -1,18 +1,21 @@
-import socket
-import struct
+import os
+import sys
 import numpy as np
 import time
 from collections import deque
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 
+# 帧源与协议解析统一使用本体感知系统显示程序中的frame_source，传输方式见config_utils.FRAME_TRANSPORT
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '本体感知系统显示程序'))
+import frame_source
+
 # 必须与ESP32代码中的定义一致！
 ROWS = 6   # 数组行数
 COLS = 4   # 数组列数
 
 class HighSpeedReceiver:
     def __init__(self):
-        self.buffer = bytearray()
         self.fps_tracker = deque(maxlen=30)
         # 初始化可视化
         self.fig, self.ax = plt.subplots()
@@ -20,21 +23,16 @@ class HighSpeedReceiver:
         self.data = np.zeros((ROWS, COLS))  # 初始化数据
         self.last_update_time = time.time()
 
-    def receive(self, sock):
+    def receive(self, source):
         try:
-            data = sock.recv(4096)
-            if not data:
+            frames = source.read_frames()
+            if frames is None:
                 return None
-            self.buffer.extend(data)
 
-            frames = []
-            while True:
-                frame = self._extract_frame()
-                if frame is None:
-                    break
-                frames.append(frame)
+            frames = [frame.reshape(ROWS, COLS) for frame in frames]
+            if frames:
                 current_time = time.time()
-                self.fps_tracker.append(current_time)
+                self.fps_tracker.extend([current_time] * min(len(frames), self.fps_tracker.maxlen))
                 # 确保至少有2个时间点才能计算FPS
                 if len(self.fps_tracker) > 1:
                     time_diff = current_time - self.last_update_time
@@ -45,31 +43,6 @@ class HighSpeedReceiver:
             print(f"Receive error: {e}")
             return None
 
-    def _extract_frame(self):
-        start = self.buffer.find(b'\xAA')
-        if start == -1:
-            return None
-
-        if len(self.buffer) < start + 3:
-            return None
-
-        data_len = struct.unpack('<H', self.buffer[start+1:start+3])[0]
-        total_len = 3 + data_len + 1
-
-        if len(self.buffer) < start + total_len:
-            return None
-
-        if self.buffer[start + total_len - 1] != 0x55:
-            print("Frame tail error!")
-            del self.buffer[:start + total_len]
-            return None
-
-        data = self.buffer[start+3:start+3+data_len]
-        del self.buffer[:start + total_len]
-
-        arr = np.frombuffer(data, dtype=np.float32).reshape((ROWS, COLS))
-        return arr
-
     def get_fps(self):
         if len(self.fps_tracker) < 2:
             return 0
@@ -109,25 +82,17 @@ class HighSpeedReceiver:
         return self.cax,
 
 if __name__ == "__main__":
-    HOST, PORT = '0.0.0.0', 8888
     receiver = HighSpeedReceiver()
 
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-        s.bind((HOST, PORT))
-        s.listen()
-        print(f"Listening on {HOST}:{PORT}...")
-        conn, addr = s.accept()
-        print(f"Connected by {addr}")
-
+    with frame_source.create_frame_source() as source:
         # 创建动画
         ani = FuncAnimation(receiver.fig, receiver.update_plot, interval=50, blit=False)
         plt.show(block=False)  # 非阻塞显示
 
         try:
             while True:
-                frames = receiver.receive(conn)
-                if frames is not None:
+                frames = receiver.receive(source)
+                if frames:
                     receiver.data = frames[-1]  # 更新最新数据
                     fps = receiver.get_fps()
                     receiver.fig.suptitle(f"FPS: {fps:.1f}")
@@ -6,9 +6,12 @@ Revo2灵巧手工具函数模块
 - 设备端口的扫描和选择
 - 数据类型转换和处理功能
 - 设备信息获取和验证
+
+环境变量 HAND_BACKEND=mock 时 libstark 为本地模拟（本体感知系统显示程序/mock_stark.py），不需要连接灵巧手。
 """
 
 import json
+import os
 import sys
 import logging
 from logger import getLogger
@@ -16,9 +19,14 @@ from logger import getLogger
 # logger = getLogger(logging.DEBUG)
 logger = getLogger(logging.INFO)
 
-from bc_stark_sdk import main_mod
+if os.environ.get("HAND_BACKEND") == "mock":
+    # 没有灵巧手时使用本地模拟（HAND_BACKEND=mock），模拟模块在本体感知系统显示程序目录
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, '本体感知系统显示程序'))
+    import mock_stark as libstark
+else:
+    from bc_stark_sdk import main_mod
 
-libstark = main_mod
+    libstark = main_mod
 libstark.init_config(libstark.StarkProtocolType.Modbus)
 
 
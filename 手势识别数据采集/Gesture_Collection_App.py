@@ -1,5 +1,3 @@
-import socket
-import struct
 import numpy as np
 import time
 import csv
@@ -13,8 +11,13 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QHBoxLayout,
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread, QRect
 from PyQt5.QtGui import QColor, QPixmap, QFont, QPainter, QPen, QBrush
 
+# 帧源与协议解析统一使用本体感知系统显示程序中的frame_source
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '本体感知系统显示程序'))
+import frame_source
+import baseline_tracker
+
 # --- 1. 基础配置区域 (网络与参数) ---
-HOST, PORT = '0.0.0.0', 8888  # 监听地址和端口
+# 传输方式(TCP/UDP/串口)、监听地址和端口见 本体感知系统显示程序/config_utils.py
 ROWS = 6  # 传感器行数
 COLS = 4  # 传感器列数
 TOTAL_CELLS = ROWS * COLS  # 总传感器数量
@@ -24,7 +27,7 @@ REFERENCE_RESISTANCE = 3000.0 # 参考电阻 (Ohm)
 CAPTURE_DURATION = 2.0        # 每个动作采集时长 (秒)
 PRE_CAPTURE_DURATION = 0.5    # 采集前预留时长 (秒)
 TOTAL_REPS_PER_GESTURE = 1    # 每个手势重复次数
-CALIBRATION_INTERVAL = 5      # 校准间隔 (每几次动作校准一次)
+CALIBRATION_INTERVAL = 5      # 校准间隔 (每几次动作校准一次；基线在线跟踪有效时不强制校准)
 
 # 【统一字体配置】
 # 将此处修改为您想要的字体，即可全局生效
@@ -68,56 +71,39 @@ class StretchableExoskeleton:
         if voltage <= 0 or voltage >= self.voltage_ref: return 0
         return self.r_ref * (self.voltage_ref - voltage) / voltage
 
+    # 电压转电阻算法（向量化，支持 (N, 24) 批量）
+    def voltages_to_resistances(self, voltages):
+        voltages = np.asarray(voltages, dtype=np.float64)
+        valid = (voltages > 0) & (voltages < self.voltage_ref)
+        safe = np.where(valid, voltages, self.voltage_ref)  # 无效电压代入参考电压，结果为0
+        return np.where(valid, self.r_ref * (self.voltage_ref - safe) / safe, 0.0)
+
+    # 相对R0的变化率，R0过小的通道为0
+    def resistance_ratios(self, resistances, r0):
+        r0 = np.asarray(r0, dtype=np.float64)
+        inv_r0 = np.zeros_like(r0)
+        np.divide(1.0, r0, out=inv_r0, where=r0 > 1e-3)
+        return (resistances - r0) * inv_r0
+
 class HighSpeedReceiver:
     def __init__(self):
-        self.buffer = bytearray()
         self.latest_reversed_data = [0] * TOTAL_CELLS
         self.frame_count = 0
         self.last_fps_calc_time = time.time()
         self.stable_fps = 0.0
 
-    # 接收并解析数据
-    def receive(self, sock):
+    # 从帧源读取并解析数据，返回本次收到的全部帧 (N, 24)
+    def receive(self, source):
         try:
-            data = sock.recv(4096)
-            if not data: return None
-            self.buffer.extend(data)
-            frame = None
-            received = False
-            while True:
-                extracted = self._extract_frame()
-                if extracted is None: break
-                frame = extracted
-                self.frame_count += 1
-                received = True
-            if frame is not None:
-                flat_data = []
-                for row in frame:
-                    # 注意：这里进行了数据翻转处理
-                    flat_data.extend(row[::-1].tolist())
-                self.latest_reversed_data = flat_data[:TOTAL_CELLS]
-            return frame if received else None
-        except BlockingIOError: return None
+            frames = source.read_frames()
+            if frames is None or len(frames) == 0: return None
+            self.frame_count += len(frames)
+            # 注意：这里进行了数据翻转处理
+            reversed_frames = frame_source.reverse_rows(frames)
+            self.latest_reversed_data = reversed_frames[-1].tolist()
+            return reversed_frames
         except Exception as e: return None
 
-    # 从缓冲区提取完整的一帧数据
-    def _extract_frame(self):
-        start = self.buffer.find(b'\xAA') # 帧头
-        if start == -1: return None
-        if len(self.buffer) < start + 3: return None
-        data_len = struct.unpack('<H', self.buffer[start + 1:start + 3])[0]
-        if data_len != TOTAL_CELLS * 4:
-            del self.buffer[:start + 1]
-            return None
-        total_len = 3 + data_len + 1
-        if len(self.buffer) < start + total_len: return None
-        if self.buffer[start + total_len - 1] != 0x55: # 帧尾
-            del self.buffer[:start + 1]
-            return None
-        data = self.buffer[start + 3:start + 3 + data_len]
-        del self.buffer[:start + total_len]
-        return np.frombuffer(data, dtype=np.float32).reshape((ROWS, COLS))
-
     # 计算 FPS
     def get_fps(self):
         cur = time.time()
@@ -128,21 +114,23 @@ class HighSpeedReceiver:
         return self.stable_fps
 
 class DataWorker(QThread):
-    data_received = pyqtSignal(list, float) # 信号：发送数据列表和FPS
-    def __init__(self, receiver, conn):
+    data_received = pyqtSignal(object, float) # 信号：发送本次收到的全部帧 (N, 24) 和FPS
+    def __init__(self, receiver, source):
         super().__init__()
         self.receiver = receiver
-        self.conn = conn
+        self.source = source
         self.running = True
     def run(self):
-        while self.running and self.conn:
-            frame = self.receiver.receive(self.conn)
-            if frame is not None:
+        # 帧源读取带超时阻塞，无数据时线程休眠而不是轮询
+        while self.running and self.source:
+            frames = self.receiver.receive(self.source)
+            if frames is not None:
                 fps = self.receiver.get_fps()
-                self.data_received.emit(self.receiver.latest_reversed_data, fps)
-            else:
-                self.msleep(1)
-    def stop(self): self.running = False
+                self.data_received.emit(frames, fps)  # v2一包K帧时全部发出，采集不抽帧
+    def stop(self):
+        self.running = False
+        self.source.interrupt()
+        self.wait(1000)
 
 # --- 5. 自定义控件：右侧手势状态方块 ---
 # 【说明】：这个方块是自己画出来的，所以普通的CSS样式表对它里面的文字无效！
@@ -227,9 +215,9 @@ class GestureStatusCell(QFrame):
 
 # --- 6. 主窗口类 (核心界面逻辑) ---
 class GestureCollectionWindow(QMainWindow):
-    def __init__(self, conn):
+    def __init__(self, source):
         super().__init__()
-        self.conn = conn
+        self.source = source
         self.receiver = HighSpeedReceiver()
         self.exo = StretchableExoskeleton()
 
@@ -247,8 +235,9 @@ class GestureCollectionWindow(QMainWindow):
         self.fixed_img_w = 640  # 宽度
         self.fixed_img_h = 900  # 高度
 
-        self.data_buffer = deque(maxlen=200)
+        self.data_buffer = deque(maxlen=2000)  # 逐帧缓存，需覆盖高帧率下的PRE_CAPTURE_DURATION
         self.current_R0 = None
+        self.baseline_tracker = baseline_tracker.BaselineTracker()  # 放松静止时在线跟踪R0漂移
         self.temp_capture_data = []
 
         # 数据保存路径
@@ -259,7 +248,7 @@ class GestureCollectionWindow(QMainWindow):
         self.initUI()
 
         # 启动数据接收线程
-        self.worker = DataWorker(self.receiver, self.conn)
+        self.worker = DataWorker(self.receiver, self.source)
         self.worker.data_received.connect(self.on_data_received)
         self.worker.start()
 
@@ -678,9 +667,10 @@ class GestureCollectionWindow(QMainWindow):
         if len(self.data_buffer) >= 10:
             recent_frames = list(self.data_buffer)[-10:]
             avg_volts = np.mean([f['data'] for f in recent_frames], axis=0)
-            self.current_R0 = [self.exo.voltage_to_resistance(v) for v in avg_volts]
+            self.current_R0 = self.exo.voltages_to_resistances(avg_volts)
         else:
-            self.current_R0 = [self.exo.voltage_to_resistance(v) for v in self.receiver.latest_reversed_data]
+            self.current_R0 = self.exo.voltages_to_resistances(self.receiver.latest_reversed_data)
+        self.baseline_tracker.reset(self.current_R0)
         print(f"Calibration Done.")
         self.enter_capture_state()
 
@@ -688,6 +678,8 @@ class GestureCollectionWindow(QMainWindow):
         """开始采集数据"""
         if self.is_collecting: return
         self.is_collecting = True
+        if self.baseline_tracker.is_fresh():
+            self.current_R0 = self.baseline_tracker.baseline.copy()  # 使用在线跟踪到的最新R0
         self.start_capture_time = time.time()
         self.temp_capture_data = []
         # 回溯一点数据
@@ -724,7 +716,7 @@ class GestureCollectionWindow(QMainWindow):
             self.lbl_instruction.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; margin-bottom: 20px;")
             self.lbl_status_indicator.setText("Completed")
             self.needs_calibration = True
-        elif self.samples_since_calibration >= CALIBRATION_INTERVAL:
+        elif self.samples_since_calibration >= CALIBRATION_INTERVAL and not self.baseline_tracker.is_fresh():
             self.enter_calibration_state()
         else:
             self.lbl_instruction.setText("Relax -> Press [Space]")
@@ -753,12 +745,12 @@ class GestureCollectionWindow(QMainWindow):
                 for i in range(1, TOTAL_CELLS+1): headers.append(f"R_raw_{i}")
                 for i in range(1, TOTAL_CELLS+1): headers.append(f"dR_ratio_{i}")
                 writer.writerow(headers)
-                for frame in self.temp_capture_data:
-                    t_curr = frame['timestamp'] - t0
-                    volts = frame['data']
-                    rs = [self.exo.voltage_to_resistance(v) for v in volts]
-                    dRs = [((r - self.current_R0[i])/self.current_R0[i] if self.current_R0[i]>1e-3 else 0) for i,r in enumerate(rs)]
-                    row = [f"{t_curr:.4f}"] + [f"{val:.2f}" for val in rs] + [f"{val:.4f}" for val in dRs]
+                # 整段采集数据一次性向量化计算电阻和变化率
+                times = np.array([frame['timestamp'] for frame in self.temp_capture_data]) - t0
+                rs = self.exo.voltages_to_resistances([frame['data'] for frame in self.temp_capture_data])
+                dRs = self.exo.resistance_ratios(rs, self.current_R0)
+                for t_curr, r_row, dr_row in zip(times, rs, dRs):
+                    row = [f"{t_curr:.4f}"] + [f"{val:.2f}" for val in r_row] + [f"{val:.4f}" for val in dr_row]
                     writer.writerow(row)
             print(f"Saved: {filename}")
         except Exception as e: print(e)
@@ -780,13 +772,21 @@ class GestureCollectionWindow(QMainWindow):
         self.lbl_total_progress.setText(f"{total_completed} / {total_tasks} Completed")
 
     # 【注意！核心坑点：数据到达时的处理】
-    def on_data_received(self, data, fps):
+    def on_data_received(self, frames, fps):
         self.lbl_fps.setText(f"FPS: {fps:.1f}")
         ts = time.time()
-        self.data_buffer.append({'timestamp': ts, 'data': data})
-        if self.is_collecting: self.temp_capture_data.append({'timestamp': ts, 'data': data})
-
-        # 更新传感器热力图
+        # 同一批的K帧按当前帧率往前回推时间戳，每一帧都进入缓冲和采集数据
+        interval = 1.0 / fps if fps > 0 else 0.0
+        num_frames = len(frames)
+        for i, row in enumerate(frames.tolist()):
+            item = {'timestamp': ts - (num_frames - 1 - i) * interval, 'data': row}
+            self.data_buffer.append(item)
+            if self.is_collecting: self.temp_capture_data.append(item)
+        if not self.is_collecting and self.current_R0 is not None:
+            self.baseline_tracker.update(self.exo.voltages_to_resistances(frames))
+
+        # 更新传感器热力图（只显示最新一帧）
+        data = frames[-1]
         for i, val in enumerate(data):
             if i < len(self.sensor_cells):
                 norm = min(max(val/3300, 0), 1)
@@ -803,16 +803,11 @@ class GestureCollectionWindow(QMainWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    source = frame_source.create_frame_source()
     try:
-        server_socket.bind((HOST, PORT))
-        server_socket.listen(1)
-        print(f"Listening on {PORT}...")
-        conn, addr = server_socket.accept()
-        conn.setblocking(False)
-        window = GestureCollectionWindow(conn)
+        source.open()
+        window = GestureCollectionWindow(source)
         window.show()
         sys.exit(app.exec_())
     except Exception as e: print(e)
-    finally: server_socket.close()
\ No newline at end of file
+    finally: source.close()
@@ -1,4 +1,5 @@
 import os
+import sys
 import numpy as np
 import open3d as o3d
 from smplx import MANO
@@ -9,6 +10,13 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 
+# 手势姿态库由主程序目录的 pose_library 提供（JSON保存 + KD树最近邻查询）
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(_BASE_DIR, os.pardir, '本体感知系统显示程序'))
+import pose_library
+
+POSE_LIBRARY_PATH = os.path.join(_BASE_DIR, 'pose_library.json')
+
 class MANOHandVisualizer:
     """
     MANO手部可视化器类
@@ -203,7 +211,8 @@ class MANOControlWindow(QMainWindow):
 
         # 初始化参数
         self.pca_values = [0.0] * 45
-        self.saved_states = {}
+        # 已保存的状态存放在姿态库中，启动时从文件读取，增删后立即写回
+        self.pose_library = pose_library.PoseLibrary(POSE_LIBRARY_PATH)
 
         # 创建主窗口部件
         central_widget = QWidget()
@@ -217,6 +226,10 @@ class MANOControlWindow(QMainWindow):
         control_panel = self.create_control_panel()
         main_layout.addWidget(control_panel)
 
+        # 显示姿态库中已有的状态
+        self.state_combo.addItems(self.pose_library.names())
+        self.state_info.setText(f"States saved: {len(self.pose_library)}")
+
         # 初始化显示
         self.update_hand_model()
 
@@ -436,6 +449,12 @@ class MANOControlWindow(QMainWindow):
         self.state_info.setStyleSheet("color: #6c757d; font-size: 12px; margin: 10px 0;")
         layout.addWidget(self.state_info)
 
+        # 与当前姿态最接近的已保存状态
+        self.nearest_label = QLabel("Nearest saved state: -")
+        self.nearest_label.setAlignment(Qt.AlignCenter)
+        self.nearest_label.setStyleSheet("color: #6c757d; font-size: 12px;")
+        layout.addWidget(self.nearest_label)
+
         return panel
 
     def on_slider_changed(self, index, value):
@@ -456,6 +475,14 @@ class MANOControlWindow(QMainWindow):
         pose_array = np.array(self.pca_values)
         self.visualizer.update_hand_pose(pose_array)
 
+        # KD树查询最接近的已保存状态
+        nearest = self.pose_library.nearest_pose(pose_array)
+        if nearest:
+            name, distance = nearest[0]
+            self.nearest_label.setText(f"Nearest saved state: {name} (distance {distance:.2f})")
+        else:
+            self.nearest_label.setText("Nearest saved state: -")
+
     def reset_all_sliders(self):
         """重置所有滑动条"""
         reply = QMessageBox.question(self, 'Reset Confirmation',
@@ -474,25 +501,27 @@ class MANOControlWindow(QMainWindow):
         """保存当前状态"""
         name, ok = QInputDialog.getText(self, "Save State", "Enter a name for this state:")
         if ok and name:
-            if name in self.saved_states:
+            if name in self.pose_library:
                 reply = QMessageBox.question(self, 'Overwrite Confirmation',
                                              f'State "{name}" already exists. Overwrite?',
                                              QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
                 if reply == QMessageBox.No:
                     return
 
-            # 保存当前状态
-            self.saved_states[name] = {
-                'values': self.pca_values.copy(),
-                'timestamp': time.strftime("%Y-%m-%d %H:%M:%S")
-            }
+            # 保存当前状态并写入姿态库文件
+            self.pose_library.add(name, self.pca_values)
+            try:
+                self.pose_library.save()
+            except OSError as e:
+                QMessageBox.warning(self, "Warning", f"State '{name}' kept in memory but not written to file: {e}")
 
             # 更新下拉菜单
             if self.state_combo.findText(name) == -1:
                 self.state_combo.addItem(name)
 
             # 更新状态信息
-            self.state_info.setText(f"States saved: {len(self.saved_states)}")
+            self.state_info.setText(f"States saved: {len(self.pose_library)}")
+            self.update_hand_model()  # 刷新最接近状态的显示
 
             QMessageBox.information(self, "Success", f"State '{name}' saved successfully!")
 
@@ -503,9 +532,8 @@ class MANOControlWindow(QMainWindow):
             return
 
         state_name = self.state_combo.currentText()
-        if state_name in self.saved_states:
-            state_data = self.saved_states[state_name]
-            values = state_data['values']
+        if state_name in self.pose_library:
+            values = self.pose_library.get(state_name)[0].tolist()
 
             # 更新PCA值和滑动条
             self.pca_values = values.copy()
@@ -518,7 +546,7 @@ class MANOControlWindow(QMainWindow):
                 value_label.setText(f"{value:.2f}")
 
             self.update_hand_model()
-            QMessageBox.information(self, "Success", f"State '{state_name}' loaded successfully!\nSaved: {state_data['timestamp']}")
+            QMessageBox.information(self, "Success", f"State '{state_name}' loaded successfully!\nSaved: {self.pose_library.timestamp(state_name)}")
         else:
             QMessageBox.warning(self, "Warning", "Selected state not found!")
 
@@ -529,14 +557,18 @@ class MANOControlWindow(QMainWindow):
             return
 
         state_name = self.state_combo.currentText()
-        if state_name in self.saved_states:
+        if state_name in self.pose_library:
             reply = QMessageBox.question(self, 'Delete Confirmation',
                                          f'Are you sure you want to delete state "{state_name}"?',
                                          QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
 
             if reply == QMessageBox.Yes:
-                # 删除状态
-                del self.saved_states[state_name]
+                # 删除状态并写回姿态库文件
+                self.pose_library.remove(state_name)
+                try:
+                    self.pose_library.save()
+                except OSError as e:
+                    QMessageBox.warning(self, "Warning", f"Failed to update the pose library file: {e}")
 
                 # 从下拉菜单中移除
                 index = self.state_combo.findText(state_name)
@@ -544,7 +576,8 @@ class MANOControlWindow(QMainWindow):
                     self.state_combo.removeItem(index)
 
                 # 更新状态信息
-                self.state_info.setText(f"States saved: {len(self.saved_states)}")
+                self.state_info.setText(f"States saved: {len(self.pose_library)}")
+                self.update_hand_model()
 
                 QMessageBox.information(self, "Success", f"State '{state_name}' deleted successfully!")
 
@@ -0,0 +1,137 @@
+"""
+拉伸传感器基线(R0)在线漂移跟踪
+
+可拉伸电阻会随温度、佩戴松紧缓慢漂移，固定的预拉伸电阻快照用久了拉伸率就会偏移。
+BaselineTracker 用最近 window 帧的电阻判断手是否处于静止放松状态：
+- 全部通道在窗口内的相对标准差都小于 rest_threshold 时认为手静止；
+- 静止且全部通道的窗口均值与当前基线的相对偏差都小于 max_deviation（接近零拉伸）时才更新基线，
+  保持某个手势不动时方差同样很小，只要有一个通道明显拉伸就不更新；
+- 更新的时间常数取分钟级，保持在阈值内的小幅弯曲只会被缓慢吸收一小部分，
+  阈值以上的突变（如重新佩戴）不会被跟踪，需要重新校准。
+基线更新支持逐通道EMA和逐通道中值两种方式。窗口均值和方差由增量维护的和与平方和得到，
+每帧的计算量是O(24)，与窗口大小和运行时长无关；中值模式每个窗口才求一次中值。
+"""
+
+import time
+
+import numpy as np
+
+import config_utils
+
+
+class BaselineTracker:
+    """24通道基线在线跟踪器"""
+
+    def __init__(self, channels=config_utils.TOTAL_CELLS, window=config_utils.BASELINE_WINDOW,
+                 rest_threshold=config_utils.BASELINE_REST_THRESHOLD,
+                 max_deviation=config_utils.BASELINE_MAX_DEVIATION,
+                 alpha=config_utils.BASELINE_ALPHA, mode=config_utils.BASELINE_MODE,
+                 median_size=config_utils.BASELINE_MEDIAN_SIZE):
+        """
+        :param window: 判断静止所用的帧数
+        :param rest_threshold: 静止判定的相对标准差阈值
+        :param max_deviation: 视为放松的最大相对偏差，全部通道都小于该值时才更新基线
+        :param alpha: EMA模式下每帧的更新系数
+        :param mode: "ema" 或 "median"
+        :param median_size: 中值模式下保留的历史静止均值个数
+        """
+        if mode not in ("ema", "median"):
+            raise ValueError(f"未知的基线更新方式: {mode}")
+        self.channels = channels
+        self.window = window
+        self.rest_threshold = rest_threshold
+        self.max_deviation = max_deviation
+        self.alpha = alpha
+        self.mode = mode
+
+        self._ring = np.zeros((window, channels))  # 最近window帧的电阻
+        self._history = np.zeros((median_size, channels))  # 中值模式：历史静止窗口均值
+        self.baseline = None
+        self.reset(None)
+
+    def reset(self, baseline):
+        """使用新的校准基线重新开始跟踪，baseline为None时停止跟踪"""
+        self.baseline = None if baseline is None else np.array(baseline, dtype=np.float64)
+        self._ring_pos = 0
+        self._ring_filled = 0
+        self._history_pos = 0
+        if baseline is not None:
+            self._history[:] = self.baseline  # 用校准基线填满历史，避免开头几个窗口直接决定中值
+        self._since_history = 0
+        self._since_resum = 0
+        self._ring[:] = 0.0
+        self._sum = np.zeros(self.channels)
+        self._sumsq = np.zeros(self.channels)
+        self.at_rest = False
+        self.rest_updates = 0  # 自上次reset以来的基线更新次数
+        self.last_update_time = None  # 最近一次更新基线的时间
+
+    def update(self, resistances):
+        """
+        输入新的电阻帧，静止时更新基线
+
+        :param resistances: (N, 24) 或 (24,) 电阻数组
+        :return: 本次是否判定为静止
+        """
+        if self.baseline is None:
+            return False
+        frames = np.atleast_2d(np.asarray(resistances, dtype=np.float64))
+        num_frames = len(frames)
+        if num_frames > self.window:
+            frames = frames[-self.window:]
+
+        # 写入环形缓冲区，同时增量维护窗口内的和与平方和
+        if len(frames) == 1:  # 逐帧调用的快速路径，避免花式索引
+            row = frames[0]
+            old = self._ring[self._ring_pos]
+            self._sum += row - old
+            self._sumsq += row * row - old * old
+            self._ring[self._ring_pos] = row
+        else:
+            index = (self._ring_pos + np.arange(len(frames))) % self.window
+            old = self._ring[index]
+            self._sum += frames.sum(axis=0) - old.sum(axis=0)
+            self._sumsq += (frames * frames).sum(axis=0) - (old * old).sum(axis=0)
+            self._ring[index] = frames
+        self._ring_pos = (self._ring_pos + len(frames)) % self.window
+        self._ring_filled = min(self.window, self._ring_filled + len(frames))
+        self._since_resum += len(frames)
+        if self._since_resum >= self.window:
+            # 每写满一轮重新精确求和，消除增量累加的浮点误差
+            self._sum = self._ring.sum(axis=0)
+            self._sumsq = (self._ring * self._ring).sum(axis=0)
+            self._since_resum = 0
+        if self._ring_filled < self.window:
+            self.at_rest = False
+            return False
+
+        scale = np.abs(self.baseline) + 1e-6
+        mean = self._sum / self.window
+        variance = np.maximum(self._sumsq / self.window - mean * mean, 0.0)
+        # 静止且接近零拉伸才认为手处于放松状态，保持小幅弯曲不动时不更新
+        relaxed = (np.abs(mean - self.baseline) < self.max_deviation * scale).all()
+        self.at_rest = bool(relaxed and (variance < (self.rest_threshold * scale) ** 2).all())
+        if not self.at_rest:
+            return False
+
+        if self.mode == "ema":
+            # N帧连续EMA等价于一次系数为 1-(1-alpha)^N 的更新
+            gain = 1.0 - (1.0 - self.alpha) ** num_frames
+            self.baseline += gain * (mean - self.baseline)
+        else:
+            # 中值模式每经过一个完整窗口记录一次窗口均值，避免每帧都求中值
+            self._since_history += num_frames
+            if self._since_history < self.window:
+                return True
+            self._since_history = 0
+            self._history[self._history_pos] = mean
+            self._history_pos = (self._history_pos + 1) % len(self._history)
+            self.baseline = np.median(self._history, axis=0)
+
+        self.rest_updates += 1
+        self.last_update_time = time.time()
+        return True
+
+    def is_fresh(self, max_age=config_utils.BASELINE_MAX_AGE):
+        """最近max_age秒内是否在静止状态下更新过基线"""
+        return self.last_update_time is not None and time.time() - self.last_update_time < max_age
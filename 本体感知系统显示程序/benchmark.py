@@ -0,0 +1,580 @@
+"""
+性能基准测试工具
+
+用法示例：
+    python benchmark.py heatmap --frames 500 --rate 100
+    python benchmark.py protocol --frames 100000 --batch 8
+    python benchmark.py stretch --frames 10000
+    python benchmark.py filters
+    python benchmark.py mapping --frames 100000
+    python benchmark.py mano --frames 1000
+    python benchmark.py mesh --frames 1000
+    python benchmark.py hand --seconds 5 --latency 0.001 --jitter 0.0005
+"""
+
+import argparse
+import multiprocessing
+import os
+import socket
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import config_utils
+import filter_bank
+import glove_mapping
+import mano_numpy
+import mesh_normals
+import perception_data_processor
+import wire_protocol
+
+
+def _paced_loop(frames, rate, step):
+    """
+    按指定帧率调用step，返回step及其后事件处理所占用的主线程时间(秒)
+
+    睡眠等待的时间不计入，只统计真正消耗在主线程上的时间
+    """
+    interval = 1.0 / rate if rate > 0 else 0.0
+    busy = 0.0
+    next_tick = time.perf_counter()
+    for i in range(frames):
+        start = time.perf_counter()
+        step(i)
+        busy += time.perf_counter() - start
+        next_tick += interval
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    return busy
+
+
+def bench_heatmap(args):
+    """对比72个DataCell与单个HeatmapWidget的主线程耗时"""
+    if args.offscreen:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout
+    import data_display_gui
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    rng = np.random.default_rng(0)
+    data = rng.uniform(0, 3300, size=(args.frames, 3, config_utils.TOTAL_CELLS))
+
+    # 旧方案：三行，每行24个DataCell
+    old_window = QWidget()
+    old_layout = QVBoxLayout(old_window)
+    rows = []
+    for _ in range(3):
+        row_layout = QHBoxLayout()
+        cells = [data_display_gui.DataCell(i) for i in range(config_utils.TOTAL_CELLS)]
+        for cell in cells:
+            row_layout.addWidget(cell)
+        old_layout.addLayout(row_layout)
+        rows.append(cells)
+    old_window.resize(1600, 250)
+    old_window.show()
+    app.processEvents()
+
+    def old_step(i):
+        for row, cells in enumerate(rows):
+            for cell, value in zip(cells, data[i, row]):
+                cell.setValue(value)
+        app.processEvents()
+
+    old_busy = _paced_loop(args.frames, args.rate, old_step)
+    old_window.close()
+    app.processEvents()
+
+    # 新方案：一个HeatmapWidget绘制全部三行
+    heatmap = data_display_gui.HeatmapWidget(["电压", "电阻", "拉伸率"])
+    heatmap.resize(1600, 250)
+    heatmap.show()
+    app.processEvents()
+    paints = [0]
+    original_paint = heatmap.paintEvent
+
+    def counting_paint(event):
+        paints[0] += 1
+        original_paint(event)
+
+    heatmap.paintEvent = counting_paint
+
+    def new_step(i):
+        heatmap.set_rows(data[i])
+        app.processEvents()
+
+    new_busy = _paced_loop(args.frames, args.rate, new_step)
+    heatmap.close()
+
+    print(f"帧数: {args.frames}, 输入帧率: {args.rate} Hz")
+    print(f"72个DataCell   : 主线程 {old_busy * 1000 / args.frames:.3f} ms/帧")
+    print(f"HeatmapWidget  : 主线程 {new_busy * 1000 / args.frames:.3f} ms/帧, 实际重绘 {paints[0]} 次")
+    if new_busy > 0:
+        print(f"加速比: {old_busy / new_busy:.1f}x")
+
+
+def _udp_emitter(port, version, frames, rate, batch, quantize):
+    """本地发送端：模拟ESP32按v1或v2格式通过UDP发送电压帧"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rng = np.random.default_rng(1)
+    data = rng.uniform(0, 3300, size=(1024, config_utils.TOTAL_CELLS))
+    step = 1 if version == 1 else batch
+    interval = step / rate if rate > 0 else 0.0
+    next_tick = time.perf_counter()
+    for seq in range(0, frames, step):
+        if version == 1:
+            packet = wire_protocol.encode_v1(data[seq % 1024])
+        else:
+            count = min(step, frames - seq)
+            rows = (np.arange(seq, seq + count) % 1024)
+            packet = wire_protocol.encode_v2(data[rows], seq, quantize=quantize)
+        sock.sendto(packet, ('127.0.0.1', port))
+        if interval:
+            next_tick += interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    sock.close()
+
+
+def _run_protocol_case(version, args, quantize=True):
+    """启动发送进程并接收，返回(收到帧数, 耗时, 字节数, 解析器)"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    sock.settimeout(0.5)
+    port = sock.getsockname()[1]
+    parser = wire_protocol.FrameParser()
+    emitter = multiprocessing.Process(target=_udp_emitter,
+                                      args=(port, version, args.frames, args.rate, args.batch, quantize))
+    emitter.start()
+    received = 0
+    start = None
+    end = time.perf_counter()
+    while True:
+        try:
+            data = sock.recv(4096)
+        except socket.timeout:
+            if not emitter.is_alive():
+                break
+            continue
+        if start is None:
+            start = time.perf_counter()
+        received += len(parser.feed_datagram(data))
+        end = time.perf_counter()
+    emitter.join()
+    sock.close()
+    elapsed = end - start if start is not None else 0.0
+    return received, elapsed, parser.bytes_received, parser
+
+
+def _check_full_scale():
+    """int16量化在0和参考电压满量程处的往返误差，返回最大误差(mV)"""
+    frame = np.linspace(0.0, config_utils.REFERENCE_VOLTAGE, config_utils.TOTAL_CELLS)
+    frame[-2] = config_utils.REFERENCE_VOLTAGE - 1.6  # 接近满量程的读数
+    parser = wire_protocol.FrameParser()
+    decoded = parser.feed_datagram(wire_protocol.encode_v2(frame, 0, quantize=True))
+    return float(np.max(np.abs(np.asarray(decoded[0]) - frame)))
+
+
+def bench_protocol(args):
+    """本地UDP发送端对比v1与v2协议的吞吐量、带宽和丢帧"""
+    error = _check_full_scale()
+    limit = wire_protocol.DEFAULT_QUANT_STEP / 2 + 1e-6
+    print(f"int16满量程往返: 最大误差 {error:.4f} mV ({'通过' if error <= limit else '失败，满量程被截断'})")
+    cases = [("v1 float32", 1, True),
+             (f"v2 K={args.batch} float32", 2, False),
+             (f"v2 K={args.batch} int16", 2, True)]
+    print(f"帧数: {args.frames}, 发送帧率: {'不限速' if args.rate <= 0 else f'{args.rate} Hz'}")
+    for name, version, quantize in cases:
+        received, elapsed, nbytes, parser = _run_protocol_case(version, args, quantize)
+        fps = received / elapsed if elapsed > 0 else 0.0
+        loss = 1.0 - received / args.frames
+        detail = f", v2序号推算丢帧 {parser.lost_frames}, CRC错误 {parser.crc_errors}" if version == 2 else ""
+        print(f"{name:<18}: 收到 {received} 帧, {fps:,.0f} 帧/秒, 每帧 {nbytes / max(received, 1):.1f} 字节, "
+              f"丢帧率 {loss * 100:.2f}%{detail}")
+
+
+def bench_stretch(args):
+    """对比逐帧Python循环与 (N, 24) 批量计算拉伸率的耗时"""
+    exoskeleton = perception_data_processor.StretchableExoskeleton()
+    rng = np.random.default_rng(0)
+    exoskeleton.pre_stretch_resistances = exoskeleton.voltages_to_resistances(
+        rng.uniform(500, 3000, config_utils.TOTAL_CELLS)).tolist()
+    exoskeleton.pre_stretch_resistances[0] = 0  # 包含一个无效通道，覆盖掩码分支
+    voltages = rng.uniform(0, 3300, size=(args.frames, config_utils.TOTAL_CELLS))
+
+    # 旧方案：逐帧逐通道Python循环
+    pre = exoskeleton.pre_stretch_resistances
+    start = time.perf_counter()
+    for row in voltages.tolist():
+        resistances = [exoskeleton.voltage_to_resistance(v) for v in row]
+        [(r - pre[i]) / pre[i] if pre[i] > 0 else 0 for i, r in enumerate(resistances)]
+    loop_time = time.perf_counter() - start
+
+    # 新方案：逐帧调用批量接口（单帧）
+    start = time.perf_counter()
+    for row in voltages:
+        exoskeleton.calculate_stretch_batch(row)
+    single_time = time.perf_counter() - start
+
+    # 新方案：整批一次计算
+    start = time.perf_counter()
+    exoskeleton.calculate_stretch_batch(voltages)
+    batch_time = time.perf_counter() - start
+
+    print(f"帧数: {args.frames}")
+    print(f"逐帧Python循环 : {loop_time * 1e6 / args.frames:.2f} us/帧")
+    print(f"逐帧向量化     : {single_time * 1e6 / args.frames:.2f} us/帧")
+    print(f"整批向量化     : {batch_time * 1e6 / args.frames:.3f} us/帧 (加速比 {loop_time / batch_time:.0f}x)")
+
+
+FILTER_CASES = [
+    ("不滤波", []),
+    ("median 3", [("median", {"size": 3})]),
+    ("median 5", [("median", {"size": 5})]),
+    ("biquad 5Hz", [("biquad", {"cutoff": 5.0})]),
+    ("biquad 10Hz", [("biquad", {"cutoff": 10.0})]),
+    ("one_euro 1.0/1", [("one_euro", {"min_cutoff": 1.0, "beta": 1.0})]),
+    ("one_euro 1.5/5", [("one_euro", {"min_cutoff": 1.5, "beta": 5.0})]),
+    ("config FILTER_BANK", None),
+]
+
+
+def bench_filters(args):
+    """在合成信号上对比各滤波配置的延迟、残余噪声和耗时"""
+    rate = config_utils.FILTER_SAMPLE_RATE
+    t = np.arange(int(args.seconds * rate)) / rate
+    # 干净信号：1秒处0->0.3的阶跃，保持，然后3秒后叠加1Hz正弦
+    clean = np.where(t >= 1.0, 0.3, 0.0) + np.where(t >= 3.0, 0.1 * np.sin(2 * np.pi * (t - 3.0)), 0.0)
+    rng = np.random.default_rng(0)
+    channels = config_utils.TOTAL_CELLS
+    noisy = clean[:, np.newaxis] + rng.normal(0, args.noise, size=(len(t), channels))
+    spikes = rng.random(noisy.shape) < 0.002
+    noisy[spikes] += rng.choice([-0.2, 0.2], size=spikes.sum())  # 偶发尖峰
+
+    hold = (t >= 2.0) & (t < 3.0)
+    sine = t >= 4.0
+    step_index = int(1.0 * rate)
+
+    print(f"采样率 {rate} Hz, 时长 {args.seconds} s, 噪声std {args.noise}")
+    print(f"{'配置':<20}{'静止残余噪声':>12}{'阶跃t90(ms)':>14}{'正弦RMSE':>12}{'逐帧us':>10}{'整批us/帧':>12}")
+    for name, spec in FILTER_CASES:
+        bank = filter_bank.FilterBank(spec)
+        start = time.perf_counter()
+        out = np.stack([bank.process(frame) for frame in noisy])
+        per_frame = (time.perf_counter() - start) * 1e6 / len(t)
+
+        bank = filter_bank.FilterBank(spec)
+        start = time.perf_counter()
+        for chunk in np.array_split(noisy, max(1, len(t) // 10)):  # 每批约10帧
+            bank.process(chunk)
+        batched = (time.perf_counter() - start) * 1e6 / len(t)
+
+        mean_out = out.mean(axis=1)
+        residual = (out[hold] - clean[hold, np.newaxis]).std()
+        reached = np.nonzero(mean_out[step_index:] >= 0.27)[0]
+        t90 = reached[0] / rate * 1000 if len(reached) else float('nan')
+        rmse = np.sqrt(((out[sine] - clean[sine, np.newaxis]) ** 2).mean())
+        print(f"{name:<20}{residual:>12.4f}{t90:>14.0f}{rmse:>12.4f}{per_frame:>10.1f}{batched:>12.1f}")
+
+
+def _legacy_glove_to_pca(glove_data_24d, mapping_config):
+    """原来的逐项映射：缩放、偏移，挑出15个自由度后按字典写入45维PCA"""
+    scale_factors, offsets, glove_indices, pca_mapping = mapping_config
+    glove_data_15d = (glove_data_24d * scale_factors + offsets)[glove_indices]
+    hand_pose_pca = np.zeros(glove_mapping.NUM_PCA_COMPONENTS)
+    for i, pca_indices in pca_mapping.items():
+        for idx in pca_indices:
+            hand_pose_pca[idx] = glove_data_15d[i]
+    return hand_pose_pca
+
+
+def bench_mapping(args):
+    """对比原逐项映射与编译后的仿射映射（逐帧和整段录制数据）"""
+    rng = np.random.default_rng(0)
+    frames = rng.normal(0, 0.1, size=(args.frames, config_utils.TOTAL_CELLS))
+    mapping = glove_mapping.GloveToManoMapping()
+    mapping_config = (np.array(config_utils.MANO_SCALE_FACTORS), np.array(config_utils.MANO_OFFSETS),
+                      config_utils.MANO_GLOVE_INDICES, config_utils.MANO_PCA_MAPPING)
+    single = min(args.frames, 20000)
+
+    start = time.perf_counter()
+    legacy = np.stack([_legacy_glove_to_pca(frame, mapping_config) for frame in frames[:single]])
+    legacy_us = (time.perf_counter() - start) * 1e6 / single
+
+    start = time.perf_counter()
+    for frame in frames[:single]:
+        mapping.map(frame)
+    compiled_us = (time.perf_counter() - start) * 1e6 / single
+
+    start = time.perf_counter()
+    batch = mapping.map(frames)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    error = np.abs(batch[:single] - legacy).max()
+    print(f"逐项映射: {legacy_us:.2f} us/帧")
+    print(f"仿射映射: {compiled_us:.2f} us/帧")
+    print(f"整批映射 {args.frames} 帧: {batch_ms:.2f} ms ({batch_ms * 1000 / args.frames:.3f} us/帧)")
+    print(f"最大误差: {error:.2e}")
+
+
+def bench_mano(args):
+    """对比NumPy蒙皮与smplx(torch)逐帧计算MANO顶点的耗时（未安装torch/smplx时只测NumPy）"""
+    rng = np.random.default_rng(0)
+    poses = rng.normal(0, 0.5, size=(args.frames, mano_numpy.NUM_PCA_COMPONENTS))
+
+    if os.path.exists(args.pkl):
+        start = time.perf_counter()
+        mano_numpy.load_mano_pkl(args.pkl)
+        print(f"读取官方pkl: {(time.perf_counter() - start) * 1000:.1f} ms")
+    start = time.perf_counter()
+    model = mano_numpy.ManoModel(args.model)
+    print(f"NumPy模型初始化({os.path.basename(args.model)}): {(time.perf_counter() - start) * 1000:.1f} ms")
+    start = time.perf_counter()
+    numpy_vertices = np.stack([model.forward(pose).copy() for pose in poses])
+    numpy_us = (time.perf_counter() - start) * 1e6 / args.frames
+    print(f"NumPy蒙皮: {numpy_us:.1f} us/帧")
+
+    try:
+        import torch
+        from smplx import MANO
+    except ImportError:
+        print("未安装torch/smplx，跳过torch对比")
+        return
+    start = time.perf_counter()
+    torch_model = MANO(model_path=args.pkl, is_rhand=True, num_pca_comps=mano_numpy.NUM_PCA_COMPONENTS)
+    print(f"smplx模型初始化: {(time.perf_counter() - start) * 1000:.1f} ms")
+    torch_vertices = np.empty_like(numpy_vertices)
+    start = time.perf_counter()
+    for i, pose in enumerate(poses):
+        # 与原可视化器完全相同的调用方式
+        output = torch_model(betas=torch.zeros([1, 10]),
+                             hand_pose=torch.tensor(pose).view(1, -1).float(),
+                             global_orient=torch.zeros([1, 3]))
+        torch_vertices[i] = output.vertices.detach().cpu().numpy()[0]
+    torch_us = (time.perf_counter() - start) * 1e6 / args.frames
+    print(f"smplx(torch): {torch_us:.1f} us/帧, 加速 {torch_us / numpy_us:.1f}x")
+    print(f"顶点最大误差: {np.abs(numpy_vertices - torch_vertices).max():.2e} m")
+
+
+def _naive_vertex_normals(vertices, faces):
+    """逐帧分配临时数组的面积加权法向量（与compute_vertex_normals()的算法相同）"""
+    face_normals = np.cross(vertices[faces[:, 1]] - vertices[faces[:, 0]],
+                            vertices[faces[:, 2]] - vertices[faces[:, 0]])
+    normals = np.zeros_like(vertices)
+    for i in range(3):
+        np.add.at(normals, faces[:, i], face_normals)
+    return normals / np.linalg.norm(normals, axis=1, keepdims=True)
+
+
+def _measure_update(update, poses):
+    """返回 (us/帧, 每帧峰值临时内存字节数)"""
+    update(poses[0])  # 预热
+    start = time.perf_counter()
+    for pose in poses:
+        update(pose)
+    per_frame = (time.perf_counter() - start) * 1e6 / len(poses)
+    tracemalloc.start()
+    peak = 0
+    for pose in poses[:50]:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        update(pose)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+    return per_frame, peak
+
+
+def bench_mesh(args):
+    """对比逐帧重新分配与原地写入两种网格更新方式的耗时和临时内存"""
+    model = mano_numpy.ManoModel(args.model)
+    faces = model.faces
+    poses = np.random.default_rng(0).normal(0, 0.5, size=(args.frames, mano_numpy.NUM_PCA_COMPONENTS))
+    cases = []
+
+    def legacy_numpy(pose):
+        vertices = model.forward(pose).copy()
+        _naive_vertex_normals(vertices, faces)
+        vertices.copy()  # 线框点
+
+    vertex_buffer = np.empty((model.num_vertices, 3))
+    normal_buffer = np.empty((model.num_vertices, 3))
+    wire_points = np.empty((model.num_vertices, 3))
+    estimator = mesh_normals.VertexNormals(faces, model.num_vertices)
+
+    def inplace_numpy(pose):
+        model.forward(pose, out=vertex_buffer)
+        estimator.compute(vertex_buffer, out=normal_buffer)
+        np.copyto(wire_points, vertex_buffer)
+
+    cases.append(("逐帧分配(NumPy)", legacy_numpy))
+    cases.append(("原地写入(NumPy)", inplace_numpy))
+
+    try:
+        import open3d as o3d
+    except ImportError:
+        o3d = None
+        print("未安装open3d，只对比NumPy部分")
+    if o3d is not None:
+        mesh = o3d.geometry.TriangleMesh()
+        mesh.vertices = o3d.utility.Vector3dVector(model.forward(poses[0]))
+        mesh.triangles = o3d.utility.Vector3iVector(faces)
+        mesh.compute_vertex_normals()
+        wireframe = o3d.geometry.LineSet.create_from_triangle_mesh(mesh)
+
+        def legacy_open3d(pose):
+            # 原可视化器的做法
+            mesh.vertices = o3d.utility.Vector3dVector(model.forward(pose))
+            mesh.compute_vertex_normals()
+            wireframe.points = mesh.vertices
+
+        o3d_vertices = np.asarray(mesh.vertices)
+        o3d_normals = np.asarray(mesh.vertex_normals)
+        o3d_points = np.asarray(wireframe.points)
+
+        def inplace_open3d(pose):
+            model.forward(pose, out=o3d_vertices)
+            estimator.compute(o3d_vertices, out=o3d_normals)
+            np.copyto(o3d_points, o3d_vertices)
+
+        cases.append(("逐帧分配(Open3D)", legacy_open3d))
+        cases.append(("原地写入(Open3D)", inplace_open3d))
+
+    print(f"{'方式':<20}{'us/帧':>10}{'峰值临时内存(KB)':>20}")
+    for name, update in cases:
+        per_frame, peak = _measure_update(update, poses)
+        print(f"{name:<20}{per_frame:>10.1f}{peak / 1024:>20.1f}")
+
+
+HAND_CASES = [
+    # (名称, 运动的手指数, 死区, 单指写入, 遥测)
+    ("六指: 全部手指写入", 6, 0, False, False),
+    ("六指: 死区+单指写入", 6, config_utils.HAND_POSITION_DEADBAND, True, False),
+    ("六指: 死区+单指+遥测", 6, config_utils.HAND_POSITION_DEADBAND, True, True),
+    ("单指: 全部手指写入", 1, 0, False, False),
+    ("单指: 死区+单指写入", 1, config_utils.HAND_POSITION_DEADBAND, True, False),
+]
+
+
+def _glove_targets(t, moving=6):
+    """
+    模拟手套驱动的6个手指目标：频率各不相同的正弦(0.2~0.7Hz)，幅度覆盖大部分行程
+
+    :param moving: 运动的手指数，其余手指停在500（例如只动食指，覆盖单指写入）
+    """
+    phases = 2 * np.pi * (0.2 + 0.1 * np.arange(6)) * t
+    targets = [int(500 + 400 * np.sin(phase)) for phase in phases]
+    return targets[:moving] + [500] * (6 - moving)
+
+
+def bench_hand(args):
+    """用模拟灵巧手(mock_stark)对比各控制配置的命令频率、往返时间、总线占用和跟踪误差"""
+    config_utils.HAND_BACKEND = 'mock'  # 在导入 revo2_utils 之前切换到模拟SDK
+    config_utils.HAND_MOCK_LATENCY = args.latency
+    config_utils.HAND_MOCK_JITTER = args.jitter
+    import hand_controller
+
+    print(f"模拟延迟 {args.latency * 1000:.2f} ms + 抖动 [0, {args.jitter * 1000:.2f}) ms, "
+          f"控制节拍 {args.rate:.0f} Hz, 手套 {args.glove_rate:.0f} Hz, 每项 {args.seconds} s")
+    print(f"{'配置':<20}{'命令/s':>8}{'单指%':>7}{'合并/s':>8}{'死区/s':>8}{'往返均值ms':>11}{'P95 ms':>8}"
+          f"{'遥测Hz':>8}{'总线占用':>9}{'跟踪误差':>9}")
+    for name, moving, deadband, single_finger, telemetry in HAND_CASES:
+        stats = hand_controller.ControlStats(report_interval=float('inf'))
+        controller = hand_controller.DexterousHandController(port='MOCK', stats=stats)
+        if not controller.connect():
+            return
+        controller.deadband = deadband
+        controller.single_finger_writes = single_finger
+        if telemetry:
+            controller.start_telemetry(args.telemetry)
+        control_thread = hand_controller.HandControlThread(controller, control_rate=args.rate)
+        control_thread.start()
+
+        # 按手套帧率更新目标，同时直接读取模拟手指位置计算跟踪误差（不占用模拟总线）
+        errors = []
+        bus_start = controller.client.bus_time
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < args.seconds:
+            targets = _glove_targets(elapsed, moving)
+            control_thread.set_target_positions(targets)
+            if elapsed > 0.5:  # 跳过起始阶段
+                errors.append(controller.client.peek_positions(controller.slave_id) - targets)
+            time.sleep(1.0 / args.glove_rate)
+            elapsed = time.perf_counter() - start
+        bus_time = controller.client.bus_time - bus_start
+
+        control_thread.stop()
+        controller.disconnect()
+        mean, p95, _ = stats.round_trip_summary() or (float('nan'),) * 3
+        tracking = np.sqrt(np.mean(np.square(errors))) if errors else float('nan')
+        print(f"{name:<20}{stats.sent / elapsed:>8.0f}{stats.single_finger / max(stats.sent, 1):>7.0%}"
+              f"{stats.coalesced / elapsed:>8.0f}{stats.suppressed / elapsed:>8.0f}{mean:>11.2f}{p95:>8.2f}"
+              f"{stats.polls / elapsed:>8.1f}{bus_time / elapsed:>9.0%}{tracking:>9.1f}")
+    print("跟踪误差：模拟手指位置与手套目标之差的RMS(千分比)，包含控制线程平滑和手指动力学的滞后")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本体感知系统性能基准测试')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    heatmap_parser = subparsers.add_parser('heatmap', help='对比DataCell与HeatmapWidget的主线程耗时')
+    heatmap_parser.add_argument('--frames', type=int, default=500, help='更新帧数 (默认: 500)')
+    heatmap_parser.add_argument('--rate', type=float, default=100.0, help='数据到达帧率Hz，0表示不限速 (默认: 100)')
+    heatmap_parser.add_argument('--offscreen', action='store_true', help='使用offscreen平台，无需显示器')
+    heatmap_parser.set_defaults(func=bench_heatmap)
+
+    protocol_parser = subparsers.add_parser('protocol', help='本地UDP发送端对比v1与v2协议')
+    protocol_parser.add_argument('--frames', type=int, default=100000, help='发送帧数 (默认: 100000)')
+    protocol_parser.add_argument('--rate', type=float, default=0.0, help='发送帧率Hz，0表示不限速 (默认: 0)')
+    protocol_parser.add_argument('--batch', type=int, default=8, help='v2每包帧数K (默认: 8)')
+    protocol_parser.set_defaults(func=bench_protocol)
+
+    stretch_parser = subparsers.add_parser('stretch', help='对比逐帧循环与批量计算拉伸率')
+    stretch_parser.add_argument('--frames', type=int, default=10000, help='帧数 (默认: 10000)')
+    stretch_parser.set_defaults(func=bench_stretch)
+
+    filters_parser = subparsers.add_parser('filters', help='对比各滤波配置的延迟与残余噪声')
+    filters_parser.add_argument('--seconds', type=float, default=10.0, help='合成信号时长 (默认: 10)')
+    filters_parser.add_argument('--noise', type=float, default=0.01, help='高斯噪声标准差 (默认: 0.01)')
+    filters_parser.set_defaults(func=bench_filters)
+
+    mapping_parser = subparsers.add_parser('mapping', help='对比逐项映射与编译后的24->45仿射映射')
+    mapping_parser.add_argument('--frames', type=int, default=100000, help='整批映射的帧数 (默认: 100000)')
+    mapping_parser.set_defaults(func=bench_mapping)
+
+    mano_parser = subparsers.add_parser('mano', help='对比NumPy蒙皮与smplx(torch)的逐帧耗时')
+    mano_parser.add_argument('--frames', type=int, default=1000, help='测试帧数 (默认: 1000)')
+    mano_parser.add_argument('--model', default=config_utils.MANO_RIGHT_MODEL,
+                             help='NumPy蒙皮使用的模型文件 (默认: mano/MANO_RIGHT.npz)')
+    mano_parser.add_argument('--pkl', default=os.path.join(config_utils.MANO_DIR, 'MANO_RIGHT.pkl'),
+                             help='官方MANO pkl，用于对比读取耗时和smplx (默认: mano/MANO_RIGHT.pkl)')
+    mano_parser.set_defaults(func=bench_mano)
+
+    mesh_parser = subparsers.add_parser('mesh', help='对比逐帧分配与原地写入的网格更新')
+    mesh_parser.add_argument('--frames', type=int, default=1000, help='测试帧数 (默认: 1000)')
+    mesh_parser.add_argument('--model', default=config_utils.MANO_RIGHT_MODEL,
+                             help='MANO模型文件 (默认: mano/MANO_RIGHT.npz)')
+    mesh_parser.set_defaults(func=bench_mesh)
+
+    hand_parser = subparsers.add_parser('hand', help='用模拟灵巧手对比控制配置的命令频率和跟踪误差')
+    hand_parser.add_argument('--seconds', type=float, default=5.0, help='每项运行时长 (默认: 5)')
+    hand_parser.add_argument('--latency', type=float, default=config_utils.HAND_MOCK_LATENCY,
+                             help=f'模拟每个事务的固定延迟(秒) (默认: {config_utils.HAND_MOCK_LATENCY})')
+    hand_parser.add_argument('--jitter', type=float, default=config_utils.HAND_MOCK_JITTER,
+                             help=f'模拟随机延迟上限(秒) (默认: {config_utils.HAND_MOCK_JITTER})')
+    hand_parser.add_argument('--rate', type=float, default=config_utils.HAND_CONTROL_RATE,
+                             help=f'控制线程节拍Hz (默认: {config_utils.HAND_CONTROL_RATE})')
+    hand_parser.add_argument('--glove-rate', type=float, default=100.0, help='手套目标更新频率Hz (默认: 100)')
+    hand_parser.add_argument('--telemetry', type=float, default=config_utils.HAND_TELEMETRY_RATE,
+                             help=f'遥测轮询频率Hz (默认: {config_utils.HAND_TELEMETRY_RATE})')
+    hand_parser.set_defaults(func=bench_hand)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
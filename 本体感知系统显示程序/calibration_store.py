@@ -0,0 +1,211 @@
+"""
+校准数据存储
+
+所有校准记录保存在一个SQLite文件中，按 (用户, 设备, 类型, 时间) 建索引，
+同时保存原始电压和预先计算好的电阻数组。启动时把每个 (用户, 设备, 类型) 的最新记录
+读入内存字典，之后查询最新校准是O(1)的字典查找，切换受试者时不再扫描目录、解析CSV。
+
+其他进程（或另一个界面）写入新记录后，poll() 通过 SQLite 的 data_version 检测到变化并重新加载缓存。
+
+每个用户的MANO手型（形状参数betas，以及拟合时使用的手部尺寸）保存在同一个文件的 hand_shapes 表中，
+同样在启动时读入内存，见 hand_shape.py。
+
+旧的 initial_values_*.csv / pre_stretch_values_*.csv 可以用 import_csv_directory() 一次性导入，
+同一个文件不会重复导入。
+"""
+
+import csv
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import namedtuple
+
+import numpy as np
+
+import config_utils
+
+KIND_INITIAL = "initial"  # 未拉伸状态
+KIND_PRE_STRETCH = "pre_stretch"  # 预拉伸状态
+
+LEGACY_CSV_PATTERN = re.compile(r'^(initial|pre_stretch)_values_(\d{8}_\d{6})\.csv$')
+
+CalibrationRecord = namedtuple(
+    'CalibrationRecord',
+    ['id', 'user', 'device', 'kind', 'created_at', 'voltages', 'resistances', 'source'])
+
+HandShapeRecord = namedtuple('HandShapeRecord', ['user', 'betas', 'measurements', 'updated_at'])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calibrations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user TEXT NOT NULL,
+    device TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    voltages BLOB NOT NULL,
+    resistances BLOB NOT NULL,
+    source TEXT UNIQUE
+);
+CREATE INDEX IF NOT EXISTS idx_calibrations_latest
+    ON calibrations (user, device, kind, created_at);
+CREATE TABLE IF NOT EXISTS hand_shapes (
+    user TEXT PRIMARY KEY,
+    betas BLOB NOT NULL,
+    measurements TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+_COLUMNS = "id, user, device, kind, created_at, voltages, resistances, source"
+
+
+def _to_record(row):
+    record_id, user, device, kind, created_at, voltages, resistances, source = row
+    return CalibrationRecord(record_id, user, device, kind, created_at,
+                             np.frombuffer(voltages, dtype=np.float64),
+                             np.frombuffer(resistances, dtype=np.float64), source)
+
+
+class CalibrationStore:
+    """基于SQLite的校准记录存储，带最新记录内存缓存和热重载"""
+
+    def __init__(self, path=config_utils.CALIBRATION_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+        self._latest = {}  # (用户, 设备, 类型) -> 最新的CalibrationRecord
+        self._hand_shapes = {}  # 用户 -> HandShapeRecord
+        self._data_version = None
+        self.reload()
+
+    def reload(self):
+        """重新读取每个 (用户, 设备, 类型) 的最新记录"""
+        # SQLite中与MAX()一同查询的其他列取自最大值所在的那一行
+        rows = self.conn.execute(
+            f"SELECT {_COLUMNS}, MAX(created_at) FROM calibrations GROUP BY user, device, kind").fetchall()
+        self._latest = {(row[1], row[2], row[3]): _to_record(row[:-1]) for row in rows}
+        rows = self.conn.execute("SELECT user, betas, measurements, updated_at FROM hand_shapes").fetchall()
+        self._hand_shapes = {
+            user: HandShapeRecord(user, np.frombuffer(betas, dtype=np.float64),
+                                  json.loads(measurements) if measurements else None, updated_at)
+            for user, betas, measurements, updated_at in rows}
+        self._data_version = self._current_data_version()
+
+    def _current_data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def poll(self):
+        """
+        检查数据库是否被其他连接修改，修改过则重新加载缓存
+
+        :return: 缓存是否被重新加载
+        """
+        if self._current_data_version() == self._data_version:
+            return False
+        self.reload()
+        return True
+
+    def add(self, user, device, kind, voltages, resistances, created_at=None, source=None):
+        """
+        保存一条校准记录
+
+        :param voltages: 24个通道的电压值
+        :param resistances: 对应的电阻值（由StretchableExoskeleton预先计算）
+        :param source: 数据来源标识（例如导入的CSV文件名），相同来源不会重复保存
+        :return: 新记录，来源重复时返回None
+        """
+        created_at = time.time() if created_at is None else created_at
+        voltages = np.ascontiguousarray(voltages, dtype=np.float64)
+        resistances = np.ascontiguousarray(resistances, dtype=np.float64)
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO calibrations (user, device, kind, created_at, voltages, resistances, source) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (user, device, kind, created_at, voltages.tobytes(), resistances.tobytes(), source))
+        self.conn.commit()
+        if cursor.rowcount == 0:
+            return None
+        record = CalibrationRecord(cursor.lastrowid, user, device, kind, created_at,
+                                   voltages, resistances, source)
+        key = (user, device, kind)
+        current = self._latest.get(key)
+        if current is None or current.created_at <= created_at:
+            self._latest[key] = record
+        self._data_version = self._current_data_version()  # 本连接的写入不触发热重载
+        return record
+
+    def latest(self, user=config_utils.CALIBRATION_USER, device=config_utils.CALIBRATION_DEVICE,
+               kind=KIND_PRE_STRETCH):
+        """O(1)获取最新的校准记录，没有时返回None"""
+        return self._latest.get((user, device, kind))
+
+    def latest_pair(self, user=config_utils.CALIBRATION_USER, device=config_utils.CALIBRATION_DEVICE):
+        """获取最新的 (初始值记录, 预拉伸值记录)"""
+        return self.latest(user, device, KIND_INITIAL), self.latest(user, device, KIND_PRE_STRETCH)
+
+    def users(self, device=config_utils.CALIBRATION_DEVICE):
+        """返回该设备已有校准记录的用户列表"""
+        return sorted({user for user, record_device, _ in self._latest if record_device == device})
+
+    def history(self, user=config_utils.CALIBRATION_USER, device=config_utils.CALIBRATION_DEVICE,
+                kind=KIND_PRE_STRETCH, limit=20):
+        """按时间倒序返回历史记录（走索引，不在缓存中）"""
+        rows = self.conn.execute(
+            f"SELECT {_COLUMNS} FROM calibrations WHERE user = ? AND device = ? AND kind = ? "
+            "ORDER BY created_at DESC LIMIT ?", (user, device, kind, limit)).fetchall()
+        return [_to_record(row) for row in rows]
+
+    def set_hand_shape(self, user, betas, measurements=None):
+        """
+        保存（覆盖）用户的MANO手型
+
+        :param betas: 形状参数（通常10维）
+        :param measurements: 可选，拟合时使用的手部尺寸字典 {名称: 米}
+        :return: 新的HandShapeRecord
+        """
+        betas = np.ascontiguousarray(betas, dtype=np.float64)
+        record = HandShapeRecord(user, betas, measurements, time.time())
+        self.conn.execute(
+            "INSERT OR REPLACE INTO hand_shapes (user, betas, measurements, updated_at) VALUES (?, ?, ?, ?)",
+            (user, betas.tobytes(), None if measurements is None else json.dumps(measurements), record.updated_at))
+        self.conn.commit()
+        self._hand_shapes[user] = record
+        self._data_version = self._current_data_version()
+        return record
+
+    def hand_shape(self, user=config_utils.CALIBRATION_USER):
+        """O(1)获取用户的手型记录，没有时返回None（使用标准手型）"""
+        return self._hand_shapes.get(user)
+
+    def import_csv_directory(self, directory, to_resistances, user=config_utils.CALIBRATION_USER,
+                             device=config_utils.CALIBRATION_DEVICE):
+        """
+        导入目录中旧格式的校准CSV，文件名中的时间戳作为记录时间
+
+        :param to_resistances: 电压数组转电阻数组的函数
+        :return: 新导入的文件数
+        """
+        imported = 0
+        for filename in os.listdir(directory):
+            match = LEGACY_CSV_PATTERN.match(filename)
+            if not match:
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                with open(path, 'r') as csvfile:
+                    reader = csv.reader(csvfile)
+                    next(reader)  # 跳过表头
+                    voltages = np.array([float(val) for val in next(reader)])
+            except Exception as e:
+                print(f"读取{path}时出错: {e}")
+                continue
+            created_at = time.mktime(time.strptime(match.group(2), "%Y%m%d_%H%M%S"))
+            if self.add(user, device, match.group(1), voltages, to_resistances(voltages),
+                        created_at=created_at, source=os.path.abspath(path)):
+                imported += 1
+        return imported
+
+    def close(self):
+        self.conn.close()
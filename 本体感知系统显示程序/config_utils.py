@@ -1,3 +1,5 @@
+import os
+
 # 定义数组的行数和列数
 ROWS = 6  # 数组行数
 COLS = 4  # 数组列数
@@ -6,3 +8,113 @@ TOTAL_CELLS = ROWS * COLS  # 计算总单元格数，总共24个元素
 # 电阻计算相关常量
 REFERENCE_VOLTAGE = 3300.0  # 参考电压 (mV)
 REFERENCE_RESISTANCE = 3000.0  # 参考电阻 (欧姆)
+
+# 多进程共享内存总线相关配置
+USE_PROCESS_BUS = True  # True: 可视化器和灵巧手控制运行在独立进程中，通过共享内存读取最新帧
+FRAME_BUS_NAME = "exo_frame_bus"  # 共享内存名称
+
+# 外骨骼数据传输方式配置（frame_source.create_frame_source 使用）
+FRAME_TRANSPORT = "tcp"  # 可选 "tcp" / "udp" / "serial"
+FRAME_HOST = "0.0.0.0"  # TCP/UDP 监听地址
+FRAME_PORT = 8888  # TCP/UDP 监听端口
+SERIAL_PORT = "COM10"  # 串口号
+SERIAL_BAUDRATE = 6000000  # 串口波特率
+
+# 校准数据存储配置
+CALIBRATION_DB = "calibration.db"  # SQLite校准数据库文件
+CALIBRATION_USER = "default"  # 默认受试者
+CALIBRATION_DEVICE = "exo_right"  # 设备标识
+CALIBRATION_POLL_INTERVAL = 1000  # 检查其他进程写入新校准的间隔(毫秒)
+
+# 基线(R0)在线漂移跟踪配置
+BASELINE_TRACKING = True  # 是否在线跟踪预拉伸电阻的漂移
+BASELINE_MODE = "ema"  # "ema": 逐通道指数滑动平均；"median": 逐通道历史中值
+BASELINE_WINDOW = 50  # 静止判定窗口(帧)
+BASELINE_REST_THRESHOLD = 0.005  # 静止判定：窗口内相对标准差阈值
+# 取舍：方差小只说明手没动，保持一个小幅弯曲不动同样方差很小。因此还要求全部通道都接近零拉伸
+# (相对偏差小于BASELINE_MAX_DEVIATION)才更新，并且时间常数取分钟级：
+# 温度、松紧引起的慢漂移仍能跟上，而偶尔保持几秒到几十秒的小幅手势只会被吸收极小一部分。
+# 代价是阈值以上的突变(如重新佩戴)不会被跟踪，需要重新校准。
+BASELINE_MAX_DEVIATION = 0.02  # 全部通道相对基线的偏差都小于该值时才视为放松并更新基线
+BASELINE_ALPHA = 0.00002  # EMA每帧更新系数，100Hz下时间常数约8分钟
+BASELINE_MEDIAN_SIZE = 1024  # 中值模式保留的历史窗口数，窗口50帧、100Hz下约覆盖8.5分钟
+BASELINE_MAX_AGE = 30.0  # 基线在该时间(秒)内更新过则认为仍然有效
+
+# 拉伸率滤波器组配置（filter_bank.FilterBank 使用），空列表表示不滤波
+FILTER_SAMPLE_RATE = 100.0  # 外骨骼数据帧率(Hz)，用于计算滤波器系数
+FILTER_BANK = [
+    ("median", {"size": 3}),  # 去除单帧尖峰
+    ("one_euro", {"min_cutoff": 1.5, "beta": 5.0}),  # 自适应低通
+]
+
+# 手套拉伸率到MANO姿态的映射配置（glove_mapping.GloveToManoMapping 编译为一个 24->45 仿射变换）
+# 每个通道先缩放再加偏移：负数缩放表示取反
+MANO_SCALE_FACTORS = [
+    2.0, 2.0, 5.5, 5.5, 4.0, 1.0,  # 第0-5维
+    1.0, 4.5, 2.5, -4.5, 1.0, 1.0,  # 第6-11维
+    1.0, -2.0, 5.5, 5.5, 1.0, 1.0,  # 第12-17维
+    4.5, 5.5, 1.0, 1.0, 1.0, 1.0,  # 第18-23维
+]
+MANO_OFFSETS = [
+    -0.2, 0.1, -0.5, -0.5, -0.5, -0.4,  # 第0-5维
+    -0.2, -0.5, 0.5, 0.5, 0.0, 0.0,  # 第6-11维
+    0.0, 0.0, -0.6, -0.5, 0.0, 0.0,  # 第12-17维
+    -0.6, -0.6, 0.0, 0.0, 0.0, 0.0,  # 第18-23维
+]
+# 参与映射的15个手套自由度（24维中的索引）
+MANO_GLOVE_INDICES = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 13, 14, 15, 18, 19]
+# 15个自由度到45维PCA分量的映射：键为上面列表中的序号，值为对应的PCA分量索引
+MANO_PCA_MAPPING = {
+    0: [1],  # 食指掌指关节外展内收
+    1: [10],  # 中指掌指关节外展内收
+    2: [14, 17],  # 食指远节指间关节屈伸
+    3: [11],  # 食指掌指关节屈伸
+    4: [5, 8],  # 食指远节指间关节屈伸
+    5: [36, 38],  # 拇指腕掌关节外展内收
+    6: [37],  # 拇指腕掌关节屈伸
+    7: [2],  # 食指掌指关节屈伸
+    8: [39],  # 拇指掌指关节屈伸
+    9: [43],  # 拇指指间关节屈伸
+    10: [19, 28],  # 小拇指与无名指掌指关节外展内收
+    11: [32, 35],  # 无名指近节指间关节屈伸
+    12: [23, 26],  # 小指掌指关节外展内收
+    13: [29],  # 无名指掌指关节屈伸
+    14: [20],  # 小指掌指关节屈伸
+}
+
+# MANO模型文件：所有程序共用仓库根目录 mano/ 下由 mano_numpy.py 转换得到的 .npz
+MANO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "mano")
+MANO_RIGHT_MODEL = os.path.join(MANO_DIR, "MANO_RIGHT.npz")
+MANO_LEFT_MODEL = os.path.join(MANO_DIR, "MANO_LEFT.npz")
+# MANO的20关节URDF骨架（每个刚性连杆一个STL网格），link_idxs.json 为各连杆对应的MANO顶点组
+MANO_URDF = os.path.join(MANO_DIR, "mano.urdf")
+MANO_LINK_IDXS = os.path.join(MANO_DIR, "link_idxs.json")
+
+# 手势姿态库（pose_library.PoseLibrary），界面中“保存为手势”写入，可视化器据此吸附到最接近的标准手势
+POSE_LIBRARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pose_library.json")
+POSE_SNAP_DISTANCE = 0.05  # 24维拉伸率与已保存手势的欧氏距离小于该值时显示该手势，0表示不吸附
+POSE_LIBRARY_RELOAD_INTERVAL = 1.0  # 可视化器检查姿态库文件是否更新的间隔(秒)
+
+# 可视化渲染节奏配置（render_pacing 使用）
+VISUALIZER_REFRESH_RATE = 60.0  # 渲染节拍(Hz)，与显示器刷新率一致
+VISUALIZER_POSE_TOLERANCE = 1e-3  # PCA姿态最大变化小于该值时跳过MANO计算和重绘
+VISUALIZER_REPORT_INTERVAL = 5.0  # 打印渲染帧率和延迟统计的间隔(秒)
+DUAL_HAND_SPACING = 0.25  # 双手同窗渲染时左右手中心的间距(米)
+VISUALIZER_INTERPOLATION = True  # 渲染端按帧序号在收到的帧之间插值/短暂外推，平滑WiFi成批到达造成的卡顿
+VISUALIZER_INTERP_DELAY = 0.03  # 插值的播放延迟(秒)：显示的姿态比最早可能收到该帧的时刻最多晚这么多
+VISUALIZER_MAX_EXTRAPOLATION = 0.05  # 最多向后外推的时间(秒)，超过后保持最后的姿态
+VISUALIZER_RENDER_MODE = "mano"  # 默认渲染模式: "mano" 完整蒙皮网格, "skeleton" URDF刚性连杆（低功耗机器），窗口中按M切换
+
+# 灵巧手控制配置（hand_controller 使用）
+HAND_BACKEND = os.environ.get("HAND_BACKEND", "stark")  # "stark" 真实SDK，"mock" 本地模拟（mock_stark，无需灵巧手）
+HAND_PORT = "COM5"  # 灵巧手串口
+HAND_CONTROL_RATE = 1000  # 控制线程节拍(Hz)，实际发送频率受串口速度限制，多余的目标被合并
+HAND_FILTER_FACTOR = 0.25  # 每10ms向目标位置逼近的比例，按控制频率换算
+HAND_POSITION_DEADBAND = 5  # 每个手指的目标变化都小于该值(0-1000)时不发送命令
+HAND_SINGLE_FINGER_WRITES = True  # 只有一个手指变化时只写该手指的寄存器
+HAND_TELEMETRY_RATE = 50  # 电机状态(位置/速度/电流)轮询频率(Hz)，只使用命令之间的空闲总线时间，0表示不轮询
+HAND_TELEMETRY_DISPLAY_INTERVAL = 200  # 界面刷新灵巧手状态的间隔(毫秒)
+HAND_COMMAND_TIMEOUT = 1.0  # 阻塞命令等待设备应答的超时(秒)
+HAND_REPORT_INTERVAL = 5.0  # 打印命令频率和往返时间统计的间隔(秒)
+HAND_MOCK_LATENCY = 0.001  # 模拟灵巧手每个事务除线路时间外的固定延迟(秒)，约为USB串口和设备处理的开销
+HAND_MOCK_JITTER = 0.0005  # 模拟灵巧手附加随机延迟的上限(秒)
@@ -1,91 +1,141 @@
 # 导入所需的库
 
-import struct  # 用于解析二进制数据
+import threading  # 读取线程与GUI线程之间的互斥锁
 import numpy as np  # 用于数组处理
 import time  # 用于时间相关功能
 from collections import deque  # 用于高效队列操作
 # 导入PyQt5相关组件用于GUI界面
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QHBoxLayout,
-                             QLabel, QVBoxLayout, QFrame, QPushButton)
+                             QLabel, QVBoxLayout, QFrame, QPushButton, QComboBox, QInputDialog)
 
-from PyQt5.QtCore import Qt, QTimer  # Qt核心功能和定时器
-from PyQt5.QtGui import QColor, QPalette  # Qt图形界面相关
+from PyQt5.QtCore import Qt, QTimer, QRectF, QPointF, QThread, pyqtSignal  # Qt核心功能、定时器和线程
+from PyQt5.QtGui import QColor, QPalette, QImage, QPainter, QPen, QFont  # Qt图形界面相关
 import csv, os
 import config_utils
 import perception_data_processor
+import calibration_store
+import frame_source
+import glove_mapping
+import pose_library
 
 
 class HighSpeedReceiver:
-    """高速数据接收器类，负责从网络接收和解析数据"""
+    """高速数据接收器类，负责从帧源读取数据并维护最新帧和FPS"""
 
     def __init__(self):
         """初始化接收器"""
-        self.buffer = bytearray()  # 创建字节缓冲区用于存储接收到的数据
         self.fps_tracker = deque(maxlen=30)  # 创建长度为30的双端队列用于追踪FPS
         self.latest_reversed_data = [0] * config_utils.TOTAL_CELLS  # 初始化24个0作为最新数据
+        self.latest_frame = None  # 最近一帧原始(未反转)数据
 
-    def receive(self, sock):
-        """从socket接收数据并解析"""
+    def receive(self, source):
+        """从帧源接收数据并解析，返回最后一帧原始数据（兼容旧的轮询调用方式）"""
+        frames = self.receive_frames(source)
+        if frames is None or len(frames) == 0:  # 连接关闭或本次没有完整帧
+            return None
+        return self.latest_frame  # 返回提取到的帧
+
+    def receive_frames(self, source):
+        """
+        从帧源(frame_source.FrameSource)阻塞读取一次，解析出本次收到的全部完整帧
+
+        :return: (N, 24) 的每行反转展平后的电压数组；连接关闭或出错时返回None
+        """
         try:
-            data = sock.recv(4096)  # 从socket接收最多4096字节数据
-            if not data:  # 如果没有接收到数据，返回None
-                return None
-            self.buffer.extend(data)  # 将接收到的数据添加到缓冲区
-
-            frame = None  # 初始化frame变量
-            while True:  # 循环提取帧数据
-                extracted_frame = self._extract_frame()  # 直接调用私有方法提取一帧数据
-                if extracted_frame is None:  # 如果没有提取到帧，跳出循环
-                    break
-                frame = extracted_frame  # 只保留最后一帧
-                self.fps_tracker.append(time.time())  # 记录当前时间用于FPS计算
-
-            if frame is not None:  # 如果成功提取到帧
-                # 将每行反转后，直接展平成一个列表
-                flat_data = []  # 创建空列表存储展平数据
-                for row in frame:  # 遍历每一行
-                    flat_data.extend(row[::-1].tolist())  # 反转行并直接扩展到大列表
-                self.latest_reversed_data = flat_data[:config_utils.TOTAL_CELLS]  # 确保不超过24个元素
-
-            return frame  # 返回提取到的帧
+            frames = source.read_frames()  # 阻塞等待数据到达，期间不占用CPU；一次读取可能包含多帧
+            if frames is None or len(frames) == 0:  # 连接关闭或超时
+                return frames
+
+            now = time.time()
+            self.fps_tracker.extend([now] * min(len(frames), self.fps_tracker.maxlen))  # 记录当前时间用于FPS计算
+            self.latest_frame = frames[-1].reshape((config_utils.ROWS, config_utils.COLS))
+            reversed_frames = frame_source.reverse_rows(frames)  # 将每行反转后展平，得到 (N, 24)
+            self.latest_reversed_data = reversed_frames[-1].tolist()
+            return reversed_frames
         except Exception as e:  # 捕获异常
             print(f"Receive error: {e}")  # 打印错误信息
             return None  # 返回None
 
-    def _extract_frame(self):
-        """从缓冲区中提取一帧数据"""
-        start = self.buffer.find(b'\xAA')  # 查找帧头标识0xAA
-        if start == -1:  # 如果没有找到帧头，返回None
-            return None
-
-        if len(self.buffer) < start + 3:  # 如果缓冲区数据不够，返回None
-            return None
-
-        # 解析数据长度，使用小端格式
-        data_len = struct.unpack('<H', self.buffer[start + 1:start + 3])[0]
-        total_len = 3 + data_len + 1  # 计算总长度(帧头3字节+数据+帧尾1字节)
-
-        if len(self.buffer) < start + total_len:  # 如果缓冲区数据不够，返回None
-            return None
-
-        if self.buffer[start + total_len - 1] != 0x55:  # 检查帧尾是否正确
-            print("Frame tail error!")  # 打印帧尾错误信息
-            del self.buffer[:start + total_len]  # 删除错误数据
-            return None
-
-        # 提取有效数据
-        data = self.buffer[start + 3:start + 3 + data_len]
-        del self.buffer[:start + total_len]  # 从缓冲区删除已处理数据
-
-        # 将数据转换为numpy数组并重塑为指定形状
-        return np.frombuffer(data, dtype=np.float32).reshape((config_utils.ROWS, config_utils.COLS))
-
     def get_fps(self):
         """计算并返回FPS(每秒帧数)"""
         if len(self.fps_tracker) < 2:  # 如果跟踪器中数据不足，返回0
             return 0
+        time_diff = self.fps_tracker[-1] - self.fps_tracker[0]
+        if time_diff <= 0:  # 同一次读取中的多帧时间戳相同
+            return 0
         # 计算FPS：(帧数-1) / (最后时间-最初时间)
-        return (len(self.fps_tracker) - 1) / (self.fps_tracker[-1] - self.fps_tracker[0])
+        return (len(self.fps_tracker) - 1) / time_diff
+
+
+class ReceiverThread(QThread):
+    """
+    唯一的帧源读取线程
+
+    线程阻塞在帧源的读取上，数据到达才被唤醒，空闲时不占用CPU。
+    每次读取解析出的全部帧先交给frame_callback（在读取线程中执行，用于计算拉伸率、发布到总线等），
+    再合并成批交给GUI线程。GUI线程处理完上一批之前不会再发信号，
+    积压的帧会合并到下一批里，因此GUI事件队列中最多只有一个待处理的通知，界面延迟有上界。
+    """
+    frames_ready = pyqtSignal()  # 有新的一批帧可取
+    connection_closed = pyqtSignal()  # 连接断开
+
+    def __init__(self, receiver, source, frame_callback=None, parent=None):
+        """
+        :param receiver: HighSpeedReceiver实例
+        :param source: 已打开的帧源(frame_source.FrameSource)
+        :param frame_callback: 可选回调，参数为 (N, 24) 电压数组，在读取线程中对每批帧调用一次
+        """
+        super().__init__(parent)
+        self.receiver = receiver
+        self.source = source
+        self.frame_callback = frame_callback
+        self.running = False
+        self.lock = threading.Lock()
+        self.pending = []  # 尚未被GUI取走的帧批次
+        self.notify_pending = False  # 是否已有一个frames_ready信号在等待GUI处理
+
+    def run(self):
+        """读取循环"""
+        self.running = True
+        while self.running:
+            frames = self.receiver.receive_frames(self.source)
+            if frames is None:  # 连接关闭或出错
+                break
+            if len(frames) == 0:  # 读取超时或只收到半帧
+                continue
+
+            if self.frame_callback is not None:
+                try:
+                    self.frame_callback(frames)
+                except Exception as e:
+                    print(f"Frame callback error: {e}")
+
+            with self.lock:
+                self.pending.append(frames)
+                if self.notify_pending:  # GUI还没取走上一批，合并到下一次
+                    continue
+                self.notify_pending = True
+            self.frames_ready.emit()
+        self.running = False
+        self.connection_closed.emit()
+
+    def take_frames(self):
+        """GUI线程调用：取走自上次以来收到的全部帧，返回 (N, 24) 数组"""
+        with self.lock:
+            pending = self.pending
+            self.pending = []
+            self.notify_pending = False
+        if not pending:
+            return np.empty((0, config_utils.TOTAL_CELLS))
+        if len(pending) == 1:
+            return pending[0]
+        return np.concatenate(pending)
+
+    def stop(self):
+        """停止读取：唤醒阻塞中的读取并等待线程退出"""
+        self.running = False
+        self.source.interrupt()
+        self.wait(1000)
 
 
 class DataCell(QFrame):
@@ -158,11 +208,151 @@ class DataCell(QFrame):
         self.data_label.setText(f"{int(value)}")
 
 
+def build_color_lut(size=256):
+    """
+    预先计算颜色查找表 (从绿色到红色的渐变，与DataCell一致)
+
+    :return: (ARGB32颜色数组, 是否使用黑色文字的布尔数组)
+    """
+    ratio = np.linspace(0.0, 1.0, size)
+    red = (255 * ratio).astype(np.uint32)
+    green = (255 * (1 - ratio)).astype(np.uint32)
+    blue = np.zeros(size, dtype=np.uint32)
+    colors = np.uint32(0xFF000000) | (red << 16) | (green << 8) | blue
+    # 根据背景亮度选择文字颜色，使用加权平均算法
+    black_text = (red * 0.299 + green * 0.587 + blue * 0.114) > 150
+    return colors, black_text
+
+
+class HeatmapWidget(QWidget):
+    """
+    热力图控件：一个控件绘制全部数据行，代替每行24个DataCell
+
+    数据通过NumPy数组整行写入，颜色经查找表映射到QImage后一次性缩放绘制；
+    重绘由定时器按屏幕刷新率节流，数据更新再快也不会超过屏幕刷新频率。
+    """
+
+    LABEL_WIDTH = 150  # 左侧行标签宽度
+    CELL_SPACING = 2  # 单元格间距
+
+    def __init__(self, row_labels, cols=config_utils.TOTAL_CELLS, value_range=(0, 3300), parent=None):
+        """
+        :param row_labels: 每一行左侧显示的标签文本
+        :param cols: 每行的单元格数量
+        :param value_range: 颜色映射的取值范围，数值会被限制在此范围内
+        """
+        super().__init__(parent)
+        self.row_labels = list(row_labels)
+        self.rows = len(self.row_labels)
+        self.cols = cols
+        self.value_min, self.value_max = value_range
+
+        self.values = np.zeros((self.rows, self.cols), dtype=np.float64)
+        self.lut, self.lut_black_text = build_color_lut()
+        # QImage直接引用这块内存，每个像素对应一个单元格
+        self.pixels = np.zeros((self.rows, self.cols), dtype=np.uint32)
+        self.image = QImage(self.pixels.data, self.cols, self.rows, self.cols * 4, QImage.Format_RGB32)
+        self.text_is_black = np.ones((self.rows, self.cols), dtype=bool)
+        self.texts = [["0"] * self.cols for _ in range(self.rows)]
+        self.dirty = True
+
+        self.value_font = QFont()
+        self.value_font.setBold(True)
+        self.value_font.setPixelSize(14)
+        self.index_font = QFont()
+        self.index_font.setBold(True)
+        self.index_font.setPixelSize(12)
+        self.label_font = QFont()
+        self.label_font.setBold(True)
+        self.label_font.setPixelSize(18)
+
+        self.index_texts = [f"{col + 1}" for col in range(self.cols)]
+        self.setMinimumHeight(60 * self.rows)
+
+        # 按屏幕刷新率节流重绘
+        screen = QApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen is not None else 60.0
+        self.repaint_timer = QTimer(self)
+        self.repaint_timer.timeout.connect(self._flush)
+        self.repaint_timer.start(max(1, int(1000 / max(refresh_rate, 1.0))))
+
+    def set_row(self, row, values):
+        """更新一整行数据，只标记为待重绘，不会立刻触发绘制"""
+        count = min(len(values), self.cols)
+        if count == 0:
+            return
+        self.values[row, :count] = values[:count]
+        self.dirty = True
+
+    def set_rows(self, rows_values):
+        """一次更新多行数据，rows_values按行顺序排列，None表示该行不更新"""
+        for row, values in enumerate(rows_values):
+            if values is not None:
+                self.set_row(row, values)
+
+    def _flush(self):
+        """定时器回调：有新数据时重新映射颜色并请求重绘"""
+        if not self.dirty or not self.isVisible():
+            return
+        self.dirty = False
+        clipped = np.clip(self.values, self.value_min, self.value_max)
+        lut_index = ((clipped - self.value_min) * ((len(self.lut) - 1) / (self.value_max - self.value_min))).astype(np.intp)
+        self.pixels[:] = self.lut[lut_index]
+        self.text_is_black[:] = self.lut_black_text[lut_index]
+        self.texts = [[str(v) for v in row] for row in clipped.astype(np.int64).tolist()]
+        self.update()
+
+    def paintEvent(self, event):
+        """绘制所有行：颜色块由QImage缩放得到，再叠加数值和序号文本"""
+        painter = QPainter(self)
+        width = self.width() - self.LABEL_WIDTH
+        row_height = self.height() / self.rows
+        cell_width = width / self.cols
+
+        # 一次绘制全部颜色块（每个像素放大为一个单元格，不做插值）
+        painter.drawImage(QRectF(self.LABEL_WIDTH, 0, width, self.height()), self.image)
+
+        # 单元格间的分隔线
+        painter.setPen(QPen(self.palette().color(QPalette.Window), self.CELL_SPACING))
+        for col in range(1, self.cols):
+            x = self.LABEL_WIDTH + col * cell_width
+            painter.drawLine(QPointF(x, 0), QPointF(x, self.height()))
+        for row in range(1, self.rows):
+            y = row * row_height
+            painter.drawLine(QPointF(self.LABEL_WIDTH, y), QPointF(self.width(), y))
+
+        # 行标签
+        painter.setPen(QColor("#333"))
+        painter.setFont(self.label_font)
+        for row in range(self.rows):
+            painter.drawText(QRectF(10, row * row_height, self.LABEL_WIDTH - 10, row_height),
+                             Qt.AlignLeft | Qt.AlignVCenter | Qt.TextWordWrap, self.row_labels[row])
+
+        # 数值文本 (根据背景亮度选择黑色或白色)
+        painter.setFont(self.value_font)
+        for row in range(self.rows):
+            top = row * row_height
+            for col in range(self.cols):
+                painter.setPen(Qt.black if self.text_is_black[row, col] else Qt.white)
+                painter.drawText(QRectF(self.LABEL_WIDTH + col * cell_width, top, cell_width, row_height * 0.6),
+                                 Qt.AlignHCenter | Qt.AlignBottom, self.texts[row][col])
+
+        # 单元格序号
+        painter.setPen(Qt.black)
+        painter.setFont(self.index_font)
+        for row in range(self.rows):
+            top = row * row_height + row_height * 0.6
+            for col in range(self.cols):
+                painter.drawText(QRectF(self.LABEL_WIDTH + col * cell_width, top, cell_width, row_height * 0.4),
+                                 Qt.AlignHCenter | Qt.AlignTop, self.index_texts[col])
+        painter.end()
+
+
 class DataDisplay(QMainWindow):
     """主显示窗口类"""
 
-    def __init__(self, receiver, conn):
-        """初始化显示窗口"""
+    def __init__(self, receiver, source):
+        """初始化显示窗口，调用start_receiving()后开始读取数据"""
         super().__init__()  # 调用父类初始化
 
         self.status_label = None
@@ -171,60 +361,113 @@ class DataDisplay(QMainWindow):
         self.btn3 = None
         self.btn2 = None
         self.btn1 = None
-        self.cells3 = None
-        self.cells2 = None
-        self.cells = None
+        self.heatmap = None
         self.fps_label = None
+        self.hand_label = None
+        self.hand_telemetry = None  # 读取灵巧手最新电机状态快照的无参函数
+        self.hand_timer = None
+        self.user_combo = None
         self.receiver = receiver  # 保存接收器对象
-        self.conn = conn  # 保存连接对象
+        self.source = source  # 保存已打开的帧源
+        self.reader_thread = None  # 帧源读取线程
         self.data_storage = []  # 数据存储列表
         self.is_recording = False  # 录制状态标志
 
         self.my_stretch_ratios = []  # 向外传递的数据
+        self.filtered_stretch_ratios = None  # 读取线程写入的最新滤波后拉伸率，与可视化器收到的数据一致
         self.resistances_list = []
+        self.pose_library = None  # 第一次保存手势时打开 config_utils.POSE_LIBRARY_PATH
+        self.pose_mapping = None  # 拉伸率到PCA姿态的映射，与可视化器的默认映射相同
 
         # 创建可拉伸外骨骼实例
         self.exoskeleton = perception_data_processor.StretchableExoskeleton()
+
+        # 校准数据存储：首次运行时导入目录中旧的CSV校准文件
+        self.calibration_store = calibration_store.CalibrationStore()
+        self.calibration_user = config_utils.CALIBRATION_USER
+        if not self.calibration_store.users():
+            imported = self.calibration_store.import_csv_directory('.', self.exoskeleton.voltages_to_resistances)
+            print(f"已导入{imported}个旧校准CSV文件到{self.calibration_store.path}")
+
         self.initUI()  # 初始化用户界面
-        # 尝试加载已存在的校准文件
+        # 加载当前用户最新的校准数据
         self.load_existing_calibration_files()
 
-        # 设置定时器刷新数据
-        self.timer = QTimer(self)  # 创建定时器
-        self.timer.timeout.connect(self.update_data)  # 连接超时信号到更新函数
-        self.timer.start(20)  # 启动定时器，10毫秒间隔
+        # 定时检查其他进程写入的新校准记录（热重载）
+        self.calibration_timer = QTimer(self)
+        self.calibration_timer.timeout.connect(self.check_calibration_updates)
+        self.calibration_timer.start(config_utils.CALIBRATION_POLL_INTERVAL)
+
+    def start_receiving(self, frame_callback=None):
+        """
+        启动帧源读取线程，数据到达时由信号驱动界面刷新
+
+        :param frame_callback: 可选回调，在读取线程中对每批 (N, 24) 电压帧调用一次
+        """
+        self.reader_thread = ReceiverThread(self.receiver, self.source, frame_callback)
+        self.reader_thread.frames_ready.connect(self.update_data)
+        self.reader_thread.connection_closed.connect(self.on_connection_closed)
+        self.reader_thread.start()
+
+    def stop_receiving(self):
+        """停止帧源读取线程"""
+        if self.reader_thread is not None:
+            self.reader_thread.stop()
+            self.reader_thread = None
+
+    def on_connection_closed(self):
+        """连接断开时在状态栏提示"""
+        self.status_label.setText("系统状态: 连接已断开")
+        self.status_label.setStyleSheet("font-size: 14px; font-weight: bold; color: #cc0000;")
+
+    def closeEvent(self, event):
+        """关闭窗口时停止读取线程"""
+        self.stop_receiving()
+        self.calibration_store.close()
+        super().closeEvent(event)
 
     def load_existing_calibration_files(self):
-        """尝试加载已存在的校准文件"""
-        # 查找最新的初始值和预拉伸值文件
-        initial_files = [f for f in os.listdir('.') if f.startswith('initial_values_') and f.endswith('.csv')]
-        pre_stretch_files = [f for f in os.listdir('.') if f.startswith('pre_stretch_values_') and f.endswith('.csv')]
-
-        # 如果找到文件，加载最新的
-        latest_initial = None
-        latest_pre_stretch = None
-
-        if initial_files:
-            latest_initial = sorted(initial_files)[-1]  # 按文件名排序，取最新的
-            print(f"找到初始值文件: {latest_initial}")
-
-        if pre_stretch_files:
-            latest_pre_stretch = sorted(pre_stretch_files)[-1]  # 按文件名排序，取最新的
-            print(f"找到预拉伸值文件: {latest_pre_stretch}")
+        """从校准存储中加载当前用户最新的初始值和预拉伸值（内存缓存查找，不扫描目录）"""
+        initial, pre_stretch = self.calibration_store.latest_pair(self.calibration_user)
+        if initial is None or pre_stretch is None:
+            print(f"用户 {self.calibration_user} 缺少校准记录，请记录初始值和预拉伸值")
+        for record in (initial, pre_stretch):
+            if record is not None:
+                print(f"找到{record.kind}校准: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.created_at))}")
 
         # 加载校准数据
-        self.exoskeleton.load_calibration_data(latest_initial, latest_pre_stretch)
+        self.exoskeleton.clear_calibration()
+        self.exoskeleton.apply_calibration(initial, pre_stretch)
+
+    def check_calibration_updates(self):
+        """数据库被其他进程修改时重新加载校准数据"""
+        if self.calibration_store.poll():
+            print("检测到校准数据更新，重新加载")
+            self.load_existing_calibration_files()
+            self.refresh_user_list()
+            self.update_status()
+
+    def switch_user(self, user):
+        """切换受试者，直接使用缓存中该用户最新的校准记录"""
+        user = user.strip()
+        if not user or user == self.calibration_user:
+            return
+        self.calibration_user = user
+        print(f"切换用户: {user}")
+        self.load_existing_calibration_files()
+        self.refresh_user_list()
+        self.update_status()
 
-        if self.exoskeleton.is_calibrated():
-            print("系统已完成校准")
-            self.status_label.setText("系统状态: 已调用之前的校准文件 - 可进行拉伸量计算")
-            self.status_label.setStyleSheet("font-size: 14px; font-weight: bold; color: #008800;")
-            initial_info = self.exoskeleton.get_initial_stretch_info()
-            if initial_info:
-                avg_initial_stretch = np.mean(initial_info)
-                print(f"平均初始拉伸比例: {avg_initial_stretch:.4f}")
-        else:
-            print("系统未完成校准，请先记录初始值和预拉伸值")
+    def refresh_user_list(self):
+        """刷新用户下拉框"""
+        users = self.calibration_store.users()
+        if self.calibration_user not in users:
+            users.append(self.calibration_user)
+        self.user_combo.blockSignals(True)
+        self.user_combo.clear()
+        self.user_combo.addItems(users)
+        self.user_combo.setCurrentText(self.calibration_user)
+        self.user_combo.blockSignals(False)
 
     def initUI(self):
         """初始化用户界面"""
@@ -235,65 +478,39 @@ class DataDisplay(QMainWindow):
         main_layout = QVBoxLayout()
         central_widget.setLayout(main_layout)
 
-        # 定义行配置：(标签文本, 单元格列表属性名)
-        row_configs = [
-            ("原始数据ADC电压:", "cells"),
-            ("当前可拉伸电阻阻值:", "cells2"),
-            ("当前拉伸率(0-1024):", "cells3")
-        ]
-
-        # 创建数据行
-        for label_text, cells_attr in row_configs:
-            row_layout = QHBoxLayout()
-            row_layout.setSpacing(5)
-            row_layout.setContentsMargins(10, 5, 10, 5)
-
-            # 添加标签 - 增大字体并支持自动换行
-            label = QLabel(label_text)
-            label.setStyleSheet("""
-                font-size: 18px; 
-                font-weight: bold; 
-                color: #333; 
-                min-width: 150px;
-                max-width: 150px;
-                word-wrap: break-word;
-                qproperty-alignment: AlignLeft AlignVCenter;
-            """)
-            label.setWordWrap(True)  # 启用自动换行
-            label.setAlignment(Qt.AlignLeft | Qt.AlignTop)  # 顶部对齐
-            row_layout.addWidget(label)
-
-            # 创建单元格容器
-            cells_container = QHBoxLayout()
-            cells_container.setSpacing(2)
-            cells_container.setContentsMargins(0, 0, 0, 0)
-
-            # 创建单元格
-            cells = []
-            for i in range(config_utils.TOTAL_CELLS):
-                cell = DataCell(i)
-                cells_container.addWidget(cell)
-                cells.append(cell)
-
-            # 将单元格容器添加到行布局
-            row_layout.addLayout(cells_container)
-
-            # 设置单元格列表属性
-            setattr(self, cells_attr, cells)
-            main_layout.addLayout(row_layout)
+        # 三行数据由一个热力图控件统一绘制：原始电压、电阻、拉伸率
+        self.heatmap = HeatmapWidget([
+            "原始数据ADC电压:",
+            "当前可拉伸电阻阻值:",
+            "当前拉伸率(0-1024):"
+        ])
+        heatmap_layout = QHBoxLayout()
+        heatmap_layout.setContentsMargins(10, 5, 10, 5)
+        heatmap_layout.addWidget(self.heatmap)
+        main_layout.addLayout(heatmap_layout)
 
         # 创建按钮水平布局
         button_layout = QHBoxLayout()
         button_layout.setSpacing(10)
         button_layout.setContentsMargins(10, 5, 10, 5)
 
+        # 受试者选择（可输入新用户名后回车）
+        button_layout.addWidget(QLabel("用户:"))
+        self.user_combo = QComboBox()
+        self.user_combo.setEditable(True)
+        self.user_combo.setMinimumWidth(120)
+        self.user_combo.activated[str].connect(self.switch_user)
+        button_layout.addWidget(self.user_combo)
+        self.refresh_user_list()
+
         # 创建按钮
         buttons = [
             ("记录初始值", self.button1_callback),
             ("记录预拉伸值", self.button2_callback),
             ("重新加载校准文件", self.button3_callback),
             ("记录当前手势电阻值", self.button4_callback),
-            ("记录当前手势拉伸率", self.button5_callback)
+            ("记录当前手势拉伸率", self.button5_callback),
+            ("保存为手势", self.button6_callback)
         ]
 
         for text, callback in buttons:
@@ -317,26 +534,53 @@ class DataDisplay(QMainWindow):
         self.fps_label.setStyleSheet("font-size: 14px; font-weight: bold; color: #333;")
         main_layout.addWidget(self.fps_label)
 
-    def save_calibration_data(self, data, file_prefix):
-        """辅助函数：保存校准数据到CSV文件"""
+        # 灵巧手电机状态（设置遥测来源后显示）
+        self.hand_label = QLabel("")
+        self.hand_label.setAlignment(Qt.AlignCenter)
+        self.hand_label.setStyleSheet("font-size: 13px; color: #333;")
+        self.hand_label.hide()
+        main_layout.addWidget(self.hand_label)
+
+    def set_hand_telemetry(self, read_snapshot):
+        """
+        定时显示灵巧手的电机状态
+
+        :param read_snapshot: 无参函数，返回最新的 hand_controller.MotorSnapshot 或None，不应阻塞
+        """
+        self.hand_telemetry = read_snapshot
+        self.hand_label.setText("灵巧手: 等待电机状态")
+        self.hand_label.show()
+        if self.hand_timer is None:
+            self.hand_timer = QTimer(self)
+            self.hand_timer.timeout.connect(self.update_hand_telemetry)
+            self.hand_timer.start(config_utils.HAND_TELEMETRY_DISPLAY_INTERVAL)
+
+    def update_hand_telemetry(self):
+        """读取缓存的电机状态快照并更新显示（不访问串口）"""
+        snapshot = self.hand_telemetry()
+        if snapshot is None:
+            return
+        age = (time.time() - snapshot.timestamp) * 1000.0
+        self.hand_label.setText(
+            f"灵巧手: 位置 {[int(v) for v in snapshot.positions]}  速度 {[int(v) for v in snapshot.speeds]}  "
+            f"电流 {[int(v) for v in snapshot.currents]}  ({age:.0f} ms前)")
+
+    def save_calibration_record(self, data, kind):
+        """辅助函数：保存一条校准记录（同时保存预先计算的电阻）并应用到外骨骼"""
         try:
-            # 生成文件名（带时间戳）
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            filename = f"{file_prefix}_{timestamp}.csv"
-            # 创建CSV文件并写入数据
-            with open(filename, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                # 写入表头
-                headers = [f"Sensor_{i + 1}" for i in range(config_utils.TOTAL_CELLS)]
-                writer.writerow(headers)
-                # 写入数据
-                writer.writerow([f"{val:.2f}" for val in data])
-            print(f"{file_prefix}已保存到文件: {filename}")
+            record = self.calibration_store.add(self.calibration_user, config_utils.CALIBRATION_DEVICE, kind,
+                                                data, self.exoskeleton.voltages_to_resistances(data))
+            print(f"{kind}校准已保存到 {self.calibration_store.path} (用户: {self.calibration_user})")
             print(f"保存的数据: {data}")
-            return filename, timestamp
+            if kind == calibration_store.KIND_INITIAL:
+                self.exoskeleton.apply_calibration(initial=record)
+            else:
+                self.exoskeleton.apply_calibration(pre_stretch=record)
+            self.refresh_user_list()
+            return time.strftime("%Y%m%d_%H%M%S", time.localtime(record.created_at))
         except Exception as e:
-            print(f"保存{file_prefix}时出错: {e}")
-            return None, None
+            print(f"保存{kind}校准时出错: {e}")
+            return None
 
     def save_calibration_data_with_label(self, data, file_prefix, label_value):
         """增强版辅助函数：保存校准数据到CSV文件，添加label表头和对应的值，并保存到label/label_value对应的文件夹下"""
@@ -379,38 +623,34 @@ class DataDisplay(QMainWindow):
             return None, None
 
     def button1_callback(self):
-        """按钮1回调函数：记录未拉伸状态的初始值到CSV文件"""
+        """按钮1回调函数：记录未拉伸状态的初始值到校准数据库（CalibrationStore）"""
         print("点击按钮：记录未拉伸状态的初始值")
         try:
             # 获取当前的24个传感器数据
             current_data = self.receiver.latest_reversed_data.copy()
-            # 保存数据
-            filename, timestamp = self.save_calibration_data(current_data, "initial_values")
-            if filename:
+            # 保存数据并更新外骨骼类的初始值
+            timestamp = self.save_calibration_record(current_data, calibration_store.KIND_INITIAL)
+            if timestamp:
                 # 更新按钮状态和文本
                 self.btn1.setText(f"已保存初始值 ({timestamp})")
                 self.btn1.setEnabled(False)
-                # 更新外骨骼类的初始值
-                self.exoskeleton.load_calibration_data(filename, None)
                 # 更新状态显示
                 self.update_status()
         except Exception as e:
             print(f"保存初始值时出错: {e}")
 
     def button2_callback(self):
-        """按钮2回调函数：记录预拉伸值到CSV文件"""
+        """按钮2回调函数：记录预拉伸值到校准数据库（CalibrationStore）"""
         print("点击按钮：记录预拉伸值")
         try:
             # 获取当前的24个传感器数据
             current_data = self.receiver.latest_reversed_data.copy()
-            # 保存数据
-            filename, timestamp = self.save_calibration_data(current_data, "pre_stretch_values")
-            if filename:
+            # 保存数据并更新外骨骼类的预拉伸值
+            timestamp = self.save_calibration_record(current_data, calibration_store.KIND_PRE_STRETCH)
+            if timestamp:
                 # 更新按钮状态和文本
                 self.btn2.setText(f"已保存预拉伸值 ({timestamp})")
                 self.btn2.setEnabled(False)
-                # 更新外骨骼类的预拉伸值
-                self.exoskeleton.load_calibration_data(None, filename)
                 # 更新状态显示
                 self.update_status()
         except Exception as e:
@@ -419,6 +659,7 @@ class DataDisplay(QMainWindow):
     def button3_callback(self):
         """按钮3回调函数：重新加载校准文件"""
         print("点击按钮：重新加载校准文件")
+        self.calibration_store.reload()
         self.load_existing_calibration_files()
         self.update_status()
 
@@ -444,6 +685,31 @@ class DataDisplay(QMainWindow):
         self.save_calibration_data_with_label(self.my_stretch_ratios, "my_stretch_ratios",'26')
 
 
+    def button6_callback(self):
+        """按钮6回调函数：把当前拉伸率及其映射的PCA姿态保存到姿态库，可视化器据此吸附到该手势"""
+        if not self.my_stretch_ratios:
+            print("未校准或还没有数据，无法保存手势")
+            return
+        # 先取下当前帧，输入名称期间数据会继续更新；可视化器用滤波后的拉伸率查询姿态库，
+        # 保存时也要用同一份滤波后的数据，单独运行界面没有滤波器时退回显示用的拉伸率
+        filtered = self.filtered_stretch_ratios
+        glove_data = np.array(filtered if filtered is not None else self.my_stretch_ratios)
+        name, ok = QInputDialog.getText(self, "保存为手势", "手势名称:")
+        name = name.strip()
+        if not ok or not name:
+            return
+        try:
+            if self.pose_library is None:
+                self.pose_library = pose_library.PoseLibrary(config_utils.POSE_LIBRARY_PATH)
+                self.pose_mapping = glove_mapping.GloveToManoMapping()
+            else:
+                self.pose_library.reload_if_changed()
+            self.pose_library.add(name, self.pose_mapping.map(glove_data), glove_data)
+            self.pose_library.save()
+            print(f"手势 {name} 已保存到 {config_utils.POSE_LIBRARY_PATH} (共 {len(self.pose_library)} 个)")
+        except Exception as e:
+            print(f"保存手势时出错: {e}")
+
     def update_status(self):
         """更新状态显示"""
         if self.exoskeleton.is_calibrated():
@@ -454,38 +720,30 @@ class DataDisplay(QMainWindow):
             self.status_label.setStyleSheet("font-size: 14px; font-weight: bold; color: #cc0000;")
 
     def update_data(self):
-        """更新数据显示"""
+        """读取线程通知有新帧时更新数据显示，每批只显示最新一帧"""
         try:
-            # 接收数据
-            frame = self.receiver.receive(self.conn)  # 从连接接收数据
-            if frame is not None:  # 如果接收到有效数据
-                # 更新FPS显示
-                fps = self.receiver.get_fps()  # 获取当前FPS
-                self.fps_label.setText(f"FPS: {fps:.1f}")  # 更新FPS标签
-
-                # 更新所有单元格
-                for i, value in enumerate(self.receiver.latest_reversed_data):  # 遍历最新数据
-                    if i < len(self.cells):  # 确保索引有效
-                        self.cells[i].setValue(value)  # 更新单元格值
-                # 如果已完成校准，计算实时拉伸量
-                if self.exoskeleton.is_calibrated():
-                    current_voltages = self.receiver.latest_reversed_data
-                    resistances, stretch_ratios = self.exoskeleton.calculate_real_time_stretch(current_voltages)
-                    self.my_stretch_ratios = stretch_ratios
-                    self.resistances_list = resistances
-                    # print(stretch_ratios)
-                    # 更新所有单元格
-                    for i, value in enumerate(resistances):  # 遍历最新数据
-                        if i < len(self.cells2):  # 确保索引有效
-                            self.cells2[i].setValue(value)  # 更新单元格值
-                    for i, value in enumerate(stretch_ratios):  # 遍历最新数据
-                        if i < len(self.cells3):  # 确保索引有效
-                            self.cells3[i].setValue(value)  # 更新单元格值
-                    if stretch_ratios:
-                        # 这里可以添加实时拉伸量的显示逻辑
-                        # 例如更新状态栏显示平均拉伸量
-                        avg_stretch = np.mean(stretch_ratios)
-                        # 可以在这里添加更多的实时数据显示逻辑
-                        pass
+            if self.reader_thread is None:
+                return
+            frames = self.reader_thread.take_frames()  # 取走积压的全部帧
+            if len(frames) == 0:
+                return
+            latest_voltages = frames[-1]
+
+            # 更新FPS显示
+            fps = self.receiver.get_fps()  # 获取当前FPS
+            self.fps_label.setText(f"FPS: {fps:.1f}")  # 更新FPS标签
+
+            # 更新热力图第一行（原始电压）
+            self.heatmap.set_row(0, latest_voltages)
+            # 如果已完成校准，计算实时拉伸量
+            if self.exoskeleton.is_calibrated():
+                # 读取线程也在用同一个 exoskeleton 计算并更新基线跟踪器；这里只显示，
+                # 必须保持 update_baseline=False（默认），否则同一帧会被跟踪器计入两次且跨线程写基线
+                resistances, stretch_ratios = self.exoskeleton.calculate_stretch_batch(latest_voltages)
+                self.my_stretch_ratios = stretch_ratios.tolist()
+                self.resistances_list = resistances.tolist()
+                # 更新热力图第二、三行（电阻、拉伸率）
+                self.heatmap.set_row(1, resistances)
+                self.heatmap.set_row(2, stretch_ratios)
         except Exception as e:  # 捕获异常
             print(f"Update error: {e}")  # 打印错误信息
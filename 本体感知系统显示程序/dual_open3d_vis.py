@@ -0,0 +1,179 @@
+"""
+双手同窗可视化
+
+两只手共用一个Open3D窗口和一个渲染循环，不再需要两个 VisualizerThread、两个窗口各自轮询事件和绘制。
+- 模型数据只加载一次：没有左手模型文件时，左手由右手模型 clone() 后沿x轴镜像得到，
+  模板、蒙皮权重、姿态基等只读数组两只手共用，法向量邻接表也共用
+- 每只手一个 LatestValueSlot，两只手套的数据各自写入，渲染端每个节拍只取各自最新的一帧
+- 每只手独立判断姿态是否变化，只有变化的手重新蒙皮；两只手都没变化时不重绘
+
+用法示例：
+    vis = DualHandVisualizer()
+    vis.update_data('left', glove_left, timestamp)     # 任意线程
+    vis.update_data('right', glove_right, timestamp)
+    vis.run()                                           # 渲染线程/进程
+"""
+
+import os
+
+import numpy as np
+import open3d as o3d
+
+import config_utils
+import glove_mapping
+import mano_numpy
+import mesh_normals
+import render_pacing
+import urdf_skeleton
+from mono_open3d_vis import HandMesh, SkeletonMesh, setup_render_view
+
+HANDS = ('left', 'right')
+
+
+class DualHandVisualizer:
+    """在同一个窗口中显示左右两只MANO手"""
+
+    def __init__(self, model_path_right=config_utils.MANO_RIGHT_MODEL, model_path_left=config_utils.MANO_LEFT_MODEL,
+                 mapping=None, pose_tolerance=config_utils.VISUALIZER_POSE_TOLERANCE,
+                 spacing=config_utils.DUAL_HAND_SPACING, render_mode=config_utils.VISUALIZER_RENDER_MODE,
+                 betas=None):
+        """
+        :param model_path_right: 右手MANO模型文件路径
+        :param model_path_left: 左手MANO模型文件路径，不存在时使用镜像的右手模型
+        :param mapping: 24维手套数据到45维PCA的映射，两只手共用
+        :param pose_tolerance: PCA姿态最大变化不超过该值时跳过该手的MANO计算
+        :param spacing: 左右手中心沿x轴的间距(米)
+        :param render_mode: "mano" 完整蒙皮网格，"skeleton" URDF刚性连杆
+        :param betas: 用户手型的形状参数，两只手共用，None表示标准手型
+        """
+        if not os.path.exists(model_path_right):
+            raise FileNotFoundError(f"Model file {model_path_right} does not exist. "
+                                    f"Run 'python mano_numpy.py <MANO_*.pkl>' to convert the official model first.")
+        self.mapping = glove_mapping.GloveToManoMapping() if mapping is None else mapping
+
+        right_model = mano_numpy.ManoModel(model_path_right, betas=betas)
+        half = spacing / 2.0
+        if render_mode == 'skeleton':
+            # 两只手依次计算，共用一个URDF骨架（连杆网格和运动链缓冲区）
+            urdf_hand = urdf_skeleton.UrdfHand()
+            self.hands = {'right': SkeletonMesh(right_model, offset=[half, 0.0, 0.0], pose_tolerance=pose_tolerance,
+                                                urdf_hand=urdf_hand),
+                          'left': SkeletonMesh(right_model, mirror=True, offset=[-half, 0.0, 0.0],
+                                               pose_tolerance=pose_tolerance, urdf_hand=urdf_hand)}
+        elif render_mode == 'mano':
+            normals = mesh_normals.VertexNormals(right_model.faces, right_model.num_vertices)
+            self.hands = {'right': HandMesh(right_model, normal_estimator=normals, offset=[half, 0.0, 0.0],
+                                            pose_tolerance=pose_tolerance)}
+            if os.path.exists(model_path_left):
+                self.hands['left'] = HandMesh(mano_numpy.ManoModel(model_path_left, betas=betas),
+                                              offset=[-half, 0.0, 0.0], pose_tolerance=pose_tolerance)
+            else:
+                # 只读数据与右手共用，只多一套每帧缓冲区
+                self.hands['left'] = HandMesh(right_model.clone(), normal_estimator=normals, mirror=True,
+                                              offset=[-half, 0.0, 0.0], pose_tolerance=pose_tolerance)
+        else:
+            raise ValueError(f"未知的渲染模式: {render_mode}")
+        self.slots = {side: render_pacing.LatestValueSlot() for side in HANDS}
+        self._versions = dict.fromkeys(HANDS, 0)
+
+        self.vis = o3d.visualization.VisualizerWithKeyCallback()
+        self.vis.create_window(width=1200, height=600, window_name='MANO Hands with Wireframe')
+        for hand in self.hands.values():
+            hand.add_to(self.vis)
+        setup_render_view(self.vis)
+
+    def update_data(self, side, glove_data, timestamp=None):
+        """
+        写入一只手的最新手套数据（可在任意线程调用，不阻塞）
+
+        :param side: 'left' 或 'right'
+        :param glove_data: 24维拉伸率
+        :param timestamp: 接收时间(time.time())，用于统计手套到屏幕的延迟
+        """
+        self.slots[side].put(np.array(glove_data, dtype=np.float64), timestamp)
+
+    def update_hand_pose(self, side, glove_data_24d):
+        """
+        直接更新一只手的网格
+
+        :return: 网格是否被更新（姿态变化在容差内时为False）
+        """
+        if len(glove_data_24d) != config_utils.TOTAL_CELLS:
+            raise ValueError("输入数组长度必须为24")
+        hand = self.hands[side]
+        if not hand.update_pca(self.mapping.map(glove_data_24d)):
+            return False
+        hand.notify(self.vis)
+        return True
+
+    def render_once(self, stats=None):
+        """
+        取两只手各自最新的一帧，更新有变化的手并处理窗口事件
+
+        :param stats: 可选 render_pacing.RenderStats
+        :return: 窗口是否仍然打开
+        """
+        rendered = []
+        for side in HANDS:
+            latest = self.slots[side].take(self._versions[side])
+            if latest is None:
+                continue
+            self._versions[side], glove_data, timestamp = latest
+            if self.update_hand_pose(side, glove_data):
+                rendered.append(timestamp)
+            elif stats is not None:
+                stats.add_skip()
+        if rendered:
+            self.vis.update_renderer()
+        # 处理窗口事件，需要重绘时在这里完成绘制（两只手一次绘制）
+        if not self.vis.poll_events():
+            return False
+        if stats is not None:
+            for timestamp in rendered:
+                stats.add_render(timestamp)
+        return True
+
+    def run(self, should_stop=None, stats=None):
+        """
+        按显示刷新率渲染，直到窗口关闭或 should_stop() 返回True
+
+        :param should_stop: 可选无参函数
+        :param stats: 可选 render_pacing.RenderStats，默认新建并定期打印
+        """
+        stats = render_pacing.RenderStats("双手可视化") if stats is None else stats
+        pacer = render_pacing.FramePacer()
+        try:
+            while should_stop is None or not should_stop():
+                if not self.render_once(stats):
+                    break
+                report = stats.report()
+                if report:
+                    print(report)
+                pacer.wait()
+        finally:
+            self.vis.destroy_window()
+
+
+# 使用示例 - 双手交替握拳
+if __name__ == "__main__":
+    import threading
+    import time
+
+    visualizer = DualHandVisualizer(mapping=glove_mapping.GloveToManoMapping.identity_scaling())
+    stop = threading.Event()
+
+    def feed():
+        """模拟两只手套各自以100Hz发送数据"""
+        t = 0.0
+        while not stop.is_set():
+            for side, phase in (('left', 0.0), ('right', np.pi)):
+                glove_data = np.zeros(config_utils.TOTAL_CELLS)
+                glove_data[2] = (np.sin(t + phase) + 1) / 2 * np.pi / 4
+                visualizer.update_data(side, glove_data)
+            t += 0.05
+            time.sleep(0.01)
+
+    threading.Thread(target=feed, daemon=True).start()
+    print("Press Q in the visualization window to quit...")
+    visualizer.run()
+    stop.set()
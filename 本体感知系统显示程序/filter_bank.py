@@ -0,0 +1,174 @@
+"""
+24通道向量化滤波器组
+
+位于拉伸率计算与消费者（MANO可视化、灵巧手控制、共享内存总线）之间。
+每种滤波器的状态都保存为长度24的数组，一次处理一帧 (24,) 或一批 (N, 24)：
+- MedianFilter  : 短窗口中值，去除尖峰，批量时用滑动窗口视图一次完成
+- BiquadFilter  : 二阶IIR低通（RBJ公式，直接II型转置结构）
+- OneEuroFilter : One-Euro自适应低通，静止时强平滑，快速运动时降低延迟
+
+FilterBank 按 config_utils.FILTER_BANK 的顺序串联多个滤波器。
+各配置的延迟与残余噪声对比见 benchmark.py filters。
+"""
+
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+import config_utils
+
+
+class MedianFilter:
+    """逐通道滑动中值滤波"""
+
+    def __init__(self, channels=config_utils.TOTAL_CELLS, size=3):
+        self.channels = channels
+        self.size = size
+        self.history = None  # 最近 size-1 帧
+
+    def reset(self):
+        self.history = None
+
+    def process(self, frames):
+        """:param frames: (N, 24) 数组，返回同形状的滤波结果"""
+        if self.history is None:
+            # 用第一帧填充历史，避免启动时输出被拉向0
+            self.history = np.repeat(frames[:1], self.size - 1, axis=0)
+        if self.size == 1:
+            return frames
+        padded = np.concatenate([self.history, frames])
+        self.history = padded[-(self.size - 1):]
+        if self.size == 3:
+            # 三点中值的闭式解，比np.median快一个数量级
+            a, b, c = padded[:-2], padded[1:-1], padded[2:]
+            return np.maximum(np.minimum(a, b), np.minimum(np.maximum(a, b), c))
+        windows = sliding_window_view(padded, self.size, axis=0)  # (N, 24, size)
+        return np.median(windows, axis=-1)
+
+
+class BiquadFilter:
+    """逐通道二阶IIR低通滤波（巴特沃斯型，Q=0.7071）"""
+
+    def __init__(self, channels=config_utils.TOTAL_CELLS, rate=config_utils.FILTER_SAMPLE_RATE,
+                 cutoff=10.0, q=0.7071):
+        self.channels = channels
+        # RBJ Audio EQ Cookbook 低通系数
+        w0 = 2.0 * math.pi * cutoff / rate
+        alpha = math.sin(w0) / (2.0 * q)
+        cos_w0 = math.cos(w0)
+        a0 = 1.0 + alpha
+        self.b0 = (1.0 - cos_w0) / 2.0 / a0
+        self.b1 = (1.0 - cos_w0) / a0
+        self.b2 = self.b0
+        self.a1 = -2.0 * cos_w0 / a0
+        self.a2 = (1.0 - alpha) / a0
+        self.z1 = None
+        self.z2 = None
+
+    def reset(self):
+        self.z1 = None
+        self.z2 = None
+
+    def process(self, frames):
+        out = np.empty_like(frames)
+        if self.z1 is None:
+            # 按第一帧的稳态初始化，避免启动瞬态
+            x0 = frames[0]
+            self.z1 = x0 - self.b0 * x0
+            self.z2 = self.b2 * x0 - self.a2 * x0
+        z1, z2 = self.z1, self.z2
+        b0, b1, b2, a1, a2 = self.b0, self.b1, self.b2, self.a1, self.a2
+        for i, x in enumerate(frames):
+            y = b0 * x + z1
+            z1 = b1 * x - a1 * y + z2
+            z2 = b2 * x - a2 * y
+            out[i] = y
+        self.z1, self.z2 = z1, z2
+        return out
+
+
+class OneEuroFilter:
+    """逐通道One-Euro滤波（Casiez 等, CHI 2012）"""
+
+    def __init__(self, channels=config_utils.TOTAL_CELLS, rate=config_utils.FILTER_SAMPLE_RATE,
+                 min_cutoff=1.0, beta=0.5, d_cutoff=1.0):
+        """
+        :param min_cutoff: 静止时的最小截止频率(Hz)，越小越平滑
+        :param beta: 速度系数，越大快速运动时延迟越小
+        :param d_cutoff: 导数估计的截止频率(Hz)
+        """
+        self.channels = channels
+        self.dt = 1.0 / rate
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.alpha_d = self._alpha(d_cutoff)
+        self.x_prev = None
+        self.dx_prev = None
+
+    def _alpha(self, cutoff):
+        tau = 1.0 / (2.0 * np.pi * cutoff)
+        return 1.0 / (1.0 + tau / self.dt)
+
+    def reset(self):
+        self.x_prev = None
+        self.dx_prev = None
+
+    def process(self, frames):
+        out = np.empty_like(frames)
+        start = 0
+        if self.x_prev is None:
+            self.x_prev = frames[0].copy()
+            self.dx_prev = np.zeros(self.channels)
+            out[0] = frames[0]
+            start = 1
+        x_prev, dx_prev = self.x_prev, self.dx_prev
+        inv_dt, alpha_d = 1.0 / self.dt, self.alpha_d
+        for i in range(start, len(frames)):
+            x = frames[i]
+            dx_prev = dx_prev + alpha_d * ((x - x_prev) * inv_dt - dx_prev)
+            cutoff = self.min_cutoff + self.beta * np.abs(dx_prev)
+            alpha = 1.0 / (1.0 + 1.0 / (2.0 * np.pi * cutoff * self.dt))
+            x_prev = x_prev + alpha * (x - x_prev)
+            out[i] = x_prev
+        self.x_prev, self.dx_prev = x_prev, dx_prev
+        return out
+
+
+FILTER_TYPES = {
+    "median": MedianFilter,
+    "biquad": BiquadFilter,
+    "one_euro": OneEuroFilter,
+}
+
+
+class FilterBank:
+    """按顺序串联的滤波器组"""
+
+    def __init__(self, spec=None, channels=config_utils.TOTAL_CELLS):
+        """
+        :param spec: [(滤波器类型, 参数字典), ...]，默认使用 config_utils.FILTER_BANK；空列表表示直通
+        """
+        spec = config_utils.FILTER_BANK if spec is None else spec
+        self.stages = []
+        for name, params in spec:
+            if name not in FILTER_TYPES:
+                raise ValueError(f"未知的滤波器类型: {name}，可选: {', '.join(FILTER_TYPES)}")
+            self.stages.append(FILTER_TYPES[name](channels=channels, **params))
+
+    def reset(self):
+        """清空所有滤波器状态（重新校准或切换用户后，由 main.py 的读取线程调用）"""
+        for stage in self.stages:
+            stage.reset()
+
+    def process(self, frames):
+        """
+        :param frames: (N, 24) 或 (24,) 数组
+        :return: 与输入形状相同的滤波结果
+        """
+        frames = np.asarray(frames, dtype=np.float64)
+        single = frames.ndim == 1
+        data = frames[np.newaxis] if single else frames
+        for stage in self.stages:
+            data = stage.process(data)
+        return data[0] if single else data
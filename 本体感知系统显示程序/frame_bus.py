@@ -0,0 +1,199 @@
+"""
+共享内存最新帧总线
+
+接收进程把每一帧24通道电压及对应的拉伸率向量发布一次，
+可视化、灵巧手控制、预测等进程各自读取最新的一致帧。
+
+内存布局（全部8字节对齐）：
+- int64[4]   : 序列号(seqlock)、帧编号、标志位、发布者进程ID
+- float64[49]: 时间戳 + 24个电压 + 24个拉伸率
+
+写端使用顺序锁：写之前序列号+1变为奇数，写完再+1变为偶数；
+读端在序列号为偶数且前后两次读取一致时才认为拿到了完整的帧。
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+
+import config_utils
+
+HEADER_SLOTS = 4  # int64头部槽位数
+SEQ_SLOT = 0  # 顺序锁序列号
+FRAME_ID_SLOT = 1  # 帧编号
+FLAGS_SLOT = 2  # 标志位
+OWNER_PID_SLOT = 3  # 创建总线的发布者进程ID，用于判断同名共享内存是否为残留
+
+FLAG_HAS_STRETCH = 0x1  # 本帧包含有效拉伸率
+
+PAYLOAD_SLOTS = 1 + 2 * config_utils.TOTAL_CELLS  # 时间戳 + 电压 + 拉伸率
+BUS_SIZE = 8 * (HEADER_SLOTS + PAYLOAD_SLOTS)
+
+
+def _open_shared_memory(name, create):
+    """打开共享内存；读端不注册到resource_tracker，避免子进程退出时误删共享内存"""
+    if create:
+        return shared_memory.SharedMemory(name=name, create=True, size=BUS_SIZE)
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _process_alive(pid):
+    """判断进程是否仍在运行（Windows上不能用 os.kill(pid, 0)，它会结束目标进程）"""
+    if pid <= 0:
+        return False
+    if sys.platform == 'win32':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # 进程存在但属于其他用户
+    return True
+
+
+class FrameBus:
+    """基于 multiprocessing.shared_memory 的单写多读最新帧总线"""
+
+    def __init__(self, name=config_utils.FRAME_BUS_NAME, create=False):
+        """
+        :param name: 共享内存名称，所有进程使用同一名称
+        :param create: True表示由发布者创建（并在close时释放），False表示订阅者连接已有总线
+        :raises FileExistsError: create=True 但同名总线的发布者仍在运行
+        """
+        self.name = name
+        self.is_owner = create
+        if create:
+            self._remove_stale(name)
+        self.shm = _open_shared_memory(name, create)
+
+        self._header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=self.shm.buf)
+        self._payload = np.ndarray((PAYLOAD_SLOTS,), dtype=np.float64, buffer=self.shm.buf,
+                                   offset=8 * HEADER_SLOTS)
+        self._voltages = self._payload[1:1 + config_utils.TOTAL_CELLS]
+        self._stretch = self._payload[1 + config_utils.TOTAL_CELLS:]
+        if create:
+            self._header[:] = 0
+            self._payload[:] = 0
+            self._header[OWNER_PID_SLOT] = os.getpid()
+
+        # 读端的本地拷贝缓冲区，避免每次读取都分配内存
+        self._snapshot = np.empty(PAYLOAD_SLOTS, dtype=np.float64)
+        self.retries = 0  # 读端因写冲突重试的累计次数
+
+    @staticmethod
+    def _remove_stale(name):
+        """
+        清理上次异常退出残留的同名共享内存
+
+        :raises FileExistsError: 同名总线的发布者仍在运行（例如重复启动了接收程序）
+        """
+        try:
+            stale = _open_shared_memory(name, create=False)
+        except FileNotFoundError:
+            return
+        try:
+            header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=stale.buf)
+            owner = int(header[OWNER_PID_SLOT])
+            del header  # 释放视图，否则共享内存无法关闭
+            if owner != os.getpid() and _process_alive(owner):
+                if os.name == 'posix':
+                    # Python 3.13以前打开时也会注册，不注销的话本进程退出时会删掉正在使用的总线
+                    resource_tracker.unregister(stale._name, 'shared_memory')
+                raise FileExistsError(f"共享内存总线 {name} 正在被进程 {owner} 使用，"
+                                      f"请先关闭该程序，或在 config_utils.FRAME_BUS_NAME 中换一个名称")
+            stale.unlink()
+        finally:
+            stale.close()
+
+    def publish(self, voltages, stretch_ratios=None, timestamp=None):
+        """
+        发布一帧数据（仅限唯一的写端调用）
+
+        :param voltages: 24个通道的电压值
+        :param stretch_ratios: 24个通道的拉伸率，未校准时为None
+        :param timestamp: 帧时间戳，默认使用当前time.time()
+        :return: 本帧的帧编号
+        """
+        header = self._header
+        header[SEQ_SLOT] += 1  # 奇数：写入中
+        self._payload[0] = time.time() if timestamp is None else timestamp
+        self._voltages[:] = voltages
+        if stretch_ratios is not None:
+            self._stretch[:] = stretch_ratios
+            header[FLAGS_SLOT] = FLAG_HAS_STRETCH
+        else:
+            header[FLAGS_SLOT] = 0
+        header[FRAME_ID_SLOT] += 1
+        header[SEQ_SLOT] += 1  # 偶数：写入完成
+        return int(header[FRAME_ID_SLOT])
+
+    def read_latest(self, last_frame_id=0, max_retries=1000):
+        """
+        读取最新的一致帧
+
+        :param last_frame_id: 调用方已处理过的帧编号，没有更新的帧时返回None
+        :param max_retries: 写冲突时的最大重试次数
+        :return: (帧编号, 时间戳, 电压数组, 拉伸率数组或None)，无新帧时返回None
+        """
+        header = self._header
+        for _ in range(max_retries):
+            seq_before = int(header[SEQ_SLOT])
+            if seq_before & 1:
+                self.retries += 1
+                continue
+            frame_id = int(header[FRAME_ID_SLOT])
+            if frame_id == last_frame_id:
+                return None
+            flags = int(header[FLAGS_SLOT])
+            self._snapshot[:] = self._payload
+            if int(header[SEQ_SLOT]) == seq_before:
+                timestamp = float(self._snapshot[0])
+                voltages = self._snapshot[1:1 + config_utils.TOTAL_CELLS].copy()
+                stretch = None
+                if flags & FLAG_HAS_STRETCH:
+                    stretch = self._snapshot[1 + config_utils.TOTAL_CELLS:].copy()
+                return frame_id, timestamp, voltages, stretch
+            self.retries += 1
+        return None
+
+    def wait_for_frame(self, last_frame_id=0, timeout=0.1, poll_interval=0.0005):
+        """
+        等待比last_frame_id更新的帧，超时返回None
+
+        共享内存没有跨进程通知机制，这里用短间隔睡眠轮询，避免忙等占满CPU
+        """
+        deadline = time.perf_counter() + timeout
+        while True:
+            frame = self.read_latest(last_frame_id)
+            if frame is not None or time.perf_counter() >= deadline:
+                return frame
+            time.sleep(poll_interval)
+
+    def close(self):
+        """断开总线，发布者同时释放共享内存"""
+        # 先释放numpy视图，否则共享内存的buffer无法关闭
+        self._header = None
+        self._payload = None
+        self._voltages = None
+        self._stretch = None
+        self.shm.close()
+        if self.is_owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
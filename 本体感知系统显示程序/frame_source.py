@@ -0,0 +1,203 @@
+"""
+传输层无关的外骨骼帧源
+
+串口、TCP、UDP三种后端只负责读取原始字节，帧解析统一交给 wire_protocol.FrameParser，
+因此三种传输方式都支持v1/v2协议，吞吐量也一致。各个界面通过 create_frame_source()
+按 config_utils.FRAME_TRANSPORT 选择传输方式：
+
+    source = frame_source.create_frame_source()
+    source.open()
+    while True:
+        frames = source.read_frames()  # (N, 24)，发送端通道顺序；连接关闭时为None
+"""
+
+import socket
+
+import config_utils
+import wire_protocol
+
+READ_TIMEOUT = 0.2  # 单次读取的最长阻塞时间(秒)，便于读取线程及时响应停止请求
+
+
+def reverse_rows(frames):
+    """把 (N, 24) 的帧按6x4的每一行反转后重新展平，与界面显示的通道顺序一致"""
+    num_frames = len(frames)
+    reversed_frames = frames.reshape(num_frames, config_utils.ROWS, config_utils.COLS)[:, :, ::-1]
+    return reversed_frames.reshape(num_frames, config_utils.TOTAL_CELLS)
+
+
+class FrameSource:
+    """帧源基类，子类实现 open() / _read_bytes() / close()"""
+    is_datagram = False  # 数据报传输时每次读取都是完整的包，不跨包拼接
+
+    def __init__(self):
+        self.parser = wire_protocol.FrameParser()
+        self.description = ""  # 连接描述，用于界面状态显示
+
+    def open(self):
+        """建立连接，TCP会阻塞直到发送端连入"""
+        raise NotImplementedError
+
+    def _read_bytes(self):
+        """读取一次原始字节：超时返回b''，连接关闭返回None"""
+        raise NotImplementedError
+
+    def read_frames(self):
+        """
+        阻塞读取一次（最长READ_TIMEOUT秒）并解析出全部完整帧
+
+        :return: (N, 24) 数组，超时或只收到半帧时N为0；连接关闭时返回None
+        """
+        data = self._read_bytes()
+        if data is None:
+            return None
+        if not data:
+            return self.parser.empty
+        if self.is_datagram:
+            return self.parser.feed_datagram(data)
+        return self.parser.feed(data)
+
+    def interrupt(self):
+        """从其他线程唤醒阻塞中的读取，默认依赖读取超时"""
+        pass
+
+    def close(self):
+        """关闭连接"""
+        pass
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class TcpFrameSource(FrameSource):
+    """TCP帧源：本机监听，等待ESP32作为客户端连入"""
+
+    def __init__(self, host=config_utils.FRAME_HOST, port=config_utils.FRAME_PORT):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.server = None
+        self.conn = None
+
+    def open(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # 禁用Nagle算法提高实时性
+        self.server.bind((self.host, self.port))
+        self.server.listen(1)
+        print(f"Listening on {self.host}:{self.port}...")
+        self.conn, addr = self.server.accept()
+        self.conn.settimeout(READ_TIMEOUT)
+        self.description = f"TCP {addr[0]}:{addr[1]}"
+        print(f"Connected by {addr}")
+
+    def _read_bytes(self):
+        try:
+            data = self.conn.recv(4096)
+        except socket.timeout:
+            return b''
+        except OSError:
+            return None
+        return data if data else None
+
+    def interrupt(self):
+        # shutdown可以立即唤醒阻塞在recv上的线程
+        if self.conn is not None:
+            try:
+                self.conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def close(self):
+        for sock in (self.conn, self.server):
+            if sock is not None:
+                sock.close()
+        self.conn = None
+        self.server = None
+
+
+class UdpFrameSource(FrameSource):
+    """UDP帧源：本机绑定端口接收数据报"""
+    is_datagram = True
+
+    def __init__(self, host=config_utils.FRAME_HOST, port=config_utils.FRAME_PORT):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.sock = None
+
+    def open(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((self.host, self.port))
+        self.sock.settimeout(READ_TIMEOUT)
+        self.description = f"UDP {self.host}:{self.port}"
+        print(f"UDP receiver listening on {self.host}:{self.port}")
+
+    def _read_bytes(self):
+        try:
+            data, _ = self.sock.recvfrom(2048)
+        except socket.timeout:
+            return b''
+        except OSError:
+            return None
+        return data
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+class SerialFrameSource(FrameSource):
+    """串口帧源"""
+
+    def __init__(self, port=config_utils.SERIAL_PORT, baudrate=config_utils.SERIAL_BAUDRATE):
+        super().__init__()
+        self.port = port
+        self.baudrate = baudrate
+        self.serial = None
+
+    def open(self):
+        import serial  # 只有使用串口时才需要pyserial
+        self.serial = serial.Serial(port=self.port, baudrate=self.baudrate, timeout=READ_TIMEOUT)
+        self.description = f"Serial {self.port}@{self.baudrate}"
+        print(f"Serial port {self.port} opened at {self.baudrate} baud")
+
+    def _read_bytes(self):
+        try:
+            # 先阻塞等待至少1字节，再一次性取走缓冲区中已有的全部数据
+            data = self.serial.read(1)
+            if data and self.serial.in_waiting:
+                data += self.serial.read(self.serial.in_waiting)
+        except Exception:
+            return None
+        return data
+
+    def close(self):
+        if self.serial is not None:
+            self.serial.close()
+            self.serial = None
+
+
+FRAME_SOURCES = {
+    "tcp": TcpFrameSource,
+    "udp": UdpFrameSource,
+    "serial": SerialFrameSource,
+}
+
+
+def create_frame_source(transport=None, **kwargs):
+    """
+    按传输方式创建帧源（未打开）
+
+    :param transport: "tcp" / "udp" / "serial"，默认使用 config_utils.FRAME_TRANSPORT
+    :param kwargs: 传给对应帧源构造函数的参数，例如 port=...
+    """
+    transport = (transport or config_utils.FRAME_TRANSPORT).lower()
+    if transport not in FRAME_SOURCES:
+        raise ValueError(f"未知的传输方式: {transport}，可选: {', '.join(FRAME_SOURCES)}")
+    return FRAME_SOURCES[transport](**kwargs)
@@ -0,0 +1,68 @@
+"""
+手套拉伸率到MANO手部姿态的映射
+
+原来的流程是：main.py 对24维拉伸率逐通道缩放、加偏移，
+可视化器再从中挑出15个自由度，按字典逐个写入45维PCA向量。
+这几步都是线性的，GloveToManoMapping 在初始化时把整条链编译成一个仿射变换：
+
+    pca = glove @ weights + bias      weights: (24, 45), bias: (45,)
+
+映射一帧或整段录制数据 (N, 24) 都只需要一次矩阵乘法，结果与原逐项写入完全一致
+（未被映射的PCA分量保持为0）。
+"""
+
+import numpy as np
+
+import config_utils
+
+NUM_PCA_COMPONENTS = 45
+
+
+class GloveToManoMapping:
+    """24维手套数据 -> 45维MANO PCA姿态的仿射映射"""
+
+    def __init__(self, scale_factors=None, offsets=None, glove_indices=None, pca_mapping=None,
+                 channels=config_utils.TOTAL_CELLS):
+        """
+        参数为None时使用 config_utils 中的 MANO_* 配置
+
+        :param scale_factors: 24个通道的缩放系数
+        :param offsets: 24个通道的偏移量（缩放之后再加）
+        :param glove_indices: 参与映射的手套自由度在24维中的索引
+        :param pca_mapping: {自由度序号: [PCA分量索引, ...]}
+        """
+        scale_factors = np.asarray(config_utils.MANO_SCALE_FACTORS if scale_factors is None else scale_factors,
+                                   dtype=np.float64)
+        offsets = np.asarray(config_utils.MANO_OFFSETS if offsets is None else offsets, dtype=np.float64)
+        glove_indices = config_utils.MANO_GLOVE_INDICES if glove_indices is None else glove_indices
+        pca_mapping = config_utils.MANO_PCA_MAPPING if pca_mapping is None else pca_mapping
+        if scale_factors.shape != (channels,) or offsets.shape != (channels,):
+            raise ValueError(f"缩放系数和偏移量的长度必须为{channels}")
+
+        self.channels = channels
+        self.weights = np.zeros((channels, NUM_PCA_COMPONENTS))
+        self.bias = np.zeros(NUM_PCA_COMPONENTS)
+        for dof, pca_indices in pca_mapping.items():
+            channel = glove_indices[dof]
+            for idx in pca_indices:
+                # 同一个PCA分量被多次映射时以最后一次为准，与原来的逐项写入一致
+                self.weights[:, idx] = 0.0
+                self.weights[channel, idx] = scale_factors[channel]
+                self.bias[idx] = offsets[channel]
+
+    @classmethod
+    def identity_scaling(cls):
+        """不做缩放和偏移，只按索引映射（直接输入关节角度时使用）"""
+        return cls(scale_factors=np.ones(config_utils.TOTAL_CELLS), offsets=np.zeros(config_utils.TOTAL_CELLS))
+
+    def map(self, glove_data):
+        """
+        :param glove_data: (24,) 或 (N, 24) 拉伸率
+        :return: (45,) 或 (N, 45) PCA姿态
+        """
+        glove_data = np.asarray(glove_data, dtype=np.float64)
+        if glove_data.shape[-1] != self.channels:
+            raise ValueError(f"输入数组最后一维长度必须为{self.channels}")
+        return glove_data @ self.weights + self.bias
+
+    __call__ = map
@@ -0,0 +1,571 @@
+"""
+Revo2灵巧手控制
+
+DexterousHandController 持有一个长期运行的asyncio事件循环（独立的守护线程），
+所有Modbus调用都通过 asyncio.run_coroutine_threadsafe 提交到这个循环上执行，
+不再每次调用都新建、关闭一个事件循环。
+
+- set_positions()    : 阻塞调用，等待这一条命令发送完成（连接后的初始化、单指控制等）
+- submit_positions() : 非阻塞，用于高频控制。只保留最新的目标：已有命令正在发送时，新目标覆盖
+                       尚未发送的旧目标（合并），发送协程完成当前命令后立即发送最新的目标，
+                       任何时刻最多只有一个目标在等待，控制线程不会被串口速度拖慢，也不会积压
+- ControlStats       : 统计实际发送的命令频率、被合并的目标数、命令往返时间（发出到设备应答）
+                       和每秒占用的Modbus总线时间
+
+减少总线占用：
+- 死区：新目标与上一个目标的每个手指相差都小于 HAND_POSITION_DEADBAND 时不发送
+  （平滑逼近目标的最后阶段、手静止时传感器的微小抖动都不会产生命令）
+- 最少写入：只有一个手指变化时用 set_finger_position_with_speed 只写这个手指的寄存器，
+  SDK没有这个接口时仍然写全部6个手指
+- 总线时间：实测的忙碌时间是各命令往返时间之和（串口半双工，命令依次执行）；
+  线路时间按Modbus RTU帧长估算（写多个寄存器请求 9+2N 字节、应答 8 字节、8N1每字节10位、
+  每帧后3.5个字符的间隔），两者之差是设备处理和驱动调度的开销
+
+遥测：start_telemetry() 在同一个事件循环上按 HAND_TELEMETRY_RATE 轮询 get_motor_status，
+结果（位置、速度、电流、状态）保存为最新的 MotorSnapshot，界面随时读取，不等待串口。
+命令与遥测通过一个 asyncio.Lock 轮流使用总线；命令优先：轮到遥测时如果有命令正在发送或等待，
+这一次轮询让出（计入统计），所以遥测只使用命令之间的空闲总线时间，不降低命令频率。
+控制在独立进程中运行时，用 SharedMotorSnapshot（multiprocessing.Array）把快照交给界面进程。
+
+HandControlThread 以 config_utils.HAND_CONTROL_RATE 的固定节拍平滑逼近目标位置并提交给控制器。
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+import config_utils
+import render_pacing
+from revo2_utils import libstark, logger
+
+NUM_FINGERS = 6
+
+# 与 set_finger_positions_and_speeds 的位置顺序对应的 libstark.FingerId 名称（单指写入使用）
+FINGER_ID_NAMES = ('Thumb', 'ThumbAux', 'Index', 'Middle', 'Ring', 'Pinky')
+
+MODBUS_BAUDRATE = 460800  # 与 libstark.Baudrate.Baud460800 一致，用于估算线路时间
+ALL_FINGERS_REGISTERS = 2 * NUM_FINGERS  # 6个位置 + 6个速度
+SINGLE_FINGER_REGISTERS = 2  # 1个位置 + 1个速度
+MOTOR_STATUS_REGISTERS = 4 * NUM_FINGERS  # 位置、速度、电流、状态
+
+MotorSnapshot = namedtuple('MotorSnapshot', ['timestamp', 'positions', 'speeds', 'currents', 'states'])
+
+# 灵巧手6个手指对应的手套数据索引
+finger_indices = [8, 5, 4, 2, 14, 15]
+
+
+def glove_to_hand_positions(glove_data_24d):
+    """
+    将24维拉伸率映射为灵巧手6个手指的目标位置(0-1000)
+
+    :param glove_data_24d: 长度为24的拉伸率数组
+    :return: 6个手指位置组成的列表
+    """
+    hand_positions = []
+    for i in range(NUM_FINGERS):  # 6个手指
+        # 获取指定位置的数据
+        finger_value = glove_data_24d[finger_indices[i]]
+        if i == 0:
+            finger_value = glove_data_24d[finger_indices[i]] + glove_data_24d[9]
+        # 映射到0-1000范围
+        position = int(finger_value * 3000)  # 根据需要调整映射关系
+        position = max(0, min(1000, position))  # 限制在有效范围内
+        hand_positions.append(position)
+    return hand_positions
+
+
+def modbus_write_time(registers, baudrate=MODBUS_BAUDRATE):
+    """估算一次写多个寄存器的Modbus RTU事务占用的线路时间(秒)"""
+    chars = (9 + 2 * registers) + 8 + 2 * 3.5  # 请求帧 + 应答帧 + 两个帧间隔
+    return chars * 10.0 / baudrate
+
+
+def modbus_read_time(registers, baudrate=MODBUS_BAUDRATE):
+    """估算一次读保持寄存器的Modbus RTU事务占用的线路时间(秒)"""
+    chars = 8 + (5 + 2 * registers) + 2 * 3.5  # 请求帧 8 字节，应答帧 5+2N 字节
+    return chars * 10.0 / baudrate
+
+
+class SharedMotorSnapshot:
+    """跨进程共享的最新电机状态快照，控制进程写入，界面进程读取"""
+
+    SIZE = 1 + 4 * NUM_FINGERS  # 时间戳 + 位置、速度、电流、状态
+
+    def __init__(self):
+        self._array = multiprocessing.Array('d', self.SIZE)  # 自带锁，读写整个快照时加锁
+
+    def write(self, snapshot):
+        """写入快照（可直接作为 start_telemetry 的 sink）"""
+        values = [snapshot.timestamp]
+        for field in (snapshot.positions, snapshot.speeds, snapshot.currents, snapshot.states):
+            values.extend(field)
+        with self._array.get_lock():
+            self._array[:] = values
+
+    def read(self):
+        """:return: 最新的MotorSnapshot，还没有数据时返回None"""
+        with self._array.get_lock():
+            values = self._array[:]
+        if values[0] == 0.0:
+            return None
+        fields = [tuple(values[1 + i * NUM_FINGERS:1 + (i + 1) * NUM_FINGERS]) for i in range(4)]
+        return MotorSnapshot(values[0], *fields)
+
+
+class ControlStats:
+    """灵巧手命令统计，每隔 report_interval 秒生成一行报告（线程安全）"""
+
+    def __init__(self, name="灵巧手", report_interval=config_utils.HAND_REPORT_INTERVAL, window=1000):
+        self.name = name
+        self.report_interval = report_interval
+        self._lock = threading.Lock()
+        self.round_trips = deque(maxlen=window)  # 最近的命令往返时间(秒)
+        self.sent = 0
+        self.single_finger = 0  # 其中只写一个手指的命令数
+        self.coalesced = 0
+        self.suppressed = 0  # 在死区内没有发送的目标数
+        self.errors = 0
+        self.polls = 0  # 完成的遥测轮询数
+        self.deferred = 0  # 为命令让出的遥测轮询数
+        self.busy_time = 0.0  # 命令往返时间之和(秒)
+        self.wire_time = 0.0  # 估算的线路时间之和(秒)
+        self._last_report = time.perf_counter()
+        self._at_report = self._counters()
+
+    def _counters(self):
+        return (self.sent, self.single_finger, self.coalesced, self.suppressed, self.polls, self.deferred,
+                self.busy_time, self.wire_time)
+
+    def add_command(self, round_trip, wire_time=0.0, single_finger=False):
+        """
+        记录一条发送完成的命令
+
+        :param round_trip: 发出到设备应答的时间(秒)
+        :param wire_time: 估算的线路时间(秒)
+        :param single_finger: 是否只写了一个手指
+        """
+        with self._lock:
+            self.sent += 1
+            self.single_finger += single_finger
+            self.busy_time += round_trip
+            self.wire_time += wire_time
+            self.round_trips.append(round_trip)
+
+    def add_poll(self, round_trip, wire_time=0.0):
+        """记录一次完成的遥测轮询（计入总线时间，不计入命令往返时间）"""
+        with self._lock:
+            self.polls += 1
+            self.busy_time += round_trip
+            self.wire_time += wire_time
+
+    def add_deferred(self):
+        """记录一次为命令让出的遥测轮询"""
+        with self._lock:
+            self.deferred += 1
+
+    def add_suppressed(self):
+        """记录一个在死区内没有发送的目标"""
+        with self._lock:
+            self.suppressed += 1
+
+    def add_coalesced(self):
+        """记录一个未发送就被新目标覆盖的目标"""
+        with self._lock:
+            self.coalesced += 1
+
+    def add_error(self):
+        """记录一次发送失败，返回累计失败次数"""
+        with self._lock:
+            self.errors += 1
+            return self.errors
+
+    def round_trip_summary(self):
+        """返回最近窗口内往返时间的 (平均, 95分位, 最大)，单位毫秒；没有数据时返回None"""
+        with self._lock:
+            if not self.round_trips:
+                return None
+            values = np.fromiter(self.round_trips, dtype=np.float64, count=len(self.round_trips)) * 1000.0
+        return values.mean(), np.percentile(values, 95), values.max()
+
+    def report(self):
+        """距离上次报告超过 report_interval 且期间发送过命令时返回报告字符串，否则返回None"""
+        now = time.perf_counter()
+        elapsed = now - self._last_report
+        if elapsed < self.report_interval:
+            return None
+        with self._lock:
+            counters = self._counters()
+            sent, single_finger, coalesced, suppressed, polls, deferred, busy_time, wire_time = (
+                now_value - last for now_value, last in zip(counters, self._at_report))
+            self._at_report = counters
+            errors = self.errors
+        self._last_report = now
+        if not sent:
+            return None  # 手静止时所有目标都在死区内，不打印
+        report = (f"{self.name}: 命令 {sent / elapsed:.1f} Hz (单指 {single_finger}), "
+                  f"死区跳过 {suppressed}, 合并 {coalesced} 个目标")
+        summary = self.round_trip_summary()
+        if summary is not None:
+            mean, p95, worst = summary
+            report += f", 往返 平均 {mean:.2f} ms / P95 {p95:.2f} ms / 最大 {worst:.2f} ms"
+        if polls or deferred:
+            report += f", 遥测 {polls / elapsed:.1f} Hz (让出 {deferred} 次)"
+        # 每秒占用的总线时间（命令和遥测），1000 ms/s 即总线饱和
+        report += (f", 总线 实测 {busy_time / elapsed * 1000:.0f} ms/s ({busy_time / elapsed:.0%})"
+                   f" / 线路 {wire_time / elapsed * 1000:.0f} ms/s")
+        if errors:
+            report += f", 累计失败 {errors} 次"
+        return report
+
+
+class DexterousHandController:
+    """灵巧手控制器类，所有Modbus通信在自己的事件循环线程中执行"""
+
+    def __init__(self, port=config_utils.HAND_PORT, slave_id=0x7f, stats=None):
+        """
+        初始化灵巧手控制器
+
+        :param port: 串口端口名称
+        :param slave_id: 从设备ID
+        :param stats: 可选 ControlStats，默认新建
+        """
+        self.port = port
+        self.slave_id = slave_id
+        self.baudrate = libstark.Baudrate.Baud460800
+        self.client = None
+        self.is_connected = False
+        self.speeds = [1000] * NUM_FINGERS  # 默认速度
+        self.stats = ControlStats() if stats is None else stats
+        self.deadband = config_utils.HAND_POSITION_DEADBAND
+        self.single_finger_writes = config_utils.HAND_SINGLE_FINGER_WRITES
+        self._finger_ids = None  # SDK支持单指写入时为6个 libstark.FingerId
+        self._last_target = None  # 最近一个被接受的目标，死区判断的参考
+        self._device_positions = None  # 最近一次写入设备的位置，None表示未知（写入全部手指）
+
+        self._loop = None
+        self._loop_thread = None
+        self._pending_lock = threading.Lock()
+        self._pending = None  # 等待发送的最新目标
+        self._sending = False  # 发送协程是否已提交/正在运行
+        self._send_future = None  # 最近一次提交的发送协程
+        self._bus_lock = None  # 命令和遥测轮流使用总线，在事件循环线程中创建
+        self.telemetry = None  # 最新的MotorSnapshot
+        self._telemetry_future = None
+
+    def _start_loop(self):
+        """启动事件循环线程（连接时调用一次）"""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="hand_io", daemon=True)
+        self._loop_thread.start()
+        # Python 3.10以前 asyncio.Lock 在创建时绑定当前线程的事件循环，必须在事件循环线程中创建
+        self._bus_lock = self._run(self._create_bus_lock())
+
+    @staticmethod
+    async def _create_bus_lock():
+        return asyncio.Lock()
+
+    def _stop_loop(self):
+        """停止并关闭事件循环线程"""
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout=2.0)
+        if self._loop_thread.is_alive():
+            # 循环仍卡在某个阻塞调用中，此时close()会抛出RuntimeError；守护线程随进程退出
+            logger.warning("Hand I/O loop did not stop within 2s, leaving it to exit with the process")
+        else:
+            self._loop.close()
+        self._loop = None
+        self._loop_thread = None
+
+    def _run(self, coroutine, timeout=config_utils.HAND_COMMAND_TIMEOUT):
+        """在事件循环线程中执行协程并等待结果"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    def connect(self):
+        """连接灵巧手设备"""
+        try:
+            self._start_loop()
+            result = self._run(self._connect_async(), timeout=None)
+        except Exception as e:
+            logger.critical(f"Connection failed: {e}")
+            result = False
+        if not result:
+            self._stop_loop()
+        return result
+
+    async def _connect_async(self):
+        """异步连接方法"""
+        # 异步打开Modbus串口连接
+        self.client = await libstark.modbus_open(self.port, self.baudrate)
+        # 检查串口连接是否成功
+        if not self.client:
+            logger.critical(f"Failed to open serial port: {self.port}")
+            return False
+        # 异步获取指定从设备的信息
+        info = await self.client.get_device_info(self.slave_id)
+        # 检查设备信息获取是否成功
+        if not info:
+            logger.critical(f"Failed to get device info for right hand. Id: {self.slave_id}")
+            return False
+        # 记录设备描述信息到日志
+        logger.info(f"Right: {info.description}")
+        # 设置手指单元模式为归一化模式
+        await self.client.set_finger_unit_mode(self.slave_id, libstark.FingerUnitMode.Normalized)
+        if hasattr(self.client, 'set_finger_position_with_speed') and hasattr(libstark, 'FingerId'):
+            self._finger_ids = [getattr(libstark.FingerId, name) for name in FINGER_ID_NAMES]
+
+        self.is_connected = True
+        return True
+
+    def disconnect(self):
+        """断开灵巧手设备连接（先停止遥测并等待正在发送的命令完成）"""
+        self.stop_telemetry()
+        if self.is_connected and self.client:
+            self.is_connected = False  # 不再接受新的目标
+            with self._pending_lock:
+                self._pending = None
+                future = self._send_future
+            try:
+                if future is not None:
+                    future.result(config_utils.HAND_COMMAND_TIMEOUT)
+                self._run(self._disconnect_async())
+            except Exception as e:
+                logger.error(f"Disconnection error: {e}")
+            finally:
+                self.is_connected = False
+        self._stop_loop()
+
+    async def _disconnect_async(self):
+        """异步断开连接方法"""
+        # 异步关闭Modbus串口连接
+        await libstark.modbus_close(self.client)
+        logger.info("Hand disconnected")
+
+    def _check_positions(self, positions):
+        if not self.is_connected:
+            logger.warning("Hand is not connected")
+            return False
+        if len(positions) != NUM_FINGERS:
+            logger.error("Positions list must contain exactly 6 values")
+            return False
+        return True
+
+    def set_positions(self, positions):
+        """
+        设置手指位置，等待命令发送完成
+
+        :param positions: 包含6个手指位置的列表
+        """
+        if not self._check_positions(positions):
+            return False
+        with self._pending_lock:
+            self._last_target = list(positions)
+        try:
+            return self._run(self._set_positions_async(list(positions)))
+        except Exception as e:
+            with self._pending_lock:
+                self._last_target = None  # 发送失败，不能再以这个目标做死区判断，否则附近的目标都不会重发
+            logger.error(f"Error setting positions: {e}")
+            return False
+
+    async def _set_positions_async(self, positions):
+        """异步设置位置方法，只有一个手指变化时只写这个手指"""
+        async with self._bus_lock:
+            # 在总线锁内比较：等锁期间其他命令（例如阻塞的 move_finger）可能已经改写了设备位置
+            device = self._device_positions
+            changed = [i for i in range(NUM_FINGERS) if device is None or positions[i] != device[i]]
+            if not changed:
+                return True
+            single_finger = self.single_finger_writes and self._finger_ids is not None and len(changed) == 1
+            start = time.perf_counter()
+            try:
+                if single_finger:
+                    finger = changed[0]
+                    await self.client.set_finger_position_with_speed(
+                        self.slave_id, self._finger_ids[finger], positions[finger], self.speeds[finger])
+                else:
+                    # 异步设置手指位置和速度
+                    await self.client.set_finger_positions_and_speeds(self.slave_id, positions, self.speeds)
+            except Exception:
+                self._device_positions = None  # 不确定设备是否收到，下一次写入全部手指
+                raise
+            self._device_positions = positions
+        self.stats.add_command(time.perf_counter() - start, modbus_write_time(
+            SINGLE_FINGER_REGISTERS if single_finger else ALL_FINGERS_REGISTERS), single_finger)
+        logger.debug(f"Set positions: {positions}")
+        return True
+
+    def submit_positions(self, positions):
+        """
+        非阻塞地提交目标位置，只保留最新的目标；与上一个目标相比都在死区内时不发送
+
+        :param positions: 包含6个手指位置的列表
+        :return: 是否已提交（未连接或参数错误时为False）
+        """
+        if not self._check_positions(positions):
+            return False
+        with self._pending_lock:
+            last = self._last_target
+            if last is not None and all(abs(p - q) < self.deadband for p, q in zip(positions, last)):
+                self.stats.add_suppressed()
+                return True
+            self._last_target = list(positions)
+            if self._pending is not None:
+                self.stats.add_coalesced()
+            self._pending = list(positions)
+            if self._sending:
+                return True  # 发送协程完成当前命令后会取走这个目标
+            self._sending = True
+            self._send_future = asyncio.run_coroutine_threadsafe(self._send_pending(), self._loop)
+        return True
+
+    async def _send_pending(self):
+        """依次发送最新的目标，直到没有等待的目标"""
+        while True:
+            with self._pending_lock:
+                positions, self._pending = self._pending, None
+                if positions is None:
+                    self._sending = False
+                    return
+            try:
+                await self._set_positions_async(positions)
+            except Exception as e:
+                with self._pending_lock:
+                    self._last_target = None  # 发送失败，下一个目标即使在死区内也要重新发送
+                # 高频控制下同样的错误会连续出现，只记录第一次，累计次数在统计报告中给出
+                if self.stats.add_error() == 1:
+                    logger.error(f"Error setting positions: {e}")
+
+    def start_telemetry(self, rate=config_utils.HAND_TELEMETRY_RATE, sink=None):
+        """
+        在控制器的事件循环上开始轮询电机状态
+
+        :param rate: 轮询频率(Hz)，0表示不轮询
+        :param sink: 可选回调，每个新快照在事件循环线程中调用一次（例如 SharedMotorSnapshot.write）
+        """
+        if not self.is_connected or rate <= 0 or self._telemetry_future is not None:
+            return False
+        self._telemetry_future = asyncio.run_coroutine_threadsafe(self._poll_telemetry(rate, sink), self._loop)
+        return True
+
+    def stop_telemetry(self):
+        """停止轮询电机状态"""
+        if self._telemetry_future is not None:
+            self._telemetry_future.cancel()
+            self._telemetry_future = None
+
+    async def _poll_telemetry(self, rate, sink):
+        """按固定节拍读取电机状态，有命令正在发送或等待时让出这一次"""
+        interval = 1.0 / rate
+        loop = asyncio.get_running_loop()
+        next_poll = loop.time()
+        while True:
+            next_poll += interval
+            delay = next_poll - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                next_poll = loop.time()
+            if self._sending or self._bus_lock.locked():
+                self.stats.add_deferred()
+                continue
+            try:
+                async with self._bus_lock:
+                    start = time.perf_counter()
+                    status = await self.client.get_motor_status(self.slave_id)
+                    round_trip = time.perf_counter() - start
+                self.stats.add_poll(round_trip, modbus_read_time(MOTOR_STATUS_REGISTERS))
+                # 构造快照和sink（例如写共享内存）出错同样只计数，不能让轮询协程静默退出
+                self.telemetry = MotorSnapshot(time.time(), tuple(status.positions), tuple(status.speeds),
+                                               tuple(status.currents), tuple(status.states))
+                if sink is not None:
+                    sink(self.telemetry)
+            except Exception as e:
+                if self.stats.add_error() == 1:
+                    logger.error(f"Error polling motor status: {e}")
+
+    def move_to_default(self):
+        """移动到默认位置"""
+        return self.set_positions([0, 0, 0, 0, 0, 0])
+
+    def move_finger(self, finger_index, position):
+        """
+        控制单个手指
+
+        :param finger_index: 手指索引 (0-5)
+        :param position: 位置值
+        """
+        if not 0 <= finger_index <= 5:
+            logger.error("Finger index must be between 0 and 5")
+            return False
+
+        positions = [0, 0, 0, 0, 0, 0]
+        positions[finger_index] = position
+        return self.set_positions(positions)
+
+
+class HandControlThread(threading.Thread):
+    """独立的灵巧手高速控制线程"""
+
+    def __init__(self, hand_controller, control_rate=config_utils.HAND_CONTROL_RATE):
+        """
+        初始化控制线程
+
+        :param hand_controller: 灵巧手控制器实例
+        :param control_rate: 控制频率 (Hz)
+        """
+        super().__init__()
+        self.hand_controller = hand_controller
+        self.control_rate = control_rate
+        self.target_positions = [0] * NUM_FINGERS
+        self.current_positions = [0] * NUM_FINGERS
+        self.running = False
+        self.lock = threading.Lock()
+        # 平滑因子：HAND_FILTER_FACTOR 是每10ms逼近的比例，按控制频率换算，不同频率下的平滑时间常数相同
+        self.filter_factor = 1.0 - (1.0 - config_utils.HAND_FILTER_FACTOR) ** (100.0 / control_rate)
+
+    def set_target_positions(self, positions):
+        """设置目标位置"""
+        with self.lock:
+            self.target_positions = positions[:]
+
+    def get_current_positions(self):
+        """获取当前位置"""
+        with self.lock:
+            return self.current_positions[:]
+
+    def run(self):
+        """线程主循环"""
+        self.running = True
+        pacer = render_pacing.FramePacer(self.control_rate)
+
+        while self.running:
+            # 更新位置并控制灵巧手
+            with self.lock:
+                for i in range(NUM_FINGERS):
+                    # 平滑逼近目标位置
+                    diff = self.target_positions[i] - self.current_positions[i]
+                    self.current_positions[i] += diff * self.filter_factor
+                    # 限制范围
+                    self.current_positions[i] = max(0, min(1000, self.current_positions[i]))
+                positions = [int(pos) for pos in self.current_positions]
+
+            # 提交给控制器的事件循环发送，不等待串口
+            self.hand_controller.submit_positions(positions)
+
+            report = self.hand_controller.stats.report()
+            if report:
+                logger.info(report)
+            pacer.wait()
+
+    def stop(self):
+        """停止线程"""
+        self.running = False
+        self.join()
@@ -0,0 +1,185 @@
+"""
+每个用户的MANO手型
+
+MANO的形状参数(betas)决定手掌大小、手指长短粗细。每个用户的betas保存在校准数据库的 hand_shapes 表中
+（calibration_store.CalibrationStore.set_hand_shape），可以直接指定，也可以由几项手部尺寸拟合得到。
+
+v_shaped 和 J_rest 都是betas的线性函数，各项尺寸（两点间距离）对betas的导数可以解析计算，
+fit_betas() 用带正则项的高斯-牛顿法求解，几毫秒完成。拟合只在保存手型时运行一次；
+可视化器启动时按用户读取betas，ManoModel.set_betas 预计算形状混合后的模板和关节并按betas缓存，
+逐帧的 update_hand_pose 与标准手型的计算量完全相同。
+
+尺寸定义（单位米，均为MANO模型上的点，与用尺子量的数值有几毫米的系统差）：
+    hand_length   腕关节中心到中指指尖
+    palm_length   腕关节中心到中指掌指关节
+    palm_width    食指与小指掌指关节中心的距离
+    thumb_length  拇指掌指关节到指尖，其余手指同理（index/middle/ring/pinky_length）
+
+用法示例：
+    python hand_shape.py --user alice --hand-length 0.185 --palm-width 0.07       # 拟合并保存
+    python hand_shape.py --user bob --betas 1.5 0 0 0 0 0 0 0 0 0                 # 直接指定
+    python hand_shape.py --user alice                                            # 查看已保存的手型
+    python hand_shape.py --user alice --reset                                    # 恢复标准手型
+"""
+
+import argparse
+
+import numpy as np
+
+import calibration_store
+import config_utils
+import mano_numpy
+
+# MANO指尖顶点（与smplx的 vertex_ids['mano'] 一致）
+TIP_VERTICES = {'thumb': 744, 'index': 320, 'middle': 443, 'ring': 554, 'pinky': 671}
+# MANO关节序号：0腕，1-3食指，4-6中指，7-9小指，10-12无名指，13-15拇指
+MCP_JOINTS = {'thumb': 14, 'index': 1, 'middle': 4, 'ring': 10, 'pinky': 7}
+WRIST_JOINT = 0
+
+# 尺寸名称 -> (点A, 点B)，点为 ('vertex', 顶点序号) 或 ('joint', 关节序号)
+MEASUREMENTS = {
+    'hand_length': (('joint', WRIST_JOINT), ('vertex', TIP_VERTICES['middle'])),
+    'palm_length': (('joint', WRIST_JOINT), ('joint', MCP_JOINTS['middle'])),
+    'palm_width': (('joint', MCP_JOINTS['index']), ('joint', MCP_JOINTS['pinky'])),
+}
+for _finger in TIP_VERTICES:
+    MEASUREMENTS[f'{_finger}_length'] = (('joint', MCP_JOINTS[_finger]), ('vertex', TIP_VERTICES[_finger]))
+
+BETA_LIMIT = 3.0  # 训练数据中betas基本在±3以内，超出后网格会明显失真
+
+
+def _point_basis(mano_model, point):
+    kind, index = point
+    if kind == 'vertex':
+        return mano_model.shape_point_basis(vertex_ids=[index])
+    return mano_model.shape_point_basis(joint_ids=[index])
+
+
+def _measurement_basis(mano_model, names):
+    """各项尺寸两端点之差的线性形式：diff(betas) = base + dirs @ betas，形状 (M, 3) 和 (M, 3, 10)"""
+    base, dirs = [], []
+    for name in names:
+        (base_a, dirs_a), (base_b, dirs_b) = (_point_basis(mano_model, point) for point in MEASUREMENTS[name])
+        base.append(base_b[0] - base_a[0])
+        dirs.append(dirs_b[0] - dirs_a[0])
+    return np.array(base), np.array(dirs)
+
+
+def measure(mano_model, betas=None, names=None):
+    """
+    计算给定手型的各项尺寸
+
+    :param betas: 形状参数，None表示标准手型
+    :param names: 尺寸名称列表，默认全部
+    :return: {名称: 米}
+    """
+    names = list(MEASUREMENTS) if names is None else list(names)
+    betas = np.zeros(mano_numpy.NUM_BETAS) if betas is None else np.asarray(betas, dtype=np.float64)
+    base, dirs = _measurement_basis(mano_model, names)
+    lengths = np.linalg.norm(base + dirs[..., :len(betas)] @ betas, axis=1)
+    return dict(zip(names, lengths.tolist()))
+
+
+def fit_betas(mano_model, measurements, regularization=1e-5, iterations=20):
+    """
+    由手部尺寸拟合形状参数
+
+    最小化 Σ(模型尺寸 - 测量值)² + regularization·|betas|²，正则项让未被尺寸约束的形状分量保持为0。
+
+    :param measurements: {尺寸名称: 米}，名称见 MEASUREMENTS，至少一项
+    :param regularization: 正则项权重(米²)，约等于1个单位的beta相当于 sqrt(该值) 米的尺寸误差
+    :return: 10维betas
+    """
+    unknown = set(measurements) - set(MEASUREMENTS)
+    if unknown:
+        raise ValueError(f"未知的尺寸: {sorted(unknown)}，可选 {list(MEASUREMENTS)}")
+    if not measurements:
+        raise ValueError("至少需要一项手部尺寸")
+    names = list(measurements)
+    targets = np.array([measurements[name] for name in names], dtype=np.float64)
+    base, dirs = _measurement_basis(mano_model, names)  # (M, 3), (M, 3, 10)
+    betas = np.zeros(dirs.shape[-1])
+    damping = regularization * np.eye(len(betas))
+    for _ in range(iterations):
+        diff = base + dirs @ betas
+        lengths = np.linalg.norm(diff, axis=1)
+        residuals = lengths - targets
+        # d|diff|/dbetas = (diff/|diff|)ᵀ · dirs
+        jacobian = np.einsum('mc,mcb->mb', diff / lengths[:, np.newaxis], dirs)
+        step = np.linalg.solve(jacobian.T @ jacobian + damping,
+                               -(jacobian.T @ residuals + regularization * betas))
+        betas = np.clip(betas + step, -BETA_LIMIT, BETA_LIMIT)
+        if np.abs(step).max() < 1e-6:
+            break
+    return betas
+
+
+def load_user_betas(user=config_utils.CALIBRATION_USER, store=None):
+    """
+    读取用户保存的betas
+
+    :param store: 可选已打开的 CalibrationStore，None时临时打开 config_utils.CALIBRATION_DB
+    :return: betas，用户没有保存手型时返回None（标准手型）
+    """
+    own_store = store is None
+    store = calibration_store.CalibrationStore() if own_store else store
+    try:
+        record = store.hand_shape(user)
+    finally:
+        if own_store:
+            store.close()
+    return None if record is None else record.betas
+
+
+def _format_measurements(values, targets=None):
+    lines = []
+    for name, value in values.items():
+        line = f"  {name:<14}{value * 1000:7.1f} mm"
+        if targets and name in targets:
+            line += f"  (目标 {targets[name] * 1000:.1f} mm)"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='拟合、指定或查看用户的MANO手型（形状参数betas）')
+    parser.add_argument('--user', default=config_utils.CALIBRATION_USER,
+                        help=f'用户名 (默认: {config_utils.CALIBRATION_USER})')
+    parser.add_argument('--db', default=config_utils.CALIBRATION_DB, help='校准数据库文件')
+    parser.add_argument('--model', default=config_utils.MANO_RIGHT_MODEL, help='MANO模型文件 (默认: mano/MANO_RIGHT.npz)')
+    for name in MEASUREMENTS:
+        parser.add_argument('--' + name.replace('_', '-'), type=float, dest=name, help=f'{name} (米)')
+    parser.add_argument('--betas', type=float, nargs='+', help='直接指定形状参数，不拟合')
+    parser.add_argument('--reset', action='store_true', help='恢复标准手型（betas全为0）')
+    args = parser.parse_args()
+
+    model = mano_numpy.ManoModel(args.model)
+    store = calibration_store.CalibrationStore(args.db)
+    try:
+        targets = {name: getattr(args, name) for name in MEASUREMENTS if getattr(args, name) is not None}
+        if args.reset:
+            betas = np.zeros(mano_numpy.NUM_BETAS)
+        elif args.betas is not None:
+            betas = np.asarray(args.betas, dtype=np.float64)
+        elif targets:
+            betas = fit_betas(model, targets)
+        else:
+            record = store.hand_shape(args.user)
+            if record is None:
+                print(f"用户 {args.user} 没有保存手型，使用标准手型")
+                betas = None
+            else:
+                betas = record.betas
+                print(f"用户 {args.user} 的手型 (betas): {np.array2string(betas, precision=3)}")
+            print(_format_measurements(measure(model, betas)))
+            return
+
+        store.set_hand_shape(args.user, betas, targets or None)
+        print(f"已保存用户 {args.user} 的手型 (betas): {np.array2string(betas, precision=3)}")
+        print(_format_measurements(measure(model, betas), targets))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
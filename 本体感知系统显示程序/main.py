@@ -1,211 +1,70 @@
 import perception_data_processor
 import data_display_gui
 import config_utils
-import socket  # 用于网络通信
 # 导入PyQt5相关组件用于GUI界面
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QHBoxLayout,
                              QLabel, QVBoxLayout, QFrame, QPushButton)
+from PyQt5.QtCore import QTimer
+import signal
+import sys
 import threading
-import queue
-import mono_open3d_vis
+import multiprocessing
+import frame_bus
+import frame_source
+import filter_bank
+import render_pacing
+import hand_shape
+import pose_library
 import numpy as np
 
-# 导入异步I/O库，用于处理异步操作
-import asyncio
-# 导入系统特定的参数和函数
-import sys
 # 导入时间访问和转换模块
 import time
-# 从自定义模块revo2_utils中导入硬件通信库libstark和日志记录器logger
-from revo2_utils import libstark, logger
-
-
-class DexterousHandController:
-    """灵巧手控制器类"""
-
-    def __init__(self, port="COM5", slave_id=0x7f):
-        """
-        初始化灵巧手控制器
-
-        :param port: 串口端口名称
-        :param slave_id: 从设备ID
-        """
-        self.port = port
-        self.slave_id = slave_id
-        self.baudrate = libstark.Baudrate.Baud460800
-        self.client = None
-        self.is_connected = False
-        self.speeds = [1000] * 6  # 默认速度
-
-    def connect(self):
-        """连接灵巧手设备"""
-        try:
-            # 创建新的事件循环
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-            # 运行连接协程
-            result = loop.run_until_complete(self._connect_async())
-            loop.close()
-            return result
-        except Exception as e:
-            logger.critical(f"Connection failed: {e}")
-            return False
-
-    async def _connect_async(self):
-        """异步连接方法"""
-        # 异步打开Modbus串口连接
-        self.client = await libstark.modbus_open(self.port, self.baudrate)
-        # 检查串口连接是否成功
-        if not self.client:
-            logger.critical(f"Failed to open serial port: {self.port}")
-            return False
-        # 异步获取指定从设备的信息
-        info = await self.client.get_device_info(self.slave_id)
-        # 检查设备信息获取是否成功
-        if not info:
-            logger.critical(f"Failed to get device info for right hand. Id: {self.slave_id}")
-            return False
-        # 记录设备描述信息到日志
-        logger.info(f"Right: {info.description}")
-        # 设置手指单元模式为归一化模式
-        await self.client.set_finger_unit_mode(self.slave_id, libstark.FingerUnitMode.Normalized)
-
-        self.is_connected = True
-        return True
-
-    def disconnect(self):
-        """断开灵巧手设备连接"""
-        if self.is_connected and self.client:
-            try:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                loop.run_until_complete(self._disconnect_async())
-                loop.close()
-            except Exception as e:
-                logger.error(f"Disconnection error: {e}")
-            finally:
-                self.is_connected = False
-
-    async def _disconnect_async(self):
-        """异步断开连接方法"""
-        # 异步关闭Modbus串口连接
-        await libstark.modbus_close(self.client)
-        logger.info("Hand disconnected")
-
-    def set_positions(self, positions):
-        """
-        设置手指位置
-
-        :param positions: 包含6个手指位置的列表
-        """
-        if not self.is_connected:
-            logger.warning("Hand is not connected")
-            return False
-
-        if len(positions) != 6:
-            logger.error("Positions list must contain exactly 6 values")
-            return False
-
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self._set_positions_async(positions))
-            loop.close()
-            return result
-        except Exception as e:
-            logger.error(f"Error setting positions: {e}")
-            return False
-
-    async def _set_positions_async(self, positions):
-        """异步设置位置方法"""
-        # 异步设置手指位置和速度
-        await self.client.set_finger_positions_and_speeds(self.slave_id, positions, self.speeds)
-        logger.info(f"Set positions: {positions}")
-        return True
-
-    def move_to_default(self):
-        """移动到默认位置"""
-        return self.set_positions([0, 0, 0, 0, 0, 0])
-
-    def move_finger(self, finger_index, position):
-        """
-        控制单个手指
-
-        :param finger_index: 手指索引 (0-5)
-        :param position: 位置值
-        """
-        if not 0 <= finger_index <= 5:
-            logger.error("Finger index must be between 0 and 5")
-            return False
-
-        positions = [0, 0, 0, 0, 0, 0]
-        positions[finger_index] = position
-        return self.set_positions(positions)
-
-
-class HandControlThread(threading.Thread):
-    """独立的灵巧手高速控制线程"""
-
-    def __init__(self, hand_controller, control_rate=1000):
-        """
-        初始化控制线程
-
-        :param hand_controller: 灵巧手控制器实例
-        :param control_rate: 控制频率 (Hz)
-        """
-        super().__init__()
-        self.hand_controller = hand_controller
-        self.control_rate = control_rate
-        self.target_positions = [0] * 6
-        self.current_positions = [0] * 6
-        self.running = False
-        self.lock = threading.Lock()
-        self.filter_factor = 0.25  # 平滑因子
-
-    def set_target_positions(self, positions):
-        """设置目标位置"""
-        with self.lock:
-            self.target_positions = positions[:]
-
-    def get_current_positions(self):
-        """获取当前位置"""
-        with self.lock:
-            return self.current_positions[:]
+# 灵巧手控制器（自带asyncio事件循环线程）和控制线程
+from hand_controller import (DexterousHandController, HandControlThread, SharedMotorSnapshot,
+                             glove_to_hand_positions)
+
+
+def run_paced_render_loop(visualizer, fetch_latest, should_stop, stats, interpolator=None):
+    """
+    按显示刷新率渲染：每个节拍只取最新的一帧，姿态有变化时才重新计算网格并重绘
+
+    :param fetch_latest: 无参函数，有新帧时返回 (24维拉伸率, 接收时间戳, 帧序号)，否则返回None
+    :param should_stop: 无参函数，返回True时退出循环
+    :param stats: render_pacing.RenderStats，记录渲染帧率和手套到屏幕的延迟
+    :param interpolator: 可选 render_pacing.GloveInterpolator，每个节拍显示插值/外推后的姿态，
+                         而不是直接显示最新收到的帧
+    """
+    pacer = render_pacing.FramePacer()
+    while not should_stop():
+        latest = fetch_latest()
+        if interpolator is not None:
+            if latest is not None:
+                glove_data, timestamp, frame_id = latest
+                interpolator.add(frame_id, glove_data, timestamp)
+            latest = interpolator.sample(time.time())
+        rendered_timestamp = None
+        if latest is not None:
+            glove_data, timestamp = latest[:2]
+            if visualizer.update_hand_pose(glove_data):
+                visualizer.vis.update_renderer()
+                rendered_timestamp = timestamp
+            else:
+                stats.add_skip()
+        # 处理窗口事件，需要重绘时在这里完成绘制
+        if not visualizer.vis.poll_events():
+            # 用户关闭了可视化窗口
+            return
+        if rendered_timestamp is not None:
+            stats.add_render(rendered_timestamp)
+        report = stats.report()
+        if report:
+            print(report)
+        pacer.wait()
 
-    def run(self):
-        """线程主循环"""
-        self.running = True
-        interval = 1.0 / self.control_rate
-
-        while self.running:
-            start_time = time.time()
-
-            # 更新位置并控制灵巧手
-            with self.lock:
-                for i in range(6):
-                    # 平滑逼近目标位置
-                    diff = self.target_positions[i] - self.current_positions[i]
-                    self.current_positions[i] += diff * self.filter_factor
-                    # 限制范围
-                    self.current_positions[i] = max(0, min(1000, self.current_positions[i]))
-
-            # 控制灵巧手
-            try:
-                self.hand_controller.set_positions([int(pos) for pos in self.current_positions])
-            except Exception as e:
-                print(f"灵巧手控制错误: {e}")
-
-            # 精确时间控制
-            elapsed = time.time() - start_time
-            sleep_time = max(0, interval - elapsed)
-            if sleep_time > 0:
-                time.sleep(sleep_time)
 
-    def stop(self):
-        """停止线程"""
-        self.running = False
-        self.join()
+def create_interpolator():
+    """按 config_utils.VISUALIZER_INTERPOLATION 创建渲染端插值器，关闭时返回None"""
+    return render_pacing.GloveInterpolator() if config_utils.VISUALIZER_INTERPOLATION else None
 
 
 class VisualizerThread(threading.Thread):
@@ -214,7 +73,9 @@ class VisualizerThread(threading.Thread):
     def __init__(self, is_rhand=True):
         super().__init__()
         self.is_rhand = is_rhand
-        self.data_queue = queue.Queue(maxsize=10)  # 限制队列大小，避免内存溢出
+        self.mailbox = render_pacing.LatestValueSlot()  # 只保留最新一帧，渲染不会落后
+        self.interpolator = create_interpolator()  # 版本号每帧加1，直接作为插值的帧序号
+        self.stats = render_pacing.RenderStats("可视化器线程", interpolator=self.interpolator)
         self.visualizer = None
         self.running = False
         self.daemon = True  # 设置为守护线程，主线程结束时自动退出
@@ -222,218 +83,251 @@ class VisualizerThread(threading.Thread):
     def run(self):
         """线程主函数"""
         try:
+            # open3d 只在可视化器线程启动时才导入，不拖慢主界面启动
+            import mono_open3d_vis
             # 创建右手可视化器实例
-            self.visualizer = mono_open3d_vis.MANOHandVisualizer(is_rhand=self.is_rhand)
+            # 按当前用户保存的手型显示（hand_shape.py 拟合或指定），没有保存时为标准手型
+            self.visualizer = mono_open3d_vis.MANOHandVisualizer(
+                is_rhand=self.is_rhand, betas=hand_shape.load_user_betas(config_utils.CALIBRATION_USER),
+                pose_library=pose_library.PoseLibrary(config_utils.POSE_LIBRARY_PATH))
             self.running = True
 
             print("可视化器线程已启动")
 
-            # 主循环 - 处理数据更新和可视化
-            while self.running:
-                try:
-                    # 从队列中获取数据，设置超时以允许检查running状态
-                    glove_data = self.data_queue.get(timeout=0.01)
-
-                    # 更新手部姿态
-                    self.visualizer.update_hand_pose(glove_data)
-
-                    # 更新渲染
-                    if self.visualizer.vis.poll_events():
-                        self.visualizer.vis.update_renderer()
-                    else:
-                        # 用户关闭了可视化窗口，停止线程
-                        self.running = False
-
-                except queue.Empty:
-                    # 队列为空，继续检查事件
-                    if self.visualizer and self.visualizer.vis.poll_events():
-                        self.visualizer.vis.update_renderer()
-                    continue
-                except Exception as e:
-                    print(f"可视化器线程处理数据时出错: {e}")
-                    continue
+            last_version = 0
 
+            def fetch_latest():
+                nonlocal last_version
+                item = self.mailbox.take(last_version)
+                if item is None:
+                    return None
+                last_version, glove_data, timestamp = item
+                return glove_data, timestamp, last_version
+
+            run_paced_render_loop(self.visualizer, fetch_latest, lambda: not self.running, self.stats,
+                                  self.interpolator)
         except Exception as e:
-            print(f"可视化器线程启动失败: {e}")
+            print(f"可视化器线程出错: {e}")
         finally:
+            self.running = False
             # 清理资源
             if self.visualizer:
                 self.visualizer.vis.destroy_window()
             print("可视化器线程已结束")
 
-    def update_data(self, glove_data_24d):
-        """向可视化器线程发送新的手套数据"""
+    def update_data(self, glove_data_24d, timestamp=None):
+        """
+        向可视化器线程发送新的手套数据，只保留最新的一帧
+
+        :param timestamp: 该帧的接收时间(time.time())，用于统计手套到屏幕的延迟，默认为当前时间
+        """
         if not self.running:
             return
-
-        try:
-            # 将数据放入队列，如果队列满则移除旧数据
-            if self.data_queue.full():
-                try:
-                    self.data_queue.get_nowait()
-                except queue.Empty:
-                    pass
-            self.data_queue.put_nowait(np.array(glove_data_24d))
-        except Exception as e:
-            print(f"向可视化器线程发送数据时出错: {e}")
+        self.mailbox.put(np.array(glove_data_24d), timestamp)
 
     def stop(self):
         """停止可视化器线程"""
         self.running = False
 
 
-# 定义24元素的调整参数
-# 缩放系数：负数表示取反，绝对值表示缩放比例
-scale_factors = np.array([
-    2.0,  # 第0维：保持符号，1.0倍缩放
-    2.0,  # 第1维：保持符号，1.0倍缩放
-    5.5,  # 第2维：取反，1.5倍缩放
-    5.5,  # 第3维：取反，2.0倍缩放
-    4,  # 第4维：取反，1.2倍缩放
-    1.0,  # 第5维：保持符号，1.0倍缩放
-    1.0,  # 第6维：保持符号，1.0倍缩放
-    4.5,  # 第7维：保持符号，1.0倍缩放
-    2.5,  # 第8维：保持符号，1.0倍缩放
-    -4.5,  # 第9维：保持符号，1.0倍缩放
-    1.0,  # 第10维：保持符号，1.0倍缩放
-    1.0,  # 第11维：保持符号，1.0倍缩放
-    1.0,  # 第12维：保持符号，1.0倍缩放
-    -2.0,  # 第13维：保持符号，1.0倍缩放
-    5.5,  # 第14维：保持符号，1.0倍缩放
-    5.5,  # 第15维：保持符号，1.0倍缩放
-    1.0,  # 第16维：保持符号，1.0倍缩放
-    1,  # 第17维：取反，1.8倍缩放
-    4.5,  # 第18维：保持符号，1.0倍缩放
-    5.5,  # 第19维：保持符号，1.0倍缩放
-    1.0,  # 第20维：保持符号，1.0倍缩放
-    1.0,  # 第21维：保持符号，1.0倍缩放
-    1.0,  # 第22维：保持符号，1.0倍缩放
-    1.0,  # 第23维：保持符号，1.0倍缩放
-])
-# 定义24元素的偏移量数组
-offsets = np.array([
-    -0.2,  # 第0维：偏移量0
-    0.1,  # 第1维：偏移量0
-    -0.5,  # 第2维：偏移量0.1
-    -0.5,  # 第3维：偏移量-0.05
-    -0.5,  # 第4维：偏移量0
-    -0.4,  # 第5维：偏移量0
-    -0.2,  # 第6维：偏移量0
-    -0.5,  # 第7维：偏移量0
-    0.5,  # 第8维：偏移量0
-    0.5,  # 第9维：偏移量0
-    0.0,  # 第10维：偏移量0
-    0.0,  # 第11维：偏移量0
-    0.0,  # 第12维：偏移量0
-    0.0,  # 第13维：偏移量0
-    -0.6,  # 第14维：偏移量0
-    -0.5,  # 第15维：偏移量0
-    0,  # 第16维：偏移量0
-    0,  # 第17维：偏移量0
-    -0.6,  # 第18维：偏移量0
-    -0.6,  # 第19维：偏移量0
-    0.0,  # 第20维：偏移量0
-    0.0,  # 第21维：偏移量0
-    0.0,  # 第22维：偏移量0
-    0.0,  # 第23维：偏移量0
-])
+def visualizer_process_main(bus_name, stop_event, is_rhand=True):
+    """可视化器进程入口：从共享内存总线读取最新帧并渲染，不与接收进程争抢GIL"""
+    bus = frame_bus.FrameBus(bus_name)
+    visualizer = None
+    try:
+        # 在子进程中才导入open3d，主进程和灵巧手控制进程都不需要加载它
+        import mono_open3d_vis
+        visualizer = mono_open3d_vis.MANOHandVisualizer(
+            is_rhand=is_rhand, betas=hand_shape.load_user_betas(config_utils.CALIBRATION_USER),
+            pose_library=pose_library.PoseLibrary(config_utils.POSE_LIBRARY_PATH))
+        print("可视化器进程已启动")
+        last_frame_id = 0
+
+        def fetch_latest():
+            nonlocal last_frame_id
+            frame = bus.read_latest(last_frame_id)
+            if frame is None:
+                return None
+            last_frame_id, timestamp, _, stretch_ratios = frame
+            return None if stretch_ratios is None else (stretch_ratios, timestamp, last_frame_id)
+
+        interpolator = create_interpolator()  # 总线帧编号每帧加1，直接作为插值的帧序号
+        run_paced_render_loop(visualizer, fetch_latest, stop_event.is_set,
+                              render_pacing.RenderStats("可视化器进程", interpolator=interpolator), interpolator)
+    except Exception as e:
+        print(f"可视化器进程出错: {e}")
+    finally:
+        if visualizer:
+            visualizer.vis.destroy_window()
+        bus.close()
+        print("可视化器进程已结束")
+
+
+def hand_control_process_main(bus_name, stop_event, telemetry=None, port=config_utils.HAND_PORT,
+                              control_rate=config_utils.HAND_CONTROL_RATE):
+    """
+    灵巧手控制进程入口：从共享内存总线读取最新帧并更新控制线程的目标位置
+
+    :param telemetry: 可选 SharedMotorSnapshot，电机状态快照写入其中供界面进程读取
+    """
+    bus = frame_bus.FrameBus(bus_name)
+    hand_controller = DexterousHandController(port=port)
+    if not hand_controller.connect():
+        print("灵巧手连接失败")
+        bus.close()
+        return
+    print("灵巧手连接成功")
+    # 初始化到默认位置
+    hand_controller.move_to_default()
+    if telemetry is not None:
+        hand_controller.start_telemetry(sink=telemetry.write)
+    hand_control_thread = HandControlThread(hand_controller, control_rate=control_rate)
+    hand_control_thread.start()
+    try:
+        last_frame_id = 0
+        while not stop_event.is_set():
+            frame = bus.wait_for_frame(last_frame_id, timeout=0.1)
+            if frame is None:
+                continue
+            last_frame_id, _, _, stretch_ratios = frame
+            if stretch_ratios is not None:
+                hand_control_thread.set_target_positions(glove_to_hand_positions(stretch_ratios))
+    except Exception as e:
+        print(f"灵巧手控制进程出错: {e}")
+    finally:
+        hand_control_thread.stop()
+        hand_controller.disconnect()
+        print("灵巧手已断开")
+        bus.close()
+
 
 # 程序入口点
 if __name__ == "__main__":
-    HOST, PORT = '0.0.0.0', 8888  # 定义服务器地址和端口
     receiver = data_display_gui.HighSpeedReceiver()  # 创建接收器实例
 
-    # 创建socket连接
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)  # 创建TCP socket
-    s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # 禁用Nagle算法提高实时性
-    s.bind((HOST, PORT))  # 绑定地址和端口
-    s.listen()  # 开始监听连接
-    print(f"Listening on {HOST}:{PORT}...")  # 打印监听信息
-    conn, addr = s.accept()  # 接受客户端连接
-    print(f"Connected by {addr}")  # 打印连接信息
+    # 按config_utils.FRAME_TRANSPORT创建帧源（TCP/UDP/串口），TCP会阻塞直到ESP32连入
+    source = frame_source.create_frame_source()
+    source.open()
 
-    # 创建并启动可视化器线程
-    visualizer_thread = VisualizerThread(is_rhand=True)
-    visualizer_thread.start()
+    bus = None
+    stop_event = None
+    worker_processes = []
+    visualizer_thread = None
+    hand_controller = None
+    hand_connected = False
+    hand_control_thread = None
+    hand_telemetry = None
+
+    if config_utils.USE_PROCESS_BUS:
+        # 创建共享内存总线，可视化器和灵巧手控制各自运行在独立进程中
+        try:
+            bus = frame_bus.FrameBus(create=True)
+        except FileExistsError as e:
+            print(e)
+            source.close()
+            sys.exit(1)
+        stop_event = multiprocessing.Event()
+        hand_telemetry = SharedMotorSnapshot()  # 控制进程轮询的电机状态，界面定时读取
+        worker_processes = [
+            multiprocessing.Process(target=visualizer_process_main, args=(bus.name, stop_event, True),
+                                    name="visualizer", daemon=True),
+            multiprocessing.Process(target=hand_control_process_main, args=(bus.name, stop_event, hand_telemetry),
+                                    name="hand_control", daemon=True),
+        ]
+        for process in worker_processes:
+            process.start()
+    else:
+        # 创建并启动可视化器线程
+        visualizer_thread = VisualizerThread(is_rhand=True)
+        visualizer_thread.start()
 
     # 启动Qt应用
     app = QApplication([])  # 创建Qt应用程序
-    display = data_display_gui.DataDisplay(receiver, conn)  # 创建显示窗口，传入conn对象
+    display = data_display_gui.DataDisplay(receiver, source)  # 创建显示窗口，传入帧源
     display.show()  # 显示窗口
-
-    # 灵巧手控制初始化 - 使用新的简单类
-    hand_controller = DexterousHandController(port="COM5")
-    hand_connected = hand_controller.connect()
-    hand_control_thread = None
-    if hand_connected:
-        print("灵巧手连接成功")
-        # 初始化到默认位置
-        hand_controller.move_to_default()
-        # 启动独立的控制线程
-        hand_control_thread = HandControlThread(hand_controller, control_rate=100)  # 100Hz高速控制
-        hand_control_thread.start()
-    else:
-        print("灵巧手连接失败")
+    if config_utils.BASELINE_TRACKING:
+        display.exoskeleton.enable_baseline_tracking()  # 手静止时在线修正预拉伸电阻的漂移
+    stretch_filter = filter_bank.FilterBank()  # 按config_utils.FILTER_BANK构建的拉伸率滤波器组
+    filter_calibration = display.exoskeleton.calibration_version  # 滤波器状态对应的校准版本
+    if hand_telemetry is not None:
+        display.set_hand_telemetry(hand_telemetry.read)
+
+    if not config_utils.USE_PROCESS_BUS:
+        # 灵巧手控制初始化 - 使用新的简单类
+        hand_controller = DexterousHandController(port=config_utils.HAND_PORT)
+        hand_connected = hand_controller.connect()
+        if hand_connected:
+            print("灵巧手连接成功")
+            # 初始化到默认位置
+            hand_controller.move_to_default()
+            # 电机状态轮询与命令共用控制器的事件循环，界面定时读取缓存的快照
+            hand_controller.start_telemetry()
+            display.set_hand_telemetry(lambda: hand_controller.telemetry)
+            # 启动独立的控制线程
+            # 按 config_utils.HAND_CONTROL_RATE 高速控制，命令合并后由控制器的事件循环线程发送
+            hand_control_thread = HandControlThread(hand_controller)
+            hand_control_thread.start()
+        else:
+            print("灵巧手连接失败")
+
+    def on_frames(frames):
+        """读取线程回调：每帧计算一次拉伸率并转发，绕过UI界面，UI只显示每批最新一帧"""
+        global filter_calibration
+        received_at = time.time()  # 整批帧的接收时间，作为手套到屏幕延迟的起点
+        # 整批向量化计算拉伸率，未校准时为None
+        resistances, stretch_batch = display.exoskeleton.calculate_stretch_batch(frames, update_baseline=True)
+        if stretch_batch is not None:
+            if display.exoskeleton.calibration_version != filter_calibration:
+                # 重新校准或切换用户后R0跳变，清空滤波器状态，避免把旧校准下的拉伸率拖进新校准
+                # （在读取线程中重置，不与 process 并发）
+                filter_calibration = display.exoskeleton.calibration_version
+                stretch_filter.reset()
+            stretch_batch = stretch_filter.process(stretch_batch)  # 逐通道滤波后再交给消费者
+            display.filtered_stretch_ratios = stretch_batch[-1]  # 界面保存手势时使用与可视化器相同的数据
+        for i, voltages in enumerate(frames):
+            glove_data_24d = stretch_batch[i] if stretch_batch is not None else None
+            if bus is not None:
+                # 每帧只发布一次，各订阅进程自行读取最新的一致帧
+                bus.publish(voltages, glove_data_24d, timestamp=received_at)
+                continue
+            # 将24维数据发送到可视化器线程
+            if glove_data_24d is not None:  # 批量计算保证每行都是24通道
+                adjusted_data = glove_data_24d
+                if hand_connected and hand_control_thread:
+                    try:
+                        # 发送目标位置到控制线程
+                        hand_control_thread.set_target_positions(glove_to_hand_positions(adjusted_data))
+                    except Exception as e:
+                        print(f"灵巧手控制错误: {e}")
+
+                visualizer_thread.update_data(adjusted_data, received_at)  # 缩放、偏移在可视化器的映射中完成
+
+    # Ctrl+C 退出Qt事件循环；Qt循环中Python信号处理需要定期回到解释器，用一个低频空定时器实现
+    signal.signal(signal.SIGINT, lambda *_: app.quit())
+    interrupt_timer = QTimer()
+    interrupt_timer.timeout.connect(lambda: None)
+    interrupt_timer.start(500)
 
     try:
-        # 主循环 - 处理数据接收和转发到可视化器
-        while True:
-            # 处理Qt事件
-            app.processEvents()  # 如果想让QT实时显示，就取消注释这一行，但是会比较卡顿
-            # 接收数据
-            frame = receiver.receive(conn)
-            if frame is not None:
-                # 是用这个Receiver直接获取到数据，绕过UI界面，UI界面太慢了
-                resistances, glove_data_24d = display.exoskeleton.calculate_real_time_stretch(
-                    receiver.latest_reversed_data)
-                # 将24维数据发送到可视化器线程
-                # glove_data_24d = display.my_stretch_ratios[:24]  # 确保是24维
-                if len(glove_data_24d) == 24:
-                    adjusted_data = np.array(glove_data_24d)
-                    if hand_connected and hand_control_thread:
-                        try:
-                            # 使用指定位置的元素：7, 3, 18, 19 以及另外两个位置
-                            # 这里我假设您需要6个位置，所以添加了位置0和1作为示例
-                            # 您可以根据实际需要调整这些索引
-                            finger_indices = [8, 5, 4, 2, 14, 15]  # 6个手指对应的数据索引
-
-                            hand_positions = []
-                            for i in range(6):  # 6个手指
-                                # 获取指定位置的数据
-                                finger_value = adjusted_data[finger_indices[i]]
-                                if i == 0:
-                                    finger_value = adjusted_data[finger_indices[i]] + adjusted_data[9]
-                                # 映射到0-1000范围
-                                position = int(finger_value * 3000)  # 根据需要调整映射关系
-                                position = max(0, min(1000, position))  # 限制在有效范围内
-                                hand_positions.append(position)
-
-                            # 控制灵巧手
-                            # 发送目标位置到控制线程
-                            hand_control_thread.set_target_positions(hand_positions)
-                            # hand_controller.set_positions(hand_positions)
-                            # 可选：打印当前控制数据用于调试
-                            # print(f"Hand positions: {hand_positions}")
-
-                        except Exception as e:
-                            print(f"灵巧手控制错误: {e}")
-
-                    # 应用缩放和偏移：先缩放，再加偏移
-                    adjusted_data = adjusted_data * scale_factors + offsets
-                    # print(glove_data_24d)
-                    visualizer_thread.update_data(adjusted_data.tolist())
-
-    except KeyboardInterrupt:  # 捕获键盘中断
+        # 数据由读取线程驱动，主线程只运行Qt事件循环，空闲时不占用CPU
+        display.start_receiving(on_frames)
+        app.exec_()
         print("\nStopped.")  # 打印停止信息
     finally:
-        # 停止所有线程
+        # 停止所有线程和进程
+        if stop_event is not None:
+            stop_event.set()
+            for process in worker_processes:
+                process.join(timeout=2.0)
+        display.stop_receiving()
+        if bus is not None:
+            bus.close()
         if hand_control_thread:
             hand_control_thread.stop()
-        visualizer_thread.stop()
         if hand_connected:
             hand_controller.disconnect()
             print("灵巧手已断开")
         # 停止可视化器线程
-        visualizer_thread.stop()
-        conn.close()  # 关闭客户端连接
-        s.close()  # 关闭服务器socket
+        if visualizer_thread:
+            visualizer_thread.stop()
+        source.close()  # 关闭帧源连接
@@ -0,0 +1,145 @@
+"""
+录制数据的MANO批量离线计算
+
+读取一段录制的24维手套数据（拉伸率），经 glove_mapping 映射为PCA姿态后，
+按批调用 ManoModel.forward_batch 计算每一帧的网格顶点和关节位置，
+离线渲染和分析时不需要再按实时速度回放。
+
+支持的输入：
+- .csv : 手势采集程序保存的文件（使用 dR_ratio_1..24 列），或任意含24列数值的CSV（取最后24列）
+- .npy : (N, 24) 数组
+- .npz : 默认取第一个数组，可用 --key 指定
+
+输出：
+- *.npz : 压缩保存 vertices(N,778,3)、joints(N,16,3)、hand_pose(N,45)、faces，CSV中有时间列时同时保存 times
+- 目录  : 以 .npy 内存映射文件逐批写入，适合长时间录制，读取时用 np.load(..., mmap_mode='r')
+
+用法示例：
+    python mano_batch_eval.py session.csv -o session_mano.npz
+    python mano_batch_eval.py session.npy -o session_mano/ --batch 1024
+"""
+
+import argparse
+import csv
+import os
+import time
+
+import numpy as np
+
+import config_utils
+import glove_mapping
+import mano_numpy
+
+CSV_COLUMN_PREFIX = "dR_ratio_"
+CSV_TIME_COLUMN = "Time(s)"
+
+
+def load_session(path, key=None, column_prefix=CSV_COLUMN_PREFIX):
+    """
+    读取录制数据
+
+    :return: (glove_data, times)，glove_data 形状 (N, 24)，没有时间列时 times 为None
+    """
+    ext = os.path.splitext(path)[1].lower()
+    times = None
+    if ext == '.npy':
+        glove_data = np.load(path, mmap_mode='r')
+    elif ext == '.npz':
+        with np.load(path) as data:
+            glove_data = data[key or data.files[0]]
+            if 'times' in data.files:
+                times = data['times']
+    elif ext == '.csv':
+        with open(path, 'r', newline='') as f:
+            header = next(csv.reader(f))
+        columns = [i for i, name in enumerate(header) if name.startswith(column_prefix)]
+        if not columns:
+            columns = list(range(len(header) - config_utils.TOTAL_CELLS, len(header)))
+        table = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)
+        glove_data = table[:, columns]
+        if CSV_TIME_COLUMN in header:
+            times = table[:, header.index(CSV_TIME_COLUMN)]
+    else:
+        raise ValueError(f"不支持的文件格式: {path}")
+    if glove_data.ndim != 2 or glove_data.shape[1] != config_utils.TOTAL_CELLS:
+        raise ValueError(f"录制数据形状应为 (N, {config_utils.TOTAL_CELLS})，实际为 {glove_data.shape}")
+    return glove_data, times
+
+
+def evaluate_session(model, mapping, glove_data, vertices_out, joints_out, poses_out, batch_size=512,
+                     progress=None):
+    """
+    按批计算整段数据，结果写入预先分配的数组（可以是内存映射数组）
+
+    :param progress: 可选回调 progress(已完成帧数, 总帧数)
+    """
+    num_frames = len(glove_data)
+    for start in range(0, num_frames, batch_size):
+        stop = min(start + batch_size, num_frames)
+        poses = mapping.map(glove_data[start:stop])
+        vertices, joints = model.forward_batch(poses)
+        poses_out[start:stop] = poses
+        vertices_out[start:stop] = vertices
+        joints_out[start:stop] = joints
+        if progress:
+            progress(stop, num_frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='对录制的手套数据批量计算MANO顶点和关节')
+    parser.add_argument('session', help='录制数据文件 (.csv/.npy/.npz)')
+    parser.add_argument('-o', '--output', required=True,
+                        help='输出 .npz 文件，或输出目录（写入内存映射的 .npy 文件）')
+    parser.add_argument('--model', default=config_utils.MANO_RIGHT_MODEL, help='MANO模型文件 (默认: mano/MANO_RIGHT.npz)')
+    parser.add_argument('--batch', type=int, default=512, help='每批帧数 (默认: 512)')
+    parser.add_argument('--key', help='.npz 输入中的数组名')
+    args = parser.parse_args()
+
+    glove_data, times = load_session(args.session, key=args.key)
+    num_frames = len(glove_data)
+    model = mano_numpy.ManoModel(args.model)
+    mapping = glove_mapping.GloveToManoMapping()
+    print(f"读取 {num_frames} 帧: {args.session}")
+
+    vertex_shape = (num_frames, model.num_vertices, 3)
+    joint_shape = (num_frames, mano_numpy.NUM_JOINTS, 3)
+    pose_shape = (num_frames, mano_numpy.NUM_PCA_COMPONENTS)
+    to_npz = args.output.lower().endswith('.npz')
+    if to_npz:
+        vertices = np.empty(vertex_shape, dtype=np.float32)
+        joints = np.empty(joint_shape, dtype=np.float32)
+        poses = np.empty(pose_shape, dtype=np.float32)
+    else:
+        os.makedirs(args.output, exist_ok=True)
+        open_memmap = np.lib.format.open_memmap
+        vertices = open_memmap(os.path.join(args.output, 'vertices.npy'), mode='w+', dtype=np.float32,
+                               shape=vertex_shape)
+        joints = open_memmap(os.path.join(args.output, 'joints.npy'), mode='w+', dtype=np.float32,
+                             shape=joint_shape)
+        poses = open_memmap(os.path.join(args.output, 'hand_pose.npy'), mode='w+', dtype=np.float32,
+                            shape=pose_shape)
+
+    def report(done, total):
+        print(f"\r{done}/{total} 帧", end='', flush=True)
+
+    start = time.perf_counter()
+    evaluate_session(model, mapping, glove_data, vertices, joints, poses, batch_size=args.batch, progress=report)
+    elapsed = time.perf_counter() - start
+    print(f"\n计算完成: {elapsed:.2f} s ({elapsed * 1e6 / max(1, num_frames):.1f} us/帧)")
+
+    extra = {'faces': model.faces}
+    if times is not None:
+        extra['times'] = times
+    if to_npz:
+        np.savez_compressed(args.output, vertices=vertices, joints=joints, hand_pose=poses, **extra)
+    else:
+        for name, array in extra.items():
+            np.save(os.path.join(args.output, f'{name}.npy'), array)
+        vertices.flush()
+        joints.flush()
+        poses.flush()
+    print(f"已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+纯NumPy的MANO线性混合蒙皮(LBS)
+
+smplx 的 MANO 每帧都要重新计算形状混合、关节回归，再把 torch 张量转回 NumPy。
+可视化时形状参数(betas)固定，ManoModel 在初始化（或 set_betas 切换用户手型）时一次性预计算：
+- 形状混合后的模板顶点 v_shaped 和静止姿态关节 J_rest（按betas缓存，切换回已用过的手型不再重新计算）
+- PCA姿态基、平均姿态、展平后的 posedirs
+每帧只需要：PCA->轴角、16个关节的Rodrigues、姿态混合、按层级的运动链、蒙皮，
+中间结果全部写入预先分配的缓冲区。计算过程与 smplx.lbs 一致（平均手姿态、Rodrigues的1e-8项）。
+
+load_mano_pkl() 不依赖 chumpy 读取官方的 MANO_RIGHT.pkl / MANO_LEFT.pkl。
+官方pkl读取慢（需要scipy和pickle），可以一次性转换为所有程序共用的 .npz：
+
+    python mano_numpy.py ../mano/MANO_RIGHT.pkl        # 生成 ../mano/MANO_RIGHT.npz
+
+load_mano() 根据扩展名读取 .npz 或 .pkl。
+"""
+
+import argparse
+import copy
+import os
+import pickle
+
+import numpy as np
+
+NUM_JOINTS = 16
+NUM_PCA_COMPONENTS = 45
+NUM_BETAS = 10
+
+
+class _ChumpyStub:
+    """反序列化时代替 chumpy 对象，只保留其状态字典"""
+
+    def __setstate__(self, state):
+        self.state = state
+
+
+class _ManoUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        if module.startswith('chumpy'):
+            return _ChumpyStub
+        return super().find_class(module, name)
+
+
+def _chumpy_to_array(value):
+    """把 chumpy 的 Ch / Select 对象还原为 ndarray"""
+    if not isinstance(value, _ChumpyStub):
+        return np.asarray(value)
+    state = value.state
+    if 'x' in state:  # Ch
+        return np.asarray(state['x'])
+    # Select：a.ravel()[idxs].reshape(preferred_shape)
+    source = _chumpy_to_array(state['a'])
+    return source.ravel()[state['idxs']].reshape(state['preferred_shape'])
+
+
+def load_mano_pkl(path):
+    """
+    读取官方MANO模型文件，不需要安装 chumpy
+
+    :return: 字典，键为 v_template, f, weights, posedirs, shapedirs, J_regressor, kintree_table,
+             hands_components, hands_mean，值均为 ndarray
+    """
+    with open(path, 'rb') as f:
+        data = _ManoUnpickler(f, encoding='latin1').load()
+    j_regressor = data['J_regressor']
+    if hasattr(j_regressor, 'toarray'):  # scipy稀疏矩阵
+        j_regressor = j_regressor.toarray()
+    return {
+        'v_template': np.asarray(data['v_template'], dtype=np.float64),
+        'f': np.asarray(data['f'], dtype=np.int32),
+        'weights': np.asarray(data['weights'], dtype=np.float64),
+        'posedirs': np.asarray(data['posedirs'], dtype=np.float64),
+        'shapedirs': _chumpy_to_array(data['shapedirs']).astype(np.float64),
+        'J_regressor': np.asarray(j_regressor, dtype=np.float64),
+        'kintree_table': np.asarray(data['kintree_table']).astype(np.int64),
+        'hands_components': np.asarray(data['hands_components'], dtype=np.float64),
+        'hands_mean': np.asarray(data['hands_mean'], dtype=np.float64),
+    }
+
+
+# .npz 中保存的数组；posedirs以float32保存，与ManoModel的计算精度一致
+NPZ_KEYS = ('v_template', 'f', 'weights', 'posedirs', 'shapedirs', 'J_regressor', 'kintree_table',
+            'hands_components', 'hands_mean')
+
+
+def save_mano_npz(model_data, path):
+    """把 load_mano_pkl() 的结果保存为紧凑的 .npz"""
+    arrays = {key: model_data[key] for key in NPZ_KEYS}
+    arrays['posedirs'] = arrays['posedirs'].astype(np.float32)
+    arrays['hands_components'] = arrays['hands_components'][:NUM_PCA_COMPONENTS]
+    np.savez(path, **arrays)
+
+
+def load_mano(path):
+    """读取MANO模型数据，.npz 直接加载，其他扩展名按官方pkl解析"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"MANO模型文件 {path} 不存在")
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            return {key: data[key] for key in NPZ_KEYS}
+    return load_mano_pkl(path)
+
+
+# 反对称矩阵 K 在展平的3x3中非零元素的位置、对应的轴分量和符号
+_SKEW_INDEX = [1, 2, 3, 5, 6, 7]
+_SKEW_AXIS = [2, 1, 2, 0, 1, 0]
+_SKEW_SIGN = np.array([-1.0, 1.0, 1.0, -1.0, -1.0, 1.0])
+
+
+def batch_rodrigues(rot_vecs, out=None):
+    """
+    轴角 -> 旋转矩阵，R = I + sin(θ)K + (1-cos(θ))K²
+
+    :param rot_vecs: (..., 3) 轴角
+    :return: (..., 3, 3) 旋转矩阵
+    """
+    rot_vecs = np.asarray(rot_vecs, dtype=np.float64)
+    shape = rot_vecs.shape[:-1]
+    angle = np.sqrt(((rot_vecs + 1e-8) ** 2).sum(axis=-1, keepdims=True))  # 与smplx一致，避免除零
+    axis = rot_vecs / angle
+    k = np.zeros(shape + (9,))
+    k[..., _SKEW_INDEX] = axis[..., _SKEW_AXIS] * _SKEW_SIGN
+    k = k.reshape(shape + (3, 3))
+    if out is None:
+        out = np.empty(shape + (3, 3))
+    np.matmul(k, k, out=out)
+    out *= (1.0 - np.cos(angle))[..., np.newaxis]
+    out += np.sin(angle)[..., np.newaxis] * k
+    out.reshape(shape + (9,))[..., ::4] += 1.0  # 加单位阵
+    return out
+
+
+def _chain_levels(parents):
+    """按运动链深度分组关节（根节点除外），同一层的关节可以一次矩阵乘法完成"""
+    depth = np.zeros(len(parents), dtype=np.int64)
+    for i in range(1, len(parents)):
+        depth[i] = depth[parents[i]] + 1
+    return [np.nonzero(depth == level)[0] for level in range(1, depth.max() + 1)]
+
+
+class ManoModel:
+    """固定形状参数的MANO模型，逐帧计算顶点"""
+
+    def __init__(self, model_data, betas=None, flat_hand_mean=False):
+        """
+        :param model_data: load_mano() 返回的字典，或模型文件路径(.npz/.pkl)
+        :param betas: 10维形状参数，None表示标准手型
+        :param flat_hand_mean: True时不叠加平均手姿态（对应smplx同名参数）
+        """
+        if isinstance(model_data, str):
+            model_data = load_mano(model_data)
+        self.faces = np.asarray(model_data['f'], dtype=np.int32)
+        self.weights = np.ascontiguousarray(model_data['weights'], dtype=np.float64)  # (778, 16)
+        self.v_template = np.asarray(model_data['v_template'], dtype=np.float64)
+        self.shapedirs = np.asarray(model_data['shapedirs'], dtype=np.float64)  # (778, 3, 10)
+        self.J_regressor = np.asarray(model_data['J_regressor'], dtype=np.float64)  # (16, 778)
+        self.parents = np.asarray(model_data['kintree_table'], dtype=np.int64)[0].copy()
+        self.parents[0] = -1
+        self.levels = _chain_levels(self.parents)
+        self.num_vertices = len(self.v_template)
+
+        # PCA姿态基和平均姿态
+        self.hands_components = np.ascontiguousarray(model_data['hands_components'][:NUM_PCA_COMPONENTS],
+                                                     dtype=np.float64)
+        self.hands_mean = (np.zeros(NUM_PCA_COMPONENTS) if flat_hand_mean
+                           else np.asarray(model_data['hands_mean'], dtype=np.float64))
+        # posedirs展平为 (778*3, 135)，姿态混合是一次矩阵-向量乘法。
+        # 这一步受内存带宽限制（float64时每帧读2.5MB），用float32存储读取量减半，
+        # 精度与smplx默认的float32一致
+        posedirs = np.asarray(model_data['posedirs'])
+        self.posedirs = np.ascontiguousarray(posedirs.reshape(-1, posedirs.shape[-1]), dtype=np.float32)
+
+        self._allocate_buffers()
+        self._shape_cache = {}  # betas字节串 -> (betas, v_shaped, J_rest, J_rel)，clone() 得到的副本共用
+        self.set_betas(betas)
+
+    def _allocate_buffers(self):
+        """分配每帧复用的缓冲区"""
+        self._full_pose = np.zeros((NUM_JOINTS, 3))
+        self._rot_mats = np.empty((NUM_JOINTS, 3, 3))
+        self._pose_feature = np.empty((NUM_JOINTS - 1, 3, 3), dtype=np.float32)
+        self._pose_offsets = np.empty(self.num_vertices * 3, dtype=np.float32)
+        self._v_posed = np.ones((self.num_vertices, 4))  # 齐次坐标，最后一列恒为1
+        self._transforms = np.zeros((NUM_JOINTS, 3, 4))
+        self._skinning = np.empty((self.num_vertices, 12))
+        self.vertices = np.empty((self.num_vertices, 3))
+        self.joints = np.empty((NUM_JOINTS, 3))
+        self._identity = np.eye(3)
+
+    def clone(self):
+        """
+        共享模型数据的副本
+
+        模板、蒙皮权重、姿态基等只读数组与原模型共用同一份内存，只重新分配每帧缓冲区，
+        多个手部网格（例如双手渲染）可以各自调用 forward 而不互相覆盖中间结果
+        """
+        twin = copy.copy(self)
+        twin._allocate_buffers()
+        return twin
+
+    def set_betas(self, betas):
+        """
+        更新形状参数，形状相关的量每种betas只计算一次
+
+        结果数组整体替换而不是原地修改，clone() 得到的副本可以各自使用不同的手型
+        """
+        betas = np.zeros(NUM_BETAS) if betas is None else np.asarray(betas, dtype=np.float64).ravel()
+        key = betas.tobytes()
+        shape = self._shape_cache.get(key)
+        if shape is None:
+            v_shaped = self.v_template + self.shapedirs[..., :len(betas)] @ betas
+            J_rest = self.J_regressor @ v_shaped  # (16, 3)
+            # 各关节相对父关节的静止偏移
+            J_rel = J_rest.copy()
+            J_rel[1:] -= J_rest[self.parents[1:]]
+            shape = self._shape_cache[key] = (betas.copy(), v_shaped, J_rest, J_rel)
+        self.betas, self.v_shaped, self.J_rest, self.J_rel = shape
+
+    def shape_point_basis(self, vertex_ids=(), joint_ids=()):
+        """
+        静止姿态下指定顶点和关节随形状参数的线性变化
+
+        v_shaped 和 J_rest 都是betas的线性函数，p(betas) = base + dirs @ betas，拟合手型时使用
+
+        :return: (base, dirs)，形状分别为 (N, 3) 和 (N, 3, 10)，先顶点后关节
+        """
+        vertex_ids, joint_ids = list(vertex_ids), list(joint_ids)
+        base = np.concatenate([self.v_template[vertex_ids], self.J_regressor[joint_ids] @ self.v_template])
+        dirs = np.concatenate([self.shapedirs[vertex_ids],
+                               np.einsum('jv,vcb->jcb', self.J_regressor[joint_ids], self.shapedirs)])
+        return base, dirs
+
+    def pca_to_axis_angle(self, hand_pose_pca):
+        """45维PCA系数 -> 15个关节的轴角（已叠加平均姿态），形状 (..., 45)"""
+        return np.asarray(hand_pose_pca, dtype=np.float64) @ self.hands_components + self.hands_mean
+
+    def forward(self, hand_pose_pca, global_orient=None, out=None):
+        """
+        计算一帧的网格顶点
+
+        :param hand_pose_pca: 45维PCA姿态
+        :param global_orient: 3维全局旋转轴角，None表示不旋转
+        :param out: 可选 (778, 3) float64 输出数组，例如 Open3D 顶点缓冲区的NumPy视图
+        :return: (778, 3) 顶点数组。未指定out时返回内部缓冲区，下一次调用会被覆盖
+        """
+        full_pose = self._full_pose
+        full_pose[0] = 0.0 if global_orient is None else global_orient
+        np.matmul(hand_pose_pca, self.hands_components, out=full_pose[1:].reshape(-1))
+        full_pose[1:].reshape(-1)[:] += self.hands_mean
+        rot_mats = batch_rodrigues(full_pose, out=self._rot_mats)
+
+        # 姿态混合：(R - I) 展平后乘 posedirs
+        np.subtract(rot_mats[1:], self._identity, out=self._pose_feature)
+        np.matmul(self.posedirs, self._pose_feature.reshape(-1), out=self._pose_offsets)
+        v_posed = self._v_posed
+        np.add(self.v_shaped, self._pose_offsets.reshape(-1, 3), out=v_posed[:, :3])
+
+        # 运动链：同一深度的关节一起计算世界变换 [R | t]
+        transforms = self._transforms
+        transforms[0, :, :3] = rot_mats[0]
+        transforms[0, :, 3] = self.J_rest[0]
+        for level in self.levels:
+            parent = transforms[self.parents[level]]
+            transforms[level, :, :3] = parent[:, :, :3] @ rot_mats[level]
+            transforms[level, :, 3] = (parent[:, :, :3] @ self.J_rel[level][..., np.newaxis])[..., 0] + parent[:, :, 3]
+        self.joints[:] = transforms[:, :, 3]
+        # 去掉静止姿态关节位置，得到作用于静止顶点的相对变换
+        transforms[:, :, 3] -= (transforms[:, :, :3] @ self.J_rest[..., np.newaxis])[..., 0]
+
+        # 蒙皮：逐顶点混合 3x4 变换后作用于姿态混合后的顶点
+        skinning = np.matmul(self.weights, transforms.reshape(NUM_JOINTS, 12), out=self._skinning)
+        out = self.vertices if out is None else out
+        np.einsum('vij,vj->vi', skinning.reshape(-1, 3, 4), v_posed, out=out)
+        return out
+
+    __call__ = forward
+
+    def forward_batch(self, hand_pose_pca, global_orient=None):
+        """
+        一次计算多帧，所有步骤都在批维度上向量化
+
+        :param hand_pose_pca: (B, 45) PCA姿态
+        :param global_orient: (B, 3) 或 (3,) 全局旋转轴角，None表示不旋转
+        :return: (vertices, joints)，形状分别为 (B, 778, 3) 和 (B, 16, 3)
+        """
+        hand_pose_pca = np.asarray(hand_pose_pca, dtype=np.float64)
+        batch = len(hand_pose_pca)
+        full_pose = np.zeros((batch, NUM_JOINTS, 3))
+        if global_orient is not None:
+            full_pose[:, 0] = global_orient
+        full_pose[:, 1:] = self.pca_to_axis_angle(hand_pose_pca).reshape(batch, NUM_JOINTS - 1, 3)
+        rot_mats = batch_rodrigues(full_pose)  # (B, 16, 3, 3)
+
+        pose_feature = (rot_mats[:, 1:] - self._identity).reshape(batch, -1).astype(np.float32)
+        v_posed = np.ones((batch, self.num_vertices, 4))
+        v_posed[:, :, :3] = self.v_shaped + (pose_feature @ self.posedirs.T).reshape(batch, -1, 3)
+
+        transforms = np.empty((batch, NUM_JOINTS, 3, 4))
+        rotations, translations = transforms[..., :3], transforms[..., 3]  # 视图，避免花式索引打乱维度顺序
+        rotations[:, 0] = rot_mats[:, 0]
+        translations[:, 0] = self.J_rest[0]
+        for level in self.levels:
+            parent_rot = rotations[:, self.parents[level]]
+            rotations[:, level] = parent_rot @ rot_mats[:, level]
+            translations[:, level] = ((parent_rot @ self.J_rel[level][..., np.newaxis])[..., 0]
+                                      + translations[:, self.parents[level]])
+        joints = translations.copy()
+        translations -= (rotations @ self.J_rest[..., np.newaxis])[..., 0]
+
+        skinning = (self.weights @ transforms.reshape(batch, NUM_JOINTS, 12)).reshape(batch, -1, 3, 4)
+        vertices = np.einsum('bvij,bvj->bvi', skinning, v_posed)
+        return vertices, joints
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='把官方MANO pkl转换为共用的 .npz 模型文件')
+    parser.add_argument('pkl', help='MANO_RIGHT.pkl 或 MANO_LEFT.pkl 路径')
+    parser.add_argument('-o', '--output', help='输出路径，默认与pkl同目录同名的 .npz')
+    args = parser.parse_args()
+    output = args.output or os.path.splitext(args.pkl)[0] + '.npz'
+    save_mano_npz(load_mano_pkl(args.pkl), output)
+    print(f"已保存 {output} ({os.path.getsize(output) / 1024:.0f} KB)")
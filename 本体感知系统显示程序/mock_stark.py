@@ -0,0 +1,294 @@
+"""
+libstark（bc_stark_sdk.main_mod）的本地模拟
+
+没有Revo2灵巧手时代替真实SDK，接口与 revo2_utils / hand_controller / 强脑灵巧手控制程序 用到的部分一致：
+modbus_open/modbus_close、auto_detect_modbus_revo2、get_device_info、set_finger_unit_mode、
+set_finger_positions_and_speeds、set_finger_position_with_speed、get_motor_status 等，
+以及 Baudrate、FingerUnitMode、FingerId、StarkProtocolType 常量。
+
+设置环境变量 HAND_BACKEND=mock 后 revo2_utils 导入本模块作为 libstark，其余代码不需要修改：
+    HAND_BACKEND=mock python main.py
+    HAND_BACKEND=mock python ../强脑灵巧手控制程序/revo2_ctrl_right.py
+    python benchmark.py hand --latency 0.002 --jitter 0.001
+
+时序模型：每个Modbus事务耗时 = 按波特率计算的请求/应答帧线路时间 + latency + [0, jitter) 内的均匀随机延迟。
+同一个串口上的事务依次占用总线，同时发起的请求排队，与真实的半双工RS-485一致。
+事务在完成时生效：写命令在应答返回时更新目标，读状态返回完成时刻的手指状态。
+
+手指模型：每个手指向目标做一阶逼近（时间常数 FINGER_TIME_CONSTANT），速度不超过
+speed/1000 × FINGER_MAX_VELOCITY（千分比/秒）；按经过的时间解析求解，不需要后台线程。
+电流与速度成正比，状态只区分静止(0)和运动(1)。只模拟千分比模式，物理量模式也按千分比处理。
+"""
+
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+import config_utils
+
+NUM_FINGERS = 6
+FINGER_MAX_VELOCITY = 2000.0  # speed=1000 时的最大速度(千分比/秒)，全程约0.5秒
+FINGER_TIME_CONSTANT = 0.03  # 接近目标时的一阶时间常数(秒)
+CURRENT_PER_VELOCITY = 0.2  # 电流(mA)与速度(千分比/秒)之比
+MOVING_THRESHOLD = 1.0  # 距目标超过该值(千分比)视为运动中
+DEFAULT_SLAVE_IDS = (0x7e, 0x7f)  # Revo2左手、右手的默认从站ID
+SLEEP_RESOLUTION = 0.001  # 事件循环定时器的精度(秒)，事务的最后这段时间改为逐次让出等待
+
+
+class StarkProtocolType:
+    Modbus = 1
+    CanFd = 2
+    EtherCAT = 3
+
+
+class Baudrate:
+    Baud115200 = 115200
+    Baud57600 = 57600
+    Baud19200 = 19200
+    Baud460800 = 460800
+    Baud1Mbps = 1000000
+    Baud2Mbps = 2000000
+    Baud5Mbps = 5000000
+
+
+class FingerUnitMode:
+    Normalized = 0
+    Physical = 1
+
+
+class FingerId:
+    Thumb = 1
+    ThumbAux = 2
+    Index = 3
+    Middle = 4
+    Ring = 5
+    Pinky = 6
+
+
+class MotorState:
+    Idle = 0
+    Running = 1
+
+
+def init_config(protocol_type, *args, **kwargs):
+    """与SDK接口一致，模拟时没有需要初始化的内容"""
+
+
+def list_available_ports():
+    """:return: JSON编码的端口列表(bytes)，只有一个模拟端口"""
+    return json.dumps([{"port_name": "MOCK"}]).encode("utf-8")
+
+
+async def auto_detect_modbus_revo2(port_name=None, quick=True):
+    """:return: (协议, 端口, 波特率, 从站ID)，总是检测到一只右手"""
+    return StarkProtocolType.Modbus, port_name or "MOCK", Baudrate.Baud460800, DEFAULT_SLAVE_IDS[-1]
+
+
+async def modbus_open(port_name, baudrate=Baudrate.Baud460800, latency=None, jitter=None, seed=None,
+                      slave_ids=DEFAULT_SLAVE_IDS):
+    """
+    打开模拟串口
+
+    :param latency: 每个事务除线路时间外的固定延迟(秒)，默认 config_utils.HAND_MOCK_LATENCY
+    :param jitter: 附加随机延迟的上限(秒)，默认 config_utils.HAND_MOCK_JITTER
+    :param seed: 随机数种子，便于复现
+    :param slave_ids: 会应答的从站ID
+    """
+    return PyDeviceContext(port_name, baudrate, latency, jitter, seed, slave_ids)
+
+
+class _Closed:
+    """modbus_close 的返回值：既可以直接调用也可以 await"""
+
+    def __await__(self):
+        return iter(())
+
+
+def modbus_close(client):
+    """关闭模拟串口（真实SDK的示例中有 await 和不 await 两种写法，这里都支持）"""
+    client.closed = True
+    return _Closed()
+
+
+def _frame_time(request_bytes, response_bytes, baudrate):
+    """一次Modbus RTU事务的线路时间(秒)：8N1每字节10位，每帧后3.5个字符的间隔"""
+    return (request_bytes + response_bytes + 2 * 3.5) * 10.0 / baudrate
+
+
+def _write_time(registers, baudrate):
+    return _frame_time(9 + 2 * registers, 8, baudrate)  # 写多个寄存器
+
+
+def _read_time(registers, baudrate):
+    return _frame_time(8, 5 + 2 * registers, baudrate)  # 读保持寄存器
+
+
+class DeviceInfo:
+    def __init__(self, slave_id):
+        self.slave_id = slave_id
+        self.serial_number = f"MOCK{slave_id:04X}"
+        self.firmware_version = "0.0.0-mock"
+        self.description = f"Revo2 (mock), SN: {self.serial_number}, FW: {self.firmware_version}"
+
+    def is_revo2(self):
+        return True
+
+    def is_revo2_touch(self):
+        return False
+
+
+class MotorStatusData:
+    def __init__(self, positions, speeds, currents, states):
+        self.positions = positions
+        self.speeds = speeds
+        self.currents = currents
+        self.states = states
+        self.description = f"positions: {positions}, speeds: {speeds}, currents: {currents}, states: {states}"
+
+    def is_idle(self):
+        return all(state == MotorState.Idle for state in self.states)
+
+
+class FingerModel:
+    """6个手指的速度受限一阶模型，按时间解析推进"""
+
+    def __init__(self, max_velocity=FINGER_MAX_VELOCITY, time_constant=FINGER_TIME_CONSTANT):
+        self.max_velocity = max_velocity
+        self.time_constant = time_constant
+        self.positions = np.zeros(NUM_FINGERS)
+        self.velocities = np.zeros(NUM_FINGERS)
+        self.targets = np.zeros(NUM_FINGERS)
+        self.speed_limits = np.full(NUM_FINGERS, max_velocity)
+        self.updated_at = time.perf_counter()
+
+    def advance(self, now=None):
+        """把手指状态推进到 now（time.perf_counter()）"""
+        now = time.perf_counter() if now is None else now
+        dt = now - self.updated_at
+        if dt <= 0:
+            return
+        self.updated_at = now
+        tau = self.time_constant
+        error = self.targets - self.positions
+        direction = np.sign(error)
+        distance = np.abs(error)
+        vmax = np.maximum(self.speed_limits, 1e-6)
+        # 距离大于 vmax·tau 时先匀速（速度饱和），之后指数逼近
+        linear_time = np.maximum(distance - vmax * tau, 0.0) / vmax
+        in_linear = dt < linear_time
+        remaining = np.where(in_linear, distance - vmax * dt,
+                             np.minimum(distance, vmax * tau) * np.exp(-(dt - linear_time) / tau))
+        self.positions = self.targets - direction * remaining
+        self.velocities = direction * np.where(in_linear, vmax, remaining / tau)
+
+    def set_targets(self, positions, speeds=None, fingers=None, now=None):
+        """
+        :param positions: 目标位置(千分比)
+        :param speeds: 速度(千分比)，None表示保持原速度
+        :param fingers: 手指序号列表，None表示全部手指
+        """
+        self.advance(now)
+        index = slice(None) if fingers is None else list(fingers)
+        self.targets[index] = np.clip(positions, 0, 1000)
+        if speeds is not None:
+            self.speed_limits[index] = np.clip(np.abs(speeds), 0, 1000) / 1000.0 * self.max_velocity
+
+    def status(self, now=None):
+        """:return: MotorStatusData（位置、速度取整，与设备寄存器一致）"""
+        self.advance(now)
+        moving = np.abs(self.targets - self.positions) > MOVING_THRESHOLD
+        return MotorStatusData([int(round(p)) for p in self.positions],
+                               [int(round(v)) for v in self.velocities],
+                               [int(round(v * CURRENT_PER_VELOCITY)) for v in self.velocities],
+                               [MotorState.Running if m else MotorState.Idle for m in moving])
+
+
+class PyDeviceContext:
+    """模拟的Modbus设备上下文，方法与真实SDK的 PyDeviceContext 同名"""
+
+    def __init__(self, port_name, baudrate=Baudrate.Baud460800, latency=None, jitter=None, seed=None,
+                 slave_ids=DEFAULT_SLAVE_IDS):
+        self.port_name = port_name
+        self.baudrate = baudrate
+        self.latency = config_utils.HAND_MOCK_LATENCY if latency is None else latency
+        self.jitter = config_utils.HAND_MOCK_JITTER if jitter is None else jitter
+        self.closed = False
+        self.transactions = 0
+        self.bus_time = 0.0  # 总线被占用的时间之和(秒)
+        self._random = random.Random(seed)
+        self._bus_free_at = 0.0  # perf_counter时刻，之前的事务占用总线到此时
+        self._unit_modes = {}
+        self.hands = {slave_id: FingerModel() for slave_id in slave_ids}
+
+    async def _transaction(self, slave_id, wire_time):
+        """占用总线完成一次事务，返回完成时刻；从站不存在时等待后超时"""
+        if self.closed:
+            raise ConnectionError(f"Port {self.port_name} is closed")
+        now = time.perf_counter()
+        duration = wire_time + self.latency + self._random.uniform(0.0, self.jitter)
+        start = max(now, self._bus_free_at)
+        self._bus_free_at = start + duration
+        self.transactions += 1
+        self.bus_time += duration
+        done = self._bus_free_at
+        await asyncio.sleep(max(done - now - SLEEP_RESOLUTION, 0.0))
+        while time.perf_counter() < done:
+            await asyncio.sleep(0)  # 最后不到1毫秒让出事件循环逐次等待，asyncio.sleep 的定时精度只有约1毫秒
+        if slave_id not in self.hands:
+            raise TimeoutError(f"No response from slave {slave_id}")
+        return done
+
+    def peek_positions(self, slave_id):
+        """模拟专用：不经过总线直接读取手指的当前位置（用于评估跟踪误差）"""
+        hand = self.hands[slave_id]
+        hand.advance()
+        return hand.positions.copy()
+
+    async def get_device_info(self, slave_id):
+        await self._transaction(slave_id, _read_time(16, self.baudrate))
+        return DeviceInfo(slave_id)
+
+    async def set_finger_unit_mode(self, slave_id, mode):
+        await self._transaction(slave_id, _frame_time(8, 8, self.baudrate))  # 写单个寄存器
+        self._unit_modes[slave_id] = mode
+
+    async def get_finger_unit_mode(self, slave_id):
+        await self._transaction(slave_id, _read_time(1, self.baudrate))
+        return self._unit_modes.get(slave_id, FingerUnitMode.Normalized)
+
+    async def set_finger_positions_and_speeds(self, slave_id, positions, speeds):
+        done = await self._transaction(slave_id, _write_time(2 * NUM_FINGERS, self.baudrate))
+        self.hands[slave_id].set_targets(positions, speeds, now=done)
+
+    async def set_finger_positions(self, slave_id, positions):
+        done = await self._transaction(slave_id, _write_time(NUM_FINGERS, self.baudrate))
+        self.hands[slave_id].set_targets(positions, now=done)
+
+    async def set_finger_positions_and_durations(self, slave_id, positions, durations):
+        done = await self._transaction(slave_id, _write_time(2 * NUM_FINGERS, self.baudrate))
+        hand = self.hands[slave_id]
+        hand.advance(done)
+        # 由期望时间换算成速度：走完剩余距离所需的千分比速度
+        distances = np.abs(np.clip(positions, 0, 1000) - hand.positions)
+        seconds = np.maximum(np.asarray(durations, dtype=np.float64), 1.0) / 1000.0
+        speeds = np.clip(distances / seconds / hand.max_velocity * 1000.0, 1, 1000)
+        hand.set_targets(positions, speeds, now=done)
+
+    async def set_finger_position_with_speed(self, slave_id, finger_id, position, speed):
+        done = await self._transaction(slave_id, _write_time(2, self.baudrate))
+        self.hands[slave_id].set_targets([position], [speed], fingers=[finger_id - FingerId.Thumb], now=done)
+
+    async def set_finger_position(self, slave_id, finger_id, position):
+        done = await self._transaction(slave_id, _write_time(1, self.baudrate))
+        self.hands[slave_id].set_targets([position], fingers=[finger_id - FingerId.Thumb], now=done)
+
+    async def get_finger_positions(self, slave_id):
+        done = await self._transaction(slave_id, _read_time(NUM_FINGERS, self.baudrate))
+        return self.hands[slave_id].status(done).positions
+
+    async def get_motor_status(self, slave_id):
+        done = await self._transaction(slave_id, _read_time(4 * NUM_FINGERS, self.baudrate))
+        return self.hands[slave_id].status(done)
@@ -1,8 +1,204 @@
 import os
+import time
+
 import numpy as np
 import open3d as o3d
-from smplx import MANO
-import torch
+
+import config_utils
+import glove_mapping
+import mano_numpy
+import mesh_normals
+import urdf_skeleton
+
+
+class HandMesh:
+    """
+    一只手的Open3D网格和线框
+
+    顶点、法向量和线框点都原地写入Open3D的缓冲区，每帧不创建新的Vector3dVector。
+    mirror=True 时把右手模型沿x轴镜像成左手，offset 为整只手的平移（双手同窗显示时使用）。
+    """
+
+    def __init__(self, mano_model, normal_estimator=None, mirror=False, offset=None,
+                 pose_tolerance=config_utils.VISUALIZER_POSE_TOLERANCE):
+        """
+        :param mano_model: mano_numpy.ManoModel
+        :param normal_estimator: 可与同拓扑的其它网格共用的 mesh_normals.VertexNormals
+        :param mirror: 是否沿x轴镜像
+        :param offset: 3维平移，None表示不平移
+        :param pose_tolerance: PCA姿态最大变化不超过该值时跳过MANO计算，0表示每次都更新
+        """
+        self.mano_model = mano_model
+        self.normal_estimator = (mesh_normals.VertexNormals(mano_model.faces, mano_model.num_vertices)
+                                 if normal_estimator is None else normal_estimator)
+        self.mirror = mirror
+        self.offset = None if offset is None else np.asarray(offset, dtype=np.float64)
+        self.pose_tolerance = pose_tolerance
+        self._last_pose = None  # 最近一次实际用于计算网格的PCA姿态
+
+        faces = mano_model.faces[:, ::-1] if mirror else mano_model.faces  # 镜像后翻转绕序，法向量朝外
+        self.mesh = o3d.geometry.TriangleMesh()
+        self.mesh.vertices = o3d.utility.Vector3dVector(np.zeros((mano_model.num_vertices, 3)))
+        self.mesh.triangles = o3d.utility.Vector3iVector(np.ascontiguousarray(faces))
+        # np.asarray 对 Vector3dVector 返回共享内存的视图，写入视图即修改几何体
+        self._vertex_buffer = np.asarray(self.mesh.vertices)
+        self._compute_pose(np.zeros(mano_numpy.NUM_PCA_COMPONENTS))
+        # 只在这里分配一次顶点、面片和法向量，之后不再给 mesh.vertices 赋新对象
+        self.mesh.compute_vertex_normals()  # 分配法向量缓冲区
+        self.mesh.paint_uniform_color([0.7, 0.7, 0.7])  # 设置灰色显示
+        # 线框的点与网格顶点顺序相同
+        self.wireframe = o3d.geometry.LineSet.create_from_triangle_mesh(self.mesh)
+        self.wireframe.paint_uniform_color([0, 0, 0])  # 黑色线框
+        self._normal_buffer = np.asarray(self.mesh.vertex_normals)
+        self._wire_points = np.asarray(self.wireframe.points)
+
+    def reset(self):
+        """回到零姿态（完全展开）"""
+        self._last_pose = None
+        self.update_pca(np.zeros(mano_numpy.NUM_PCA_COMPONENTS))
+
+    def refresh_shape(self):
+        """MANO模型的形状参数改变后调用，下一次 update_pca 不做姿态容差判断，直接按新手型重新计算"""
+        self._last_pose = None
+
+    def _compute_pose(self, hand_pose_pca):
+        """蒙皮结果直接写入网格顶点缓冲区，再做镜像和平移"""
+        vertices = self.mano_model.forward(hand_pose_pca, out=self._vertex_buffer)
+        if self.mirror:
+            vertices[:, 0] *= -1.0
+        if self.offset is not None:
+            vertices += self.offset
+        return vertices
+
+    def update_pca(self, hand_pose_pca):
+        """
+        使用45维PCA姿态更新网格
+
+        :return: 网格是否被更新（姿态变化在容差内时为False）
+        """
+        hand_pose_pca = np.asarray(hand_pose_pca, dtype=np.float64)
+        if (self._last_pose is not None
+                and np.abs(hand_pose_pca - self._last_pose).max() <= self.pose_tolerance):
+            return False  # 姿态几乎没有变化，屏幕上的网格已经是最新的
+        self._last_pose = hand_pose_pca.copy()
+
+        vertices = self._compute_pose(hand_pose_pca)
+        # 用预计算的面片邻接表计算法向量，代替 compute_vertex_normals()
+        normals = self.normal_estimator.compute(vertices, out=self._normal_buffer)
+        if self.mirror:
+            # 邻接表按原绕序计算，镜像网格上得到的是朝内的法向量
+            np.negative(normals, out=normals)
+        # 同步线框顶点位置
+        np.copyto(self._wire_points, vertices)
+        return True
+
+    def add_to(self, vis, reset_bounding_box=True):
+        """把网格和线框加入可视化器"""
+        vis.add_geometry(self.mesh, reset_bounding_box=reset_bounding_box)
+        vis.add_geometry(self.wireframe, reset_bounding_box=reset_bounding_box)  # 线框与网格共用顶点位置
+
+    def remove_from(self, vis):
+        """从可视化器中移除网格和线框（切换渲染模式时使用）"""
+        vis.remove_geometry(self.mesh, reset_bounding_box=False)
+        vis.remove_geometry(self.wireframe, reset_bounding_box=False)
+
+    def notify(self, vis):
+        """通知可视化器网格和线框已更新"""
+        vis.update_geometry(self.mesh)
+        vis.update_geometry(self.wireframe)
+
+
+class SkeletonMesh(HandMesh):
+    """
+    URDF刚性连杆骨架（低功耗渲染模式）
+
+    与 HandMesh 接口相同，PCA姿态经 ManoJointProjection 换算为20个关节角，
+    由 UrdfHand 做正运动学，连杆网格顶点和法向量直接写入Open3D缓冲区；线框换成连接各关节的骨骼线。
+    """
+
+    def __init__(self, mano_model, mirror=False, offset=None, pose_tolerance=config_utils.VISUALIZER_POSE_TOLERANCE,
+                 urdf_hand=None):
+        """
+        :param mano_model: mano_numpy.ManoModel，提供PCA姿态基和腕关节位置
+        :param urdf_hand: 可共用的 urdf_skeleton.UrdfHand，None时读取 config_utils.MANO_URDF
+        """
+        self.mano_model = mano_model
+        self.urdf_hand = urdf_skeleton.UrdfHand() if urdf_hand is None else urdf_hand
+        self.projection = urdf_skeleton.ManoJointProjection(self.urdf_hand, mano_model)
+        self.mirror = mirror
+        self.offset = None if offset is None else np.asarray(offset, dtype=np.float64)
+        self._root = mano_model.J_rest[0]  # URDF根连杆的原点在MANO腕关节
+        self.pose_tolerance = pose_tolerance
+        self._last_pose = None
+        self._angles = np.empty(self.urdf_hand.num_joints)
+
+        hand = self.urdf_hand
+        faces = hand.faces[:, ::-1] if mirror else hand.faces
+        self.mesh = o3d.geometry.TriangleMesh()
+        self.mesh.vertices = o3d.utility.Vector3dVector(np.zeros((hand.num_vertices, 3)))
+        self.mesh.vertex_normals = o3d.utility.Vector3dVector(np.zeros((hand.num_vertices, 3)))
+        self.mesh.triangles = o3d.utility.Vector3iVector(np.ascontiguousarray(faces))
+        self.mesh.paint_uniform_color([0.7, 0.7, 0.7])
+        # 骨骼线：父连杆原点 -> 子连杆原点
+        self.wireframe = o3d.geometry.LineSet()
+        self.wireframe.points = o3d.utility.Vector3dVector(np.zeros((len(hand.link_names), 3)))
+        self.wireframe.lines = o3d.utility.Vector2iVector(
+            np.stack([hand.parents, np.arange(1, hand.num_joints + 1)], axis=1).astype(np.int32))
+        self.wireframe.paint_uniform_color([0, 0, 0])
+        self._vertex_buffer = np.asarray(self.mesh.vertices)
+        self._normal_buffer = np.asarray(self.mesh.vertex_normals)
+        self._wire_points = np.asarray(self.wireframe.points)
+        self.reset()
+
+    def update_pca(self, hand_pose_pca):
+        """
+        使用45维PCA姿态更新连杆网格
+
+        :return: 网格是否被更新（姿态变化在容差内时为False）
+        """
+        hand_pose_pca = np.asarray(hand_pose_pca, dtype=np.float64)
+        if (self._last_pose is not None
+                and np.abs(hand_pose_pca - self._last_pose).max() <= self.pose_tolerance):
+            return False
+        self._last_pose = hand_pose_pca.copy()
+
+        angles = self.projection.map(hand_pose_pca, out=self._angles)
+        vertices, normals = self.urdf_hand.forward(angles, out=self._vertex_buffer, normals_out=self._normal_buffer)
+        np.copyto(self._wire_points, self.urdf_hand.joint_positions())
+        for points in (vertices, self._wire_points):
+            points += self._root
+            if self.mirror:
+                points[:, 0] *= -1.0
+            if self.offset is not None:
+                points += self.offset
+        if self.mirror:
+            normals[:, 0] *= -1.0
+        return True
+
+    def refresh_shape(self):
+        """连杆网格来自URDF，不随形状参数变化，只跟随新的腕关节位置"""
+        self._root = self.mano_model.J_rest[0]
+        self._last_pose = None
+
+
+# 渲染模式 -> 网格类
+HAND_MESH_TYPES = {'mano': HandMesh, 'skeleton': SkeletonMesh}
+
+
+def setup_render_view(vis):
+    """白色背景、显示线框、默认相机视角"""
+    # 设置渲染选项：配置可视化器的显示效果
+    render_opt = vis.get_render_option()
+    render_opt.mesh_show_wireframe = True  # 显示网格线框
+    render_opt.background_color = [1, 1, 1]  # 白色背景
+    render_opt.light_on = True  # 启用光照
+
+    # 设置相机视角：配置初始观察角度
+    ctr = vis.get_view_control()
+    ctr.set_zoom(0.8)  # 缩放级别
+    ctr.set_lookat([0, 0, 0.1])  # 观察中心点
+    ctr.set_up([0, -1, 0])  # 上方向向量
+    ctr.set_front([0, 0, -1])  # 观察方向向量
 
 
 class MANOHandVisualizer:
@@ -11,156 +207,155 @@ class MANOHandVisualizer:
     用于将24维手套数据映射到MANO手部模型并进行3D可视化
     """
 
-    def __init__(self, model_path_right='MANO_RIGHT.pkl', model_path_left='MANO_LEFT.pkl', is_rhand=True):
+    def __init__(self, model_path_right=config_utils.MANO_RIGHT_MODEL, model_path_left=config_utils.MANO_LEFT_MODEL,
+                 is_rhand=True, mapping=None, pose_tolerance=config_utils.VISUALIZER_POSE_TOLERANCE,
+                 render_mode=config_utils.VISUALIZER_RENDER_MODE, betas=None, pose_library=None,
+                 snap_distance=config_utils.POSE_SNAP_DISTANCE):
         """
         初始化MANO手部可视化器
 
-        :param model_path_right: 右手MANO模型文件路径
+        :param model_path_right: 右手MANO模型文件路径（默认使用共用的 mano/MANO_RIGHT.npz）
         :param model_path_left: 左手MANO模型文件路径
         :param is_rhand: 是否为右手（True为右手，False为左手）
+        :param mapping: 24维手套数据到45维PCA的映射，默认按 config_utils 的缩放、偏移和索引配置编译
+        :param pose_tolerance: PCA姿态最大变化不超过该值时跳过MANO计算，0表示每次都更新
+        :param render_mode: "mano" 完整蒙皮网格，"skeleton" URDF刚性连杆；运行中在窗口里按M切换
+        :param betas: 用户手型的形状参数（hand_shape.load_user_betas），None表示标准手型
+        :param pose_library: 可选 pose_library.PoseLibrary，手套数据接近某个保存了手套数据的手势时直接显示该手势
+        :param snap_distance: 吸附的最大24维欧氏距离，0表示不吸附
         """
+        if render_mode not in HAND_MESH_TYPES:
+            raise ValueError(f"未知的渲染模式: {render_mode}，可选 {list(HAND_MESH_TYPES)}")
         # 选择模型路径：根据is_rhand参数选择使用左手或右手模型
         model_path = model_path_right if is_rhand else model_path_left
 
         # 检查模型文件是否存在，不存在则抛出异常
         if not os.path.exists(model_path):
-            raise FileNotFoundError(f"Model file {model_path} does not exist.")
+            raise FileNotFoundError(f"Model file {model_path} does not exist. "
+                                    f"Run 'python mano_numpy.py <MANO_*.pkl>' to convert the official model first.")
 
-        # 加载 MANO 模型
-        # num_pca_comps=45 表示使用45个PCA分量来表示手部姿态
-        self.mano_model = MANO(model_path=model_path, is_rhand=is_rhand, num_pca_comps=45)
+        # 加载 MANO 模型：纯NumPy蒙皮，按用户手型在初始化时预计算模板和关节，逐帧计算量与标准手型相同
+        # 使用全部45个PCA分量来表示手部姿态
+        self.mano_model = mano_numpy.ManoModel(model_path, betas=betas)
         self.is_rhand = is_rhand  # 保存手部类型信息
-
-        # 初始化 Open3D 网格对象：用于存储和显示3D手部网格
-        self.mesh = o3d.geometry.TriangleMesh()
-        self.wireframe = None  # 线框对象，用于显示网格边缘
-
-        # 初始化手部姿态为零（默认展开状态）
-        self.reset_hand()
+        self.mapping = glove_mapping.GloveToManoMapping() if mapping is None else mapping
+
+        self.pose_tolerance = pose_tolerance
+        self._hand_pose = np.zeros(mano_numpy.NUM_PCA_COMPONENTS)  # 最近一次输入的PCA姿态，切换模式时沿用
+        self.pose_library = pose_library
+        self.snap_distance = snap_distance
+        self.snapped_pose = None  # 当前吸附到的手势名称
+        self._library_checked = time.perf_counter()
+
+        # 初始化 Open3D 网格和线框，手部姿态为零（默认展开状态）
+        self.render_mode = render_mode
+        self._hands = {}  # 渲染模式 -> 已创建的网格，切换回来时复用
+        self.hand = self._get_hand(render_mode)
+        self.mesh = self.hand.mesh
+        self.wireframe = self.hand.wireframe  # 线框对象，用于显示网格边缘
 
         # 初始化 Open3D 可视化器：创建可视化窗口
         self.vis = o3d.visualization.VisualizerWithKeyCallback()
         self.vis.create_window(width=800, height=600, window_name='MANO Hand with Wireframe')
-        self.vis.add_geometry(self.mesh)  # 将网格添加到可视化器中
+        self.hand.add_to(self.vis)
+        setup_render_view(self.vis)
+        self.vis.register_key_callback(ord('M'), lambda vis: self.toggle_render_mode())
 
-        # 初始化线框标志：用于跟踪线框是否已添加
-        self.wireframe_added = False
+    def _get_hand(self, render_mode):
+        """创建或取出指定渲染模式的网格"""
+        if render_mode not in self._hands:
+            self._hands[render_mode] = HAND_MESH_TYPES[render_mode](self.mano_model, pose_tolerance=self.pose_tolerance)
+        return self._hands[render_mode]
 
-        # 设置渲染选项：配置可视化器的显示效果
-        render_opt = self.vis.get_render_option()
-        render_opt.mesh_show_wireframe = True  # 显示网格线框
-        render_opt.background_color = [1, 1, 1]  # 白色背景
-        render_opt.light_on = True  # 启用光照
+    def set_render_mode(self, render_mode):
+        """
+        切换渲染模式，新模式直接显示当前姿态
 
-        # 设置相机视角：配置初始观察角度
-        ctr = self.vis.get_view_control()
-        ctr.set_zoom(0.8)  # 缩放级别
-        ctr.set_lookat([0, 0, 0.1])  # 观察中心点
-        ctr.set_up([0, -1, 0])  # 上方向向量
-        ctr.set_front([0, 0, -1])  # 观察方向向量
+        :param render_mode: "mano" 或 "skeleton"
+        """
+        if render_mode not in HAND_MESH_TYPES:
+            raise ValueError(f"未知的渲染模式: {render_mode}，可选 {list(HAND_MESH_TYPES)}")
+        if render_mode == self.render_mode:
+            return
+        hand = self._get_hand(render_mode)
+        hand._last_pose = None  # 切换期间姿态可能已变化，强制更新一次
+        hand.update_pca(self._hand_pose)
+        self.hand.remove_from(self.vis)
+        hand.add_to(self.vis, reset_bounding_box=False)  # 保持当前相机视角
+        self.hand, self.render_mode = hand, render_mode
+        self.mesh, self.wireframe = hand.mesh, hand.wireframe
+        print(f"渲染模式: {render_mode}")
+
+    def toggle_render_mode(self):
+        """在完整MANO网格和URDF骨架之间切换（窗口中按M）"""
+        modes = list(HAND_MESH_TYPES)
+        self.set_render_mode(modes[(modes.index(self.render_mode) + 1) % len(modes)])
+        return True  # 通知Open3D重绘
+
+    def set_betas(self, betas):
+        """
+        切换用户手型并按当前姿态重绘
+
+        形状相关的量由 ManoModel 按betas缓存，切换回用过的手型不重新计算
+
+        :param betas: 形状参数，None表示标准手型
+        """
+        self.mano_model.set_betas(betas)
+        for hand in self._hands.values():
+            hand.refresh_shape()
+        self.hand.update_pca(self._hand_pose)
+        self.hand.notify(self.vis)
 
     def reset_hand(self):
         """
         重置手部到默认姿态（完全展开状态）
-        使用零值参数调用MANO模型生成默认手部形状
-        """
-        # 调用MANO模型生成默认手部
-        output = self.mano_model(
-            betas=torch.zeros([1, 10]),  # 形状参数设为零（标准手型）
-            hand_pose=torch.zeros([1, 45]),  # 手部姿态参数设为零（完全展开）
-            global_orient=torch.zeros([1, 3])  # 全局朝向设为零
-        )
-
-        # 提取顶点坐标和面片信息
-        vertices = output.vertices.detach().cpu().numpy()[0]  # 转换为numpy数组
-        faces = self.mano_model.faces.astype(np.int32)  # 获取面片索引
-
-        # 更新网格的顶点和面片信息
-        self.mesh.vertices = o3d.utility.Vector3dVector(vertices)
-        self.mesh.triangles = o3d.utility.Vector3iVector(faces)
-        self.mesh.compute_vertex_normals()  # 计算法向量用于光照计算
-        self.mesh.paint_uniform_color([0.7, 0.7, 0.7])  # 设置灰色显示
+        """
+        self.hand.reset()
+        self.hand.notify(self.vis)
 
     def update_hand_pose(self, glove_data_24d):
         """
-        从24维手套数据中提取15个关键自由度，并映射到正确的45维PCA空间
-        实现手套数据到手部姿态的转换
+        将24维手套数据（拉伸率）经编译好的仿射映射转换为45维PCA姿态并更新网格
 
         :param glove_data_24d: np.array，长度为24的手套传感器数据
+        :return: 网格是否被更新（姿态变化在容差内时为False）
         """
         # 数据验证：确保输入数据长度正确
         if len(glove_data_24d) != 24:
             raise ValueError("输入数组长度必须为24")
+        # 缩放、偏移和15->45维映射合并为一次矩阵乘法
+        hand_pose_pca = self.mapping.map(glove_data_24d)
+        if self.pose_library is not None and self.snap_distance > 0:
+            hand_pose_pca = self._snap(glove_data_24d, hand_pose_pca)
+        return self.update_hand_pose_pca(hand_pose_pca)
+
+    def _snap(self, glove_data_24d, hand_pose_pca):
+        """手套数据足够接近姿态库中的某个手势时改用该手势的PCA姿态（KD树查询，微秒级）"""
+        now = time.perf_counter()
+        if now - self._library_checked >= config_utils.POSE_LIBRARY_RELOAD_INTERVAL:
+            # 界面进程保存新手势后，这里最多延迟一个检查间隔生效
+            self._library_checked = now
+            self.pose_library.reload_if_changed()
+        match = self.pose_library.snap(glove_data_24d, self.snap_distance)
+        name = None if match is None else match[0]
+        if name != self.snapped_pose:
+            self.snapped_pose = name
+            if name is not None:
+                print(f"吸附到手势: {name}")
+        return hand_pose_pca if match is None else match[1]
+
+    def update_hand_pose_pca(self, hand_pose_pca):
+        """
+        使用45维PCA姿态更新手部网格
 
-        # 提取15个关键自由度：从24维数据中选择最重要的15个维度
-        # 这些索引对应手套传感器中最有代表性的关节自由度
-        indices_15d = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 13, 14, 15, 18, 19]
-        glove_data_15d = glove_data_24d[indices_15d]
-
-        # 创建45维PCA向量并初始化为0
-        # MANO模型使用45个PCA分量来描述手部姿态
-        hand_pose_pca = np.zeros(45)
-
-        # 定义手套的15个自由度到手部模型45维PCA的映射关系
-        # 每个手套自由度可能影响MANO模型中的多个PCA分量
-        # 键为手套自由度索引，值为对应的PCA分量索引列表
-        mapping_15_to_45 = {
-            0: [1],  # 食指掌指关节外展内收 -> PCA 1 对
-            1: [10],  # 中指掌指关节外展内收 -> PCA 2, 3 对
-            2: [14, 17],  # 食指远节指间关节屈伸 -> PCA 4, 5 对
-            3: [11],  # 食指掌指关节屈伸 -> PCA 6, 7 对
-            4: [5, 8],  # 食指远节指间关节屈伸 -> PCA 8, 5 对
-            5: [36, 38],  # 拇指腕掌关节外展内收 -> PCA 10, 11
-            6: [37],  # 拇指腕掌关节屈伸 -> PCA 12, 13
-            7: [2],  # 食指掌指关节屈伸 -> PCA 2 对
-            8: [39],  # 拇指掌指关节屈伸 -> PCA 2对
-            9: [43],  # 拇指指间关节屈伸 -> PCA 18, 19
-            10: [19, 28],  # 小拇指与无名指掌指关节外展内收 -> PCA 20, 21
-            11: [32, 35],  # 无名指近节指间关节屈伸 -> PCA 22, 23
-            12: [23, 26],  # 小指掌指关节外展内收 -> PCA 24, 25
-            13: [29],  # 无名指掌指关节屈伸 -> PCA 26, 27 对
-            14: [20]  # 小指掌指关节屈伸 -> PCA 28, 29 对
-        }
-
-        # 将15个手套自由度映射到对应的45维PCA分量
-        # 每个手套自由度的值会被分配到相应的PCA分量中
-        for i, pca_indices in mapping_15_to_45.items():
-            # 获取当前手套自由度的角度值
-            angle = glove_data_15d[i]
-            # 将该角度值分配到所有对应的PCA分量中
-            for idx in pca_indices:
-                hand_pose_pca[idx] = angle
-
-        # 转换为torch tensor：为MANO模型准备输入数据
-        hand_pose_tensor = torch.tensor(hand_pose_pca).view(1, -1).float()
-
-        # 调用MANO模型计算新的手部顶点坐标
-        output = self.mano_model(
-            betas=torch.zeros([1, 10]),  # 保持标准手型
-            hand_pose=hand_pose_tensor,  # 使用计算得到的姿态参数
-            global_orient=torch.zeros([1, 3])  # 保持默认朝向
-        )
-        # 提取新的顶点坐标
-        new_vertices = output.vertices.detach().cpu().numpy()[0]
-
-        # 更新网格顶点：用新计算的顶点替换原有顶点
-        self.mesh.vertices = o3d.utility.Vector3dVector(new_vertices)
-        self.mesh.compute_vertex_normals()  # 重新计算法向量
-
-        # 更新线框显示：保持线框与网格同步
-        if not self.wireframe_added:
-            # 首次添加线框
-            self.wireframe = o3d.geometry.LineSet.create_from_triangle_mesh(self.mesh)
-            self.wireframe.paint_uniform_color([0, 0, 0])  # 黑色线框
-            self.vis.add_geometry(self.wireframe)
-            self.wireframe_added = True
-        else:
-            # 更新线框顶点位置
-            self.wireframe.points = self.mesh.vertices
-            self.vis.update_geometry(self.wireframe)
-
-        # 更新可视化网格：通知可视化器网格已更新
-        self.vis.update_geometry(self.mesh)
+        :param hand_pose_pca: np.array，长度为45的PCA姿态
+        :return: 网格是否被更新（姿态变化在容差内时为False）
+        """
+        self._hand_pose = np.asarray(hand_pose_pca, dtype=np.float64)
+        if not self.hand.update_pca(self._hand_pose):
+            return False
+        self.hand.notify(self.vis)
+        return True
 
     def run(self):
         """
@@ -182,7 +377,8 @@ if __name__ == "__main__":
     """
 
     # 创建右手可视化器实例
-    visualizer = MANOHandVisualizer(is_rhand=True)
+    # 动画直接输入关节角度，不做拉伸率的缩放和偏移
+    visualizer = MANOHandVisualizer(is_rhand=True, mapping=glove_mapping.GloveToManoMapping.identity_scaling())
 
     # 动画控制参数设置
     t = 0.0  # 时间参数，用于生成周期性动画
@@ -1,6 +1,8 @@
 import csv
 import os
+import numpy as np
 import config_utils
+import baseline_tracker
 
 
 class StretchableExoskeleton:
@@ -18,6 +20,16 @@ class StretchableExoskeleton:
         self.voltage_ref = config_utils.REFERENCE_VOLTAGE
         self.r_ref = config_utils.REFERENCE_RESISTANCE
 
+        # 批量计算用的预拉伸电阻缓存，pre_stretch_resistances被替换时自动重建
+        self._baseline_source = None
+        self._baseline = None  # 预拉伸电阻数组
+        self._inv_baseline = None  # 预拉伸电阻的倒数，无效通道(<=0)为0
+
+        # 可选的基线在线跟踪器，启用后拉伸率相对跟踪到的基线计算
+        self.baseline_tracker = None
+        # 校准每变化一次加1，拉伸率的下游状态（滤波器等）据此在自己的线程中重置
+        self.calibration_version = 0
+
     def voltage_to_resistance(self, voltage):
         """
         根据分压原理计算电阻值
@@ -31,6 +43,30 @@ class StretchableExoskeleton:
         resistance = self.voltage_ref / ((self.voltage_ref - voltage / 20) / self.r_ref) - self.r_ref
         return resistance
 
+    def voltages_to_resistances(self, voltages):
+        """
+        voltage_to_resistance 的向量化版本，支持任意形状的电压数组（例如 (N, 24)）
+        无效电压（<=0 或超过参考电压）对应的电阻为0
+        """
+        voltages = np.asarray(voltages, dtype=np.float64)
+        valid = (voltages > 0) & (voltages <= self.voltage_ref + 1)
+        # 有效范围内分母恒为正，无效电压先置0，公式在0处的结果也是0
+        safe = np.where(valid, voltages, 0.0)
+        resistances = self.voltage_ref / ((self.voltage_ref - safe / 20) / self.r_ref) - self.r_ref
+        resistances[~valid] = 0.0
+        return resistances
+
+    def _baseline_arrays(self, pre_stretch_resistances):
+        """返回预拉伸电阻及其倒数数组，校准数据变化后重新计算"""
+        if self._baseline_source is not pre_stretch_resistances:
+            baseline = np.asarray(pre_stretch_resistances, dtype=np.float64)
+            inv_baseline = np.zeros_like(baseline)
+            np.divide(1.0, baseline, out=inv_baseline, where=baseline > 0)
+            self._baseline = baseline
+            self._inv_baseline = inv_baseline
+            self._baseline_source = pre_stretch_resistances
+        return self._baseline, self._inv_baseline
+
     def load_calibration_data(self, initial_file=None, pre_stretch_file=None):
         """
         读取校准数据CSV文件
@@ -65,42 +101,92 @@ class StretchableExoskeleton:
             load_csv_data(pre_stretch_file, 'pre_stretch')
 
             # 计算初始拉伸比例（由于骨骼长度不同）
-            if hasattr(self, 'initial_resistances') and hasattr(self, 'pre_stretch_resistances') and \
-                    self.initial_resistances and self.pre_stretch_resistances:
-                self.initial_stretch_ratios = []
-                for i in range(len(self.initial_resistances)):
-                    if self.initial_resistances[i] > 0:
-                        ratio = (self.pre_stretch_resistances[i] - self.initial_resistances[i]) / \
-                                self.initial_resistances[i]
-                        self.initial_stretch_ratios.append(ratio)
-                    else:
-                        self.initial_stretch_ratios.append(0)
-                print("成功计算初始拉伸比例")
+            self._update_initial_stretch_ratios()
 
         except Exception as e:
             print(f"加载校准数据时出错: {e}")
 
+    def enable_baseline_tracking(self, tracker=None):
+        """启用基线(R0)在线漂移跟踪，默认使用config_utils中的参数"""
+        self.baseline_tracker = tracker or baseline_tracker.BaselineTracker()
+        self.baseline_tracker.reset(self.pre_stretch_resistances)
+
+    def clear_calibration(self):
+        """清除全部校准数据（切换受试者时使用）"""
+        self.initial_voltages = None
+        self.pre_stretch_voltages = None
+        self.initial_resistances = None
+        self.pre_stretch_resistances = None
+        self.initial_stretch_ratios = None
+        if self.baseline_tracker is not None:
+            self.baseline_tracker.reset(None)
+        self.calibration_version += 1
+
+    def apply_calibration(self, initial=None, pre_stretch=None):
+        """
+        直接使用校准记录（calibration_store.CalibrationRecord）更新校准数据，
+        记录中已包含预先计算好的电阻数组，无需再读取CSV或重新计算
+        """
+        if initial is not None:
+            self.initial_voltages = initial.voltages.tolist()
+            self.initial_resistances = initial.resistances.tolist()
+        if pre_stretch is not None:
+            self.pre_stretch_voltages = pre_stretch.voltages.tolist()
+            self.pre_stretch_resistances = pre_stretch.resistances.tolist()
+        self._update_initial_stretch_ratios()
+
+    def _update_initial_stretch_ratios(self):
+        """根据初始电阻和预拉伸电阻计算初始拉伸比例，并以新的预拉伸电阻重新开始基线跟踪"""
+        if self.baseline_tracker is not None:
+            self.baseline_tracker.reset(self.pre_stretch_resistances)
+        self.calibration_version += 1
+        if self.initial_resistances and self.pre_stretch_resistances:
+            self.initial_stretch_ratios = []
+            for i in range(len(self.initial_resistances)):
+                if self.initial_resistances[i] > 0:
+                    ratio = (self.pre_stretch_resistances[i] - self.initial_resistances[i]) / \
+                            self.initial_resistances[i]
+                    self.initial_stretch_ratios.append(ratio)
+                else:
+                    self.initial_stretch_ratios.append(0)
+            print("成功计算初始拉伸比例")
+
     def calculate_real_time_stretch(self, current_voltages):
         """
-        计算实时拉伸量
+        计算实时拉伸量（单帧）
         返回: (当前电阻值列表, 实时拉伸比例列表)
         """
-        if not self.pre_stretch_resistances:
+        resistances, stretch_ratios = self.calculate_stretch_batch(current_voltages)
+        if resistances is None:
             return None, None
+        return resistances.tolist(), stretch_ratios.tolist()
 
-        # 计算当前电阻值
-        current_resistances = [self.voltage_to_resistance(v) for v in current_voltages]
+    def calculate_stretch_batch(self, voltages, update_baseline=False):
+        """
+        批量计算实时拉伸量
 
-        # 计算实时拉伸比例：(当前电阻-预拉伸电阻)/预拉伸电阻
-        real_time_stretch_ratios = []
-        for i in range(len(current_resistances)):
-            if self.pre_stretch_resistances[i] > 0:
-                ratio = (current_resistances[i] - self.pre_stretch_resistances[i]) / self.pre_stretch_resistances[i]
-                real_time_stretch_ratios.append(ratio)
-            else:
-                real_time_stretch_ratios.append(0)
+        :param voltages: (N, 24) 或 (24,) 的电压数组
+        :param update_baseline: 是否用这批数据更新基线跟踪器，每帧只应由一个调用方更新一次
+        :return: (电阻数组, 拉伸比例数组)，形状与输入相同；未校准时返回 (None, None)
+        拉伸比例 = (当前电阻-预拉伸电阻)/预拉伸电阻，预拉伸电阻<=0的通道为0；
+        启用基线跟踪时预拉伸电阻使用跟踪到的当前基线
+        """
+        pre_stretch_resistances = self.pre_stretch_resistances  # 只读取一次，校准可能在其他线程中被替换
+        if not pre_stretch_resistances:
+            return None, None
 
-        return current_resistances, real_time_stretch_ratios
+        resistances = self.voltages_to_resistances(voltages)
+        tracker = self.baseline_tracker
+        if tracker is not None and tracker.baseline is not None:
+            if update_baseline:
+                tracker.update(resistances)
+            baseline = tracker.baseline.copy()
+            inv_baseline = np.zeros_like(baseline)
+            np.divide(1.0, baseline, out=inv_baseline, where=baseline > 0)
+        else:
+            baseline, inv_baseline = self._baseline_arrays(pre_stretch_resistances)
+        stretch_ratios = (resistances - baseline) * inv_baseline
+        return resistances, stretch_ratios
 
     def get_initial_stretch_info(self):
         """获取初始拉伸信息"""
@@ -0,0 +1,179 @@
+"""
+带最近邻索引的手势姿态库
+
+每个条目是一个命名的手势：45维MANO PCA姿态，可选对应的24维手套数据（拉伸率）和保存时间。
+库保存为一个JSON文件，格式与 MANOControlWindow 原来的 saved_states 相同：
+
+    {"A": {"values": [45个PCA值], "glove": [24个拉伸率] 或 null, "timestamp": "2025-09-17 19:14:32"}, ...}
+
+查询使用两棵KD树（scipy.spatial.cKDTree）：
+- 45维PCA姿态树：给定姿态，找最接近的已保存手势
+- 24维手套数据树：由实时手套数据直接找最接近的手势，可用于把显示吸附到标准手势、手语程序中检索姿态
+条目增删后只标记索引失效，下一次查询时重建，几百个条目重建一次不到1毫秒；单次查询为微秒级。
+
+本模块只依赖 numpy 和 scipy，手语程序目录可以直接导入（不依赖 config_utils）。
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+NUM_PCA_COMPONENTS = 45
+GLOVE_CHANNELS = 24
+
+
+class PoseLibrary:
+    """命名手势库，支持按PCA姿态或手套数据做最近邻查询"""
+
+    def __init__(self, path=None):
+        """
+        :param path: JSON文件路径，文件存在时读取；None表示只在内存中使用
+        """
+        self.path = path
+        self.entries = {}  # 名称 -> {'values': list, 'glove': list或None, 'timestamp': str}
+        self._pose_index = None  # (names, poses, cKDTree)
+        self._glove_index = None
+        self._mtime = None  # 最近一次读取/写入时文件的修改时间
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def names(self):
+        """按保存顺序返回所有手势名称"""
+        return list(self.entries)
+
+    def add(self, name, hand_pose_pca, glove_data=None, timestamp=None):
+        """
+        添加或覆盖一个手势
+
+        :param hand_pose_pca: 45维PCA姿态
+        :param glove_data: 可选24维手套数据，提供后才能被手套数据查询到
+        :param timestamp: 保存时间字符串，默认为当前时间
+        """
+        values = np.asarray(hand_pose_pca, dtype=np.float64).ravel()
+        if values.shape != (NUM_PCA_COMPONENTS,):
+            raise ValueError(f"PCA姿态长度必须为{NUM_PCA_COMPONENTS}")
+        if glove_data is not None:
+            glove_data = np.asarray(glove_data, dtype=np.float64).ravel()
+            if glove_data.shape != (GLOVE_CHANNELS,):
+                raise ValueError(f"手套数据长度必须为{GLOVE_CHANNELS}")
+            glove_data = glove_data.tolist()
+        self.entries[name] = {
+            'values': values.tolist(),
+            'glove': glove_data,
+            'timestamp': timestamp or time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self._invalidate()
+
+    def remove(self, name):
+        """删除手势，不存在时抛出 KeyError"""
+        del self.entries[name]
+        self._invalidate()
+
+    def get(self, name):
+        """
+        :return: (45维PCA姿态, 24维手套数据或None)
+        """
+        entry = self.entries[name]
+        glove = None if entry.get('glove') is None else np.array(entry['glove'])
+        return np.array(entry['values']), glove
+
+    def timestamp(self, name):
+        """:return: 手势的保存时间字符串"""
+        return self.entries[name].get('timestamp', '')
+
+    def load(self, path=None):
+        """从JSON文件读取（替换当前内容）"""
+        path = path or self.path
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        self.entries = {}
+        for name, entry in entries.items():
+            self.add(name, entry['values'], entry.get('glove'), entry.get('timestamp'))
+        self._mtime = os.path.getmtime(path)
+
+    def reload_if_changed(self):
+        """
+        文件被其他进程修改后重新读取（例如界面进程保存了新手势，可视化进程随后调用）
+
+        :return: 是否重新读取了
+        """
+        if not self.path or not os.path.exists(self.path):
+            return False
+        mtime = os.path.getmtime(self.path)
+        if mtime == self._mtime:
+            return False
+        self.load()
+        return True
+
+    def save(self, path=None):
+        """写入JSON文件（先写临时文件再替换，中途退出不会损坏原文件）"""
+        path = path or self.path
+        if not path:
+            raise ValueError("没有指定姿态库文件路径")
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+        if path == self.path:
+            self._mtime = os.path.getmtime(path)
+
+    def _invalidate(self):
+        self._pose_index = None
+        self._glove_index = None
+
+    def _build_index(self, key):
+        names = [name for name, entry in self.entries.items() if entry.get(key) is not None]
+        if not names:
+            return names, None, None
+        points = np.array([self.entries[name][key] for name in names], dtype=np.float64)
+        return names, points, cKDTree(points)
+
+    def _query(self, index, point, k, max_distance):
+        names, points, tree = index
+        if tree is None:
+            return []
+        k = min(k, len(names))
+        distances, indices = tree.query(np.asarray(point, dtype=np.float64), k=k, distance_upper_bound=max_distance)
+        distances, indices = np.atleast_1d(distances), np.atleast_1d(indices)
+        return [(names[i], float(d)) for d, i in zip(distances, indices) if i < len(names)]
+
+    def nearest_pose(self, hand_pose_pca, k=1, max_distance=np.inf):
+        """
+        按45维PCA姿态查询最接近的手势
+
+        :return: [(名称, 欧氏距离), ...]，按距离从小到大，最多k个；超过 max_distance 的不返回
+        """
+        if self._pose_index is None:
+            self._pose_index = self._build_index('values')
+        return self._query(self._pose_index, hand_pose_pca, k, max_distance)
+
+    def nearest_glove(self, glove_data, k=1, max_distance=np.inf):
+        """
+        按24维手套数据查询最接近的手势（只包含保存了手套数据的条目）
+
+        :return: [(名称, 欧氏距离), ...]，按距离从小到大，最多k个；超过 max_distance 的不返回
+        """
+        if self._glove_index is None:
+            self._glove_index = self._build_index('glove')
+        return self._query(self._glove_index, glove_data, k, max_distance)
+
+    def snap(self, glove_data, max_distance):
+        """
+        实时吸附：手套数据与某个手势足够接近时返回该手势
+
+        :return: (名称, 45维PCA姿态)，没有在 max_distance 内的手势时返回None
+        """
+        match = self.nearest_glove(glove_data, k=1, max_distance=max_distance)
+        if not match:
+            return None
+        name = match[0][0]
+        return name, self.get(name)[0]
@@ -0,0 +1,237 @@
+"""
+可视化渲染节奏控制
+
+- LatestValueSlot : 单槽邮箱，新值覆盖旧值，渲染端每次只取最新的一帧，不会积压
+- FramePacer      : 按显示刷新率的固定节拍渲染，落后时直接对齐到当前时刻，不补帧
+- RenderStats     : 统计渲染帧率、因姿态未变化跳过的帧数，以及从手套帧到屏幕的延迟
+- GloveInterpolator : 按帧序号在收到的帧之间插值、短暂外推，把WiFi成批到达的帧还原成匀速运动
+
+延迟的起点是接收端拿到该帧的时间（共享内存总线或 VisualizerThread.update_data 记录的 time.time()），
+终点是该帧姿态被绘制之后。使用插值时起点是所显示姿态对应的时刻（见 GloveInterpolator.sample）。
+
+插值的时间轴：外骨骼按固定帧率采样，帧序号（共享内存总线的帧编号或 LatestValueSlot 的版本号）
+乘以帧间隔就是传感器时间。到达时间减传感器时间的滑动窗口最小值作为两个时钟的偏移，
+对应网络延迟最小的那些帧；成批到达的帧只是到得晚，不影响偏移。渲染时刻 now 对应的传感器时间为
+now - 偏移 - 播放延迟，落在已收到的两帧之间时线性插值，超过最新帧时按最近两帧的速度外推，
+外推超过 max_extrapolation 后保持最后一帧。播放延迟就是插值引入的延迟上限，
+成批到达的延迟超过它的部分表现为外推，RenderStats 报告外推的比例，用来调整播放延迟。
+"""
+
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+import config_utils
+
+
+class LatestValueSlot:
+    """单槽最新值邮箱：写入端从不阻塞，读取端只拿到最新的值"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = None
+        self._timestamp = None
+        self._version = 0
+        self._taken_version = 0  # 最近一次被读取的版本号
+        self.overwritten = 0  # 未被读取就被覆盖的值的个数
+
+    def put(self, value, timestamp=None):
+        """写入新值，时间戳默认为当前 time.time()"""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            if self._version and self._version != self._taken_version:
+                self.overwritten += 1
+            self._value = value
+            self._timestamp = timestamp
+            self._version += 1
+
+    def take(self, last_version=0):
+        """
+        非阻塞读取
+
+        :param last_version: 上次读到的版本号
+        :return: 有更新的值时返回 (版本号, 值, 时间戳)，否则返回None
+        """
+        with self._lock:
+            if self._version == last_version:
+                return None
+            self._taken_version = self._version
+            return self._version, self._value, self._timestamp
+
+
+class FramePacer:
+    """固定节拍等待"""
+
+    def __init__(self, rate=config_utils.VISUALIZER_REFRESH_RATE):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_tick = time.perf_counter()
+
+    def wait(self):
+        """睡眠到下一个节拍；已经落后时不睡眠，并从当前时刻重新计时"""
+        self.next_tick += self.interval
+        delay = self.next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            self.next_tick = time.perf_counter()
+
+
+class RenderStats:
+    """渲染统计，每隔 report_interval 秒生成一行报告"""
+
+    def __init__(self, name="可视化", report_interval=config_utils.VISUALIZER_REPORT_INTERVAL, window=600,
+                 interpolator=None):
+        """
+        :param interpolator: 可选 GloveInterpolator，报告中附带插值、外推和保持的次数
+        """
+        self.name = name
+        self.interpolator = interpolator
+        self._interp_at_report = (0, 0, 0)
+        self.report_interval = report_interval
+        self.latencies = deque(maxlen=window)  # 最近的延迟(秒)
+        self.rendered = 0
+        self.skipped = 0
+        self._last_report = time.perf_counter()
+        self._rendered_at_report = 0
+        self._skipped_at_report = 0
+
+    def add_render(self, frame_timestamp):
+        """记录一次绘制，frame_timestamp 为该帧的接收时间(time.time())"""
+        self.rendered += 1
+        self.latencies.append(time.time() - frame_timestamp)
+
+    def add_skip(self):
+        """记录一次姿态未变化而跳过的更新"""
+        self.skipped += 1
+
+    def latency_summary(self):
+        """返回最近窗口内延迟的 (平均, 95分位, 最大)，单位毫秒；没有数据时返回None"""
+        if not self.latencies:
+            return None
+        values = np.fromiter(self.latencies, dtype=np.float64, count=len(self.latencies)) * 1000.0
+        return values.mean(), np.percentile(values, 95), values.max()
+
+    def report(self):
+        """距离上次报告超过 report_interval 且期间有新数据时返回报告字符串，否则返回None"""
+        now = time.perf_counter()
+        elapsed = now - self._last_report
+        if elapsed < self.report_interval:
+            return None
+        idle = self.rendered == self._rendered_at_report and self.skipped == self._skipped_at_report
+        fps = (self.rendered - self._rendered_at_report) / elapsed
+        self._last_report = now
+        self._rendered_at_report = self.rendered
+        self._skipped_at_report = self.skipped
+        interpolation = self._interpolation_report()
+        if idle:
+            return None
+        summary = self.latency_summary()
+        if summary is None:
+            return f"{self.name}: 渲染 {fps:.1f} fps, 跳过 {self.skipped} 次{interpolation}"
+        mean, p95, worst = summary
+        return (f"{self.name}: 渲染 {fps:.1f} fps, 手套到屏幕延迟 平均 {mean:.1f} ms / "
+                f"P95 {p95:.1f} ms / 最大 {worst:.1f} ms, 跳过 {self.skipped} 次{interpolation}")
+
+    def _interpolation_report(self):
+        """上次报告以来插值、外推、保持的次数"""
+        if self.interpolator is None:
+            return ""
+        counts = self.interpolator.counts()
+        interpolated, extrapolated, held = (now - last for now, last in zip(counts, self._interp_at_report))
+        self._interp_at_report = counts
+        total = interpolated + extrapolated + held
+        ratio = extrapolated / total * 100.0 if total else 0.0
+        return f", 插值 {interpolated} / 外推 {extrapolated} ({ratio:.1f}%) / 保持 {held}"
+
+
+class GloveInterpolator:
+    """渲染端的手套数据插值器（单线程使用，在渲染循环中调用 add 和 sample）"""
+
+    def __init__(self, sample_rate=config_utils.FILTER_SAMPLE_RATE, delay=config_utils.VISUALIZER_INTERP_DELAY,
+                 max_extrapolation=config_utils.VISUALIZER_MAX_EXTRAPOLATION, clock_window=0.5, history=32):
+        """
+        :param sample_rate: 外骨骼帧率(Hz)，帧序号乘以 1/sample_rate 得到传感器时间
+        :param delay: 播放延迟(秒)，即插值引入的延迟上限
+        :param max_extrapolation: 最多外推的时间(秒)
+        :param clock_window: 估计时钟偏移的滑动窗口(秒)，需要比成批到达的间隔长；
+                             越短越能跟上两端时钟的漂移和丢帧
+        :param history: 保留的最近帧数
+        """
+        self.frame_interval = 1.0 / sample_rate
+        self.delay = delay
+        self.max_extrapolation = max_extrapolation
+        self.clock_window = clock_window
+        self._samples = deque(maxlen=history)  # (传感器时间, 24维拉伸率)
+        self._offsets = deque()  # 单调队列 (到达时间, 到达时间-传感器时间)，队首为窗口内最小偏移
+        self._hold_emitted = False  # 保持状态下已经输出过最后一帧
+        self.interpolated = 0
+        self.extrapolated = 0
+        self.held = 0
+
+    def reset(self):
+        """清空历史（帧序号重新开始时自动调用）"""
+        self._samples.clear()
+        self._offsets.clear()
+        self._hold_emitted = False
+
+    def counts(self):
+        """:return: (插值次数, 外推次数, 保持次数)"""
+        return self.interpolated, self.extrapolated, self.held
+
+    def add(self, frame_id, glove_data, arrival_time):
+        """
+        加入一帧收到的数据（中间被跳过的帧不需要加入）
+
+        :param frame_id: 单调递增的帧序号，相邻帧相差1
+        :param glove_data: 24维拉伸率
+        :param arrival_time: 到达时间(time.time())
+        """
+        sensor_time = frame_id * self.frame_interval
+        if self._samples and sensor_time <= self._samples[-1][0]:
+            self.reset()  # 帧序号回退：发布端重启或重新连接
+        self._samples.append((sensor_time, np.array(glove_data, dtype=np.float64)))
+        offset = arrival_time - sensor_time
+        offsets = self._offsets
+        while offsets and offsets[-1][1] >= offset:
+            offsets.pop()
+        offsets.append((arrival_time, offset))
+        while offsets[0][0] < arrival_time - self.clock_window:
+            offsets.popleft()
+        self._hold_emitted = False
+
+    def sample(self, now):
+        """
+        计算渲染时刻的手套数据
+
+        :param now: 当前时间(time.time())
+        :return: (24维拉伸率, 该姿态对应的到达时刻)；还没有数据，或保持状态下已经输出过最后一帧时返回None
+        """
+        samples = self._samples
+        if not samples:
+            return None
+        offset = self._offsets[0][1]
+        target = now - offset - self.delay  # 渲染时刻对应的传感器时间
+        newest_time, newest = samples[-1]
+        if target >= newest_time:
+            ahead = target - newest_time
+            if len(samples) < 2 or ahead > self.max_extrapolation:
+                if self._hold_emitted:
+                    return None
+                self._hold_emitted = True
+                self.held += 1
+                return newest, newest_time + offset
+            previous_time, previous = samples[-2]
+            self.extrapolated += 1
+            return newest + (newest - previous) * (ahead / (newest_time - previous_time)), target + offset
+        # 从新到旧找到 target 所在的区间；比最早的帧还早时使用最早的帧
+        self.interpolated += 1
+        later_time, later = newest_time, newest
+        for index in range(len(samples) - 2, -1, -1):
+            earlier_time, earlier = samples[index]
+            if earlier_time <= target:
+                alpha = (target - earlier_time) / (later_time - earlier_time)
+                return earlier + (later - earlier) * alpha, target + offset
+            later_time, later = earlier_time, earlier
+        return later, later_time + offset
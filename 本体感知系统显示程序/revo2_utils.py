@@ -6,6 +6,8 @@ Revo2灵巧手工具函数模块
 - 设备端口的扫描和选择
 - 数据类型转换和处理功能
 - 设备信息获取和验证
+
+环境变量 HAND_BACKEND=mock 时 libstark 为本地模拟（mock_stark），不需要连接灵巧手。
 """
 
 import json
@@ -16,9 +18,15 @@ from logger import getLogger
 # logger = getLogger(logging.DEBUG)
 logger = getLogger(logging.INFO)
 
-from bc_stark_sdk import main_mod
+import config_utils
+
+if config_utils.HAND_BACKEND == "mock":
+    # 没有灵巧手时使用本地模拟（HAND_BACKEND=mock）
+    import mock_stark as libstark
+else:
+    from bc_stark_sdk import main_mod
 
-libstark = main_mod
+    libstark = main_mod
 libstark.init_config(libstark.StarkProtocolType.Modbus)
 
 
@@ -0,0 +1,273 @@
+"""
+录制数据的无界面并行渲染
+
+把录制的24维手套数据渲染成手部姿态图片序列，用于生成数据集和在没有显示器的机器上回看录制。
+渲染不依赖OpenGL和窗口：SoftwareRasterizer 是纯NumPy的软件光栅化器（正交投影、深度缓冲、
+逐顶点光照插值），相机方向与 mono_open3d_vis 的默认视角一致（从 -z 方向看向手掌，-y 朝上）。
+
+整段数据按帧切块，交给进程池并行处理；每个工作进程只在启动时加载一次MANO模型和光栅化器，
+之后每块先用 ManoModel.forward_batch 批量计算顶点，再逐帧光栅化并用 QImage 保存PNG。
+所有帧使用同一个取景范围（由零姿态网格的包围盒确定），图片之间可以直接比较。
+
+用法示例：
+    python session_render.py session.csv -o session_frames/
+    python session_render.py session.npy -o frames/ --workers 8 --size 256 --stride 2
+    python session_render.py session.csv -o frames/ --mode skeleton
+"""
+
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from PyQt5.QtGui import QImage
+
+import config_utils
+import glove_mapping
+import mano_batch_eval
+import mano_numpy
+import mesh_normals
+import urdf_skeleton
+
+RENDER_MODES = ('mano', 'skeleton')
+
+
+class SoftwareRasterizer:
+    """固定拓扑三角网格的NumPy软件光栅化器"""
+
+    def __init__(self, faces, width=512, height=512, center=(0.0, 0.0), half_extent=0.12,
+                 color=(178, 178, 178), background=(255, 255, 255), ambient=0.35):
+        """
+        :param faces: (F, 3) 三角形顶点索引
+        :param center: 图像中心对应的世界坐标 (x, y)
+        :param half_extent: 图像短边一半对应的世界长度(米)
+        :param color: 网格颜色 RGB
+        :param background: 背景颜色 RGB
+        :param ambient: 环境光比例，其余为朝向相机的漫反射
+        """
+        self.faces = np.asarray(faces, dtype=np.int64)
+        self.width, self.height = width, height
+        self.center = np.asarray(center, dtype=np.float64)
+        self.scale = min(width, height) / 2.0 / half_extent  # 像素/米
+        self.color = np.asarray(color, dtype=np.float64)
+        self.background = np.asarray(background, dtype=np.uint8)
+        self.ambient = ambient
+        self._zbuffer = np.empty(width * height)
+
+    def render(self, vertices, normals):
+        """
+        :param vertices: (V, 3) 顶点坐标
+        :param normals: (V, 3) 单位顶点法向量
+        :return: (H, W, 3) uint8 RGB图像
+        """
+        width, height = self.width, self.height
+        image = np.empty((height * width, 3), dtype=np.uint8)
+        image[:] = self.background
+
+        # 正交投影：x向右，y向下（世界 -y 朝上），z越小越靠近相机
+        x = (vertices[:, 0] - self.center[0]) * self.scale + width / 2.0
+        y = (vertices[:, 1] - self.center[1]) * self.scale + height / 2.0
+        z = vertices[:, 2]
+        # 光源在相机处，双面光照
+        shade = self.ambient + (1.0 - self.ambient) * np.abs(normals[:, 2])
+
+        faces = self.faces
+        x0, x1, x2 = x[faces[:, 0]], x[faces[:, 1]], x[faces[:, 2]]
+        y0, y1, y2 = y[faces[:, 0]], y[faces[:, 1]], y[faces[:, 2]]
+        area = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+        # 背面剔除：外法向朝向相机的面片在屏幕上为负面积
+        front = area < -1e-12
+        xmin = np.maximum(np.floor(np.minimum(np.minimum(x0, x1), x2)), 0).astype(np.int64)
+        xmax = np.minimum(np.ceil(np.maximum(np.maximum(x0, x1), x2)), width - 1).astype(np.int64)
+        ymin = np.maximum(np.floor(np.minimum(np.minimum(y0, y1), y2)), 0).astype(np.int64)
+        ymax = np.minimum(np.ceil(np.maximum(np.maximum(y0, y1), y2)), height - 1).astype(np.int64)
+        front &= (xmax >= xmin) & (ymax >= ymin)
+        tri = np.flatnonzero(front)
+        if len(tri) == 0:
+            return image.reshape(height, width, 3)
+
+        # 重心坐标是像素坐标的仿射函数 w_i = A_i * sx + B_i * sy + C_i，系数按面片预先计算
+        inv_area = 1.0 / area[tri]
+        xa, xb, xc = x0[tri], x1[tri], x2[tri]
+        ya, yb, yc = y0[tri], y1[tri], y2[tri]
+        a0, b0, c0 = (yb - yc) * inv_area, (xc - xb) * inv_area, (xb * yc - xc * yb) * inv_area
+        a1, b1, c1 = (yc - ya) * inv_area, (xa - xc) * inv_area, (xc * ya - xa * yc) * inv_area
+        slopes = np.stack([a0, a1, -a0 - a1], axis=1)
+
+        # 扫描线：每个面片的每一行像素中心 sy 上，三个 w_i >= 0 把 sx 限制在一个区间内
+        rows = ymax[tri] - ymin[tri] + 1
+        row_tri = np.repeat(np.arange(len(tri)), rows)
+        sy = (ymin[tri][row_tri] + np.arange(rows.sum()) - np.repeat(np.cumsum(rows) - rows, rows)) + 0.5
+        k0 = b0[row_tri] * sy + c0[row_tri]
+        k1 = b1[row_tri] * sy + c1[row_tri]
+        offsets = np.stack([k0, k1, 1.0 - k0 - k1], axis=1)  # 每行 w_i = A_i * sx + offset_i
+        row_slopes = slopes[row_tri]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bound = -offsets / row_slopes
+        lower = np.where(row_slopes > 0, bound, -np.inf).max(axis=1)
+        upper = np.where(row_slopes < 0, bound, np.inf).min(axis=1)
+        upper[((row_slopes == 0) & (offsets < 0)).any(axis=1)] = -np.inf  # 平行于扫描线且在外侧
+        first_px = np.maximum(np.ceil(lower - 0.5), xmin[tri][row_tri])
+        last_px = np.minimum(np.floor(upper - 0.5), xmax[tri][row_tri])
+        counts = np.maximum(last_px - first_px + 1, 0).astype(np.int64)
+
+        # 展开为片元
+        row = np.repeat(np.arange(len(row_tri)), counts)
+        px = first_px.astype(np.int64)[row] + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        sx = px + 0.5
+        owner = row_tri[row]
+        w0 = a0[owner] * sx + k0[row]
+        w1 = a1[owner] * sx + k1[row]
+        w2 = 1.0 - w0 - w1
+        corners = faces[tri[owner]]
+        pixel = (sy[row] - 0.5).astype(np.int64) * width + px
+        depth = w0 * z[corners[:, 0]] + w1 * z[corners[:, 1]] + w2 * z[corners[:, 2]]
+
+        # 深度测试：每个像素取最近的片元
+        zbuffer = self._zbuffer
+        zbuffer.fill(np.inf)
+        np.minimum.at(zbuffer, pixel, depth)
+        visible = depth == zbuffer[pixel]
+        corners = corners[visible]
+        intensity = (w0[visible] * shade[corners[:, 0]] + w1[visible] * shade[corners[:, 1]]
+                     + w2[visible] * shade[corners[:, 2]])
+        image[pixel[visible]] = np.clip(intensity[:, np.newaxis] * self.color, 0, 255).astype(np.uint8)
+        return image.reshape(height, width, 3)
+
+
+def save_png(image, path):
+    """(H, W, 3) uint8 RGB图像保存为PNG（QImage不需要QApplication和显示器）"""
+    image = np.ascontiguousarray(image)
+    height, width = image.shape[:2]
+    qimage = QImage(image.data, width, height, width * 3, QImage.Format_RGB888)
+    if not qimage.save(path):
+        raise IOError(f"保存图片失败: {path}")
+
+
+class HandPoser:
+    """PCA姿态 -> 渲染用的顶点和法向量（MANO蒙皮网格或URDF连杆骨架）"""
+
+    def __init__(self, model_path=config_utils.MANO_RIGHT_MODEL, mode='mano'):
+        if mode not in RENDER_MODES:
+            raise ValueError(f"未知的渲染模式: {mode}，可选 {RENDER_MODES}")
+        self.mode = mode
+        self.model = mano_numpy.ManoModel(model_path)
+        if mode == 'mano':
+            self.faces = self.model.faces
+            self._normals = mesh_normals.VertexNormals(self.faces, self.model.num_vertices)
+        else:
+            self.urdf_hand = urdf_skeleton.UrdfHand()
+            self.projection = urdf_skeleton.ManoJointProjection(self.urdf_hand, self.model)
+            self.faces = self.urdf_hand.faces
+
+    def pose_batch(self, hand_pose_pca):
+        """
+        :param hand_pose_pca: (B, 45)
+        :return: 逐帧产生 (vertices, normals)，数组在下一帧会被覆盖
+        """
+        if self.mode == 'mano':
+            vertices, _ = self.model.forward_batch(hand_pose_pca)
+            for frame_vertices in vertices:
+                yield frame_vertices, self._normals.compute(frame_vertices)
+        else:
+            for pose in hand_pose_pca:
+                vertices, normals = self.urdf_hand.forward(self.projection.map(pose))
+                vertices += self.model.J_rest[0]  # URDF根连杆的原点在MANO腕关节
+                yield vertices, normals
+
+    def framing(self, margin=1.15):
+        """零姿态网格包围盒的中心(x, y)和半边长，作为所有帧共用的取景范围"""
+        vertices, _ = next(self.pose_batch(np.zeros((1, mano_numpy.NUM_PCA_COMPONENTS))))
+        low, high = vertices.min(axis=0), vertices.max(axis=0)
+        return (low[:2] + high[:2]) / 2.0, (high[:2] - low[:2]).max() / 2.0 * margin
+
+
+# 工作进程内的渲染状态，由 _init_worker 在进程启动时创建一次
+_worker = {}
+
+
+def _init_worker(model_path, mode, width, height, center, half_extent):
+    poser = HandPoser(model_path, mode)
+    _worker['poser'] = poser
+    _worker['mapping'] = glove_mapping.GloveToManoMapping()
+    _worker['rasterizer'] = SoftwareRasterizer(poser.faces, width, height, center, half_extent)
+
+
+def _render_chunk(frame_indices, glove_chunk, output_dir):
+    """渲染一块帧并保存，返回完成的帧数"""
+    poser, rasterizer = _worker['poser'], _worker['rasterizer']
+    poses = _worker['mapping'].map(glove_chunk)
+    for index, (vertices, normals) in zip(frame_indices, poser.pose_batch(poses)):
+        save_png(rasterizer.render(vertices, normals), os.path.join(output_dir, f'frame_{index:06d}.png'))
+    return len(frame_indices)
+
+
+def render_session(glove_data, output_dir, model_path=config_utils.MANO_RIGHT_MODEL, mode='mano', width=512,
+                   height=512, workers=None, chunk_size=64, stride=1, progress=None):
+    """
+    并行渲染整段录制数据
+
+    :param glove_data: (N, 24) 拉伸率（可以是内存映射数组）
+    :param workers: 进程数，None为CPU核数
+    :param stride: 每隔几帧渲染一帧
+    :param progress: 可选回调 progress(已完成帧数, 总帧数)
+    :return: 渲染的原始帧序号
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    frame_indices = np.arange(0, len(glove_data), stride)
+    center, half_extent = HandPoser(model_path, mode).framing()
+    total = len(frame_indices)
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_path, mode, width, height, center, half_extent)) as pool:
+        futures = [pool.submit(_render_chunk, chunk, np.asarray(glove_data[chunk]), output_dir)
+                   for chunk in np.array_split(frame_indices, max(1, -(-total // chunk_size)))]
+        for future in as_completed(futures):
+            done += future.result()
+            if progress:
+                progress(done, total)
+    return frame_indices
+
+
+def main():
+    parser = argparse.ArgumentParser(description='把录制的手套数据并行渲染为手部姿态图片序列（不需要显示器）')
+    parser.add_argument('session', help='录制数据文件 (.csv/.npy/.npz)')
+    parser.add_argument('-o', '--output', required=True, help='输出目录，图片命名为 frame_000000.png')
+    parser.add_argument('--model', default=config_utils.MANO_RIGHT_MODEL, help='MANO模型文件 (默认: mano/MANO_RIGHT.npz)')
+    parser.add_argument('--mode', choices=RENDER_MODES, default='mano', help='mano: 完整蒙皮网格, skeleton: URDF连杆骨架')
+    parser.add_argument('--size', type=int, default=512, help='图片边长(像素) (默认: 512)')
+    parser.add_argument('--workers', type=int, default=None, help='进程数 (默认: CPU核数)')
+    parser.add_argument('--chunk', type=int, default=64, help='每个任务的帧数 (默认: 64)')
+    parser.add_argument('--stride', type=int, default=1, help='每隔几帧渲染一帧 (默认: 1)')
+    parser.add_argument('--key', help='.npz 输入中的数组名')
+    args = parser.parse_args()
+
+    glove_data, times = mano_batch_eval.load_session(args.session, key=args.key)
+    print(f"读取 {len(glove_data)} 帧: {args.session}")
+
+    def report(done, total):
+        print(f"\r{done}/{total} 帧", end='', flush=True)
+
+    start = time.perf_counter()
+    frame_indices = render_session(glove_data, args.output, model_path=args.model, mode=args.mode, width=args.size,
+                                   height=args.size, workers=args.workers, chunk_size=args.chunk,
+                                   stride=args.stride, progress=report)
+    elapsed = time.perf_counter() - start
+    print(f"\n渲染完成: {len(frame_indices)} 帧, {elapsed:.2f} s ({len(frame_indices) / max(elapsed, 1e-9):.1f} 帧/s)")
+
+    # 图片与原始帧序号、时间的对应关系
+    with open(os.path.join(args.output, 'frames.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['file', 'frame'] + (['time'] if times is not None else []))
+        for index in frame_indices:
+            row = [f'frame_{index:06d}.png', int(index)]
+            if times is not None:
+                row.append(float(times[index]))
+            writer.writerow(row)
+    print(f"已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
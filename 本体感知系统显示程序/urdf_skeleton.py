@@ -0,0 +1,262 @@
+"""
+MANO URDF骨架的NumPy正运动学
+
+mano/mano.urdf 是由MANO手型生成的20个转动关节的骨架，每个刚性连杆一个STL网格。
+UrdfHand 在初始化时解析URDF、读取并合并所有连杆网格，每帧只做：
+- 20个关节绕各自转轴的旋转（批量Rodrigues）
+- 按深度层级的运动链（与 mano_numpy 相同，同一层的关节一起计算）
+- 每个顶点按所属连杆的刚体变换变换，法向量只需旋转，不用重新计算
+没有蒙皮权重和姿态混合，计算量远小于完整的MANO蒙皮，适合低功耗机器。
+
+ManoJointProjection 把45维PCA姿态换算为20个URDF关节角：
+link_idxs.json 给出每个连杆对应的MANO顶点组，用蒙皮权重找到驱动该连杆的MANO关节，
+再把该MANO关节的轴角投影到URDF关节的转轴上。整条链是线性的，编译成一个仿射变换。
+URDF的palm坐标系与MANO坐标系方向一致，原点在MANO腕关节。
+"""
+
+import json
+import os
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+import config_utils
+import mano_numpy
+import mesh_normals
+
+
+def load_stl(path):
+    """
+    读取STL网格（二进制或ASCII），合并重复顶点
+
+    :return: (vertices (V, 3), faces (F, 3))
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    count = int(np.frombuffer(data, dtype='<u4', count=1, offset=80)[0]) if len(data) >= 84 else 0
+    if len(data) == 84 + 50 * count:
+        record = np.dtype([('normal', '<f4', 3), ('vertices', '<f4', (3, 3)), ('attribute', '<u2')])
+        corners = np.frombuffer(data, dtype=record, count=count, offset=84)['vertices'].reshape(-1, 3)
+    else:
+        lines = data.decode('ascii', errors='ignore').split('\n')
+        corners = np.array([line.split()[1:4] for line in lines if line.strip().startswith('vertex')],
+                           dtype=np.float64)
+    vertices, inverse = np.unique(corners.astype(np.float64), axis=0, return_inverse=True)
+    return vertices, inverse.reshape(-1, 3).astype(np.int32)
+
+
+def rpy_to_matrix(rpy):
+    """URDF的 roll-pitch-yaw (固定轴 X-Y-Z) -> 旋转矩阵 Rz @ Ry @ Rx"""
+    roll, pitch, yaw = rpy
+    cr, sr = np.cos(roll), np.sin(roll)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cy, sy = np.cos(yaw), np.sin(yaw)
+    return np.array([[cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr],
+                     [sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr],
+                     [-sp, cp * sr, cp * cr]])
+
+
+def _parse_origin(element):
+    """<origin xyz=... rpy=...> -> (R, t)，缺省为单位变换"""
+    origin = None if element is None else element.find('origin')
+    if origin is None:
+        return np.eye(3), np.zeros(3)
+    xyz = np.array(origin.get('xyz', '0 0 0').split(), dtype=np.float64)
+    rpy = np.array(origin.get('rpy', '0 0 0').split(), dtype=np.float64)
+    return rpy_to_matrix(rpy), xyz
+
+
+class UrdfHand:
+    """刚性连杆手部骨架，关节角 -> 连杆网格顶点"""
+
+    def __init__(self, urdf_path=config_utils.MANO_URDF):
+        """
+        :param urdf_path: URDF文件路径，网格文件名相对于URDF所在目录
+        """
+        root = ET.parse(urdf_path).getroot()
+        base_dir = os.path.dirname(os.path.abspath(urdf_path))
+
+        joints = [j for j in root.findall('joint') if j.get('type') in ('revolute', 'continuous')]
+        children = {j.find('child').get('link') for j in joints}
+        link_elements = {link.get('name'): link for link in root.findall('link')}
+        roots = [name for name in link_elements if name not in children]
+        if len(roots) != 1:
+            raise ValueError(f"URDF应只有一个根连杆，实际为 {roots}")
+
+        # 按深度排序关节：连杆0为根，连杆i+1为第i个关节的子连杆
+        depth = {roots[0]: 0}
+        ordered = []
+        pending = joints
+        while pending:
+            ready = [j for j in pending if j.find('parent').get('link') in depth]
+            if not ready:
+                raise ValueError("URDF中存在无法连接到根连杆的关节")
+            for j in ready:
+                depth[j.find('child').get('link')] = depth[j.find('parent').get('link')] + 1
+            ordered += ready
+            pending = [j for j in pending if j not in ready]
+        ordered.sort(key=lambda j: depth[j.find('child').get('link')])
+
+        self.link_names = [roots[0]] + [j.find('child').get('link') for j in ordered]
+        link_index = {name: i for i, name in enumerate(self.link_names)}
+        self.joint_names = [j.get('name') for j in ordered]
+        self.joint_children = self.link_names[1:]
+        self.num_joints = len(ordered)
+        self.parents = np.array([link_index[j.find('parent').get('link')] for j in ordered])
+
+        # 关节原点变换和转轴
+        self._origin_rot = np.empty((self.num_joints, 3, 3))
+        self._origin_trans = np.empty((self.num_joints, 3))
+        axes = np.empty((self.num_joints, 3))
+        self.lower = np.full(self.num_joints, -np.inf)
+        self.upper = np.full(self.num_joints, np.inf)
+        for i, j in enumerate(ordered):
+            self._origin_rot[i], self._origin_trans[i] = _parse_origin(j)
+            axis = j.find('axis')
+            axes[i] = np.array(axis.get('xyz').split(), dtype=np.float64) if axis is not None else [1.0, 0.0, 0.0]
+            limit = j.find('limit')
+            if limit is not None and j.get('type') == 'revolute':
+                self.lower[i] = float(limit.get('lower', '-inf'))
+                self.upper[i] = float(limit.get('upper', 'inf'))
+        axes /= np.linalg.norm(axes, axis=1, keepdims=True)
+        self.axes = axes
+        # 关节局部旋转 O @ R(q)，R(q) = I + sin(q) K + (1 - cos(q)) K^2，K为转轴的叉乘矩阵。
+        # 预先乘好 O、O@K、O@K^2，每帧只需两次数乘和加法
+        skew = np.zeros((self.num_joints, 3, 3))
+        skew[:, 0, 1], skew[:, 0, 2] = -axes[:, 2], axes[:, 1]
+        skew[:, 1, 0], skew[:, 1, 2] = axes[:, 2], -axes[:, 0]
+        skew[:, 2, 0], skew[:, 2, 1] = -axes[:, 1], axes[:, 0]
+        self._origin_skew = self._origin_rot @ skew
+        self._origin_skew_sq = self._origin_skew @ skew
+
+        # 按层级分组（同一层的关节父连杆都已计算）
+        joint_depth = np.array([depth[name] for name in self.joint_children])
+        self.levels = [np.flatnonzero(joint_depth == d) for d in range(1, joint_depth.max() + 1)]
+
+        # 合并所有连杆的可视网格，顶点变换到连杆坐标系
+        local_vertices, faces, vertex_link = [], [], []
+        offset = 0
+        for index, name in enumerate(self.link_names):
+            visual = link_elements[name].find('visual')
+            mesh = None if visual is None else visual.find('geometry/mesh')
+            if mesh is None:
+                continue
+            vertices, link_faces = load_stl(os.path.join(base_dir, mesh.get('filename')))
+            scale = np.array(mesh.get('scale', '1 1 1').split(), dtype=np.float64)
+            rot, trans = _parse_origin(visual)
+            local_vertices.append((vertices * scale) @ rot.T + trans)
+            faces.append(link_faces + offset)
+            vertex_link.append(np.full(len(vertices), index))
+            offset += len(vertices)
+        self.faces = np.concatenate(faces).astype(np.int32)
+        self.num_vertices = offset
+        self.vertex_link = np.concatenate(vertex_link)
+        self._local_vertices = np.ones((offset, 4))  # 齐次坐标
+        self._local_vertices[:, :3] = np.concatenate(local_vertices)
+        # 刚体运动不改变连杆坐标系下的法向量，只计算一次
+        self._local_normals = mesh_normals.VertexNormals(self.faces, offset).compute(self._local_vertices[:, :3])
+
+        # 每帧复用的缓冲区
+        self._sin = np.empty((self.num_joints, 1, 1))
+        self._one_minus_cos = np.empty((self.num_joints, 1, 1))
+        self._joint_rot = np.empty((self.num_joints, 3, 3))
+        self._tmp_rot = np.empty((self.num_joints, 3, 3))
+        self.transforms = np.zeros((len(self.link_names), 3, 4))  # 各连杆的世界变换 [R | t]
+        self.transforms[0, :, :3] = np.eye(3)
+        self._vertex_transforms = np.empty((offset, 3, 4))
+        self.vertices = np.empty((offset, 3))
+        self.normals = np.empty((offset, 3))
+
+    def link_transforms(self, joint_angles):
+        """
+        正运动学
+
+        :param joint_angles: 按 joint_names 顺序的关节角(弧度)
+        :return: (L, 3, 4) 各连杆的世界变换，根连杆为单位变换。返回内部缓冲区
+        """
+        angles = np.asarray(joint_angles, dtype=np.float64)
+        sin, one_minus_cos = self._sin, self._one_minus_cos
+        np.sin(angles, out=sin[:, 0, 0])
+        np.cos(angles, out=one_minus_cos[:, 0, 0])
+        np.subtract(1.0, one_minus_cos, out=one_minus_cos)
+        rot = np.multiply(sin, self._origin_skew, out=self._joint_rot)
+        rot += np.multiply(one_minus_cos, self._origin_skew_sq, out=self._tmp_rot)
+        rot += self._origin_rot
+
+        transforms = self.transforms
+        for level in self.levels:
+            parent = transforms[self.parents[level]]
+            parent_rot = parent[:, :, :3]
+            links = level + 1
+            transforms[links, :, :3] = parent_rot @ rot[level]
+            transforms[links, :, 3] = ((parent_rot @ self._origin_trans[level][..., np.newaxis])[..., 0]
+                                       + parent[:, :, 3])
+        return transforms
+
+    def forward(self, joint_angles, out=None, normals_out=None):
+        """
+        计算连杆网格的世界坐标顶点和法向量
+
+        :param out: 可选 (V, 3) 顶点输出数组（例如 Open3D 顶点缓冲区的NumPy视图）
+        :param normals_out: 可选 (V, 3) 法向量输出数组
+        :return: (vertices, normals)。未指定输出数组时返回内部缓冲区
+        """
+        transforms = self.link_transforms(joint_angles)
+        per_vertex = np.take(transforms, self.vertex_link, axis=0, out=self._vertex_transforms, mode='clip')
+        out = self.vertices if out is None else out
+        normals_out = self.normals if normals_out is None else normals_out
+        np.einsum('vij,vj->vi', per_vertex, self._local_vertices, out=out)
+        np.einsum('vij,vj->vi', per_vertex[:, :, :3], self._local_normals, out=normals_out)
+        return out, normals_out
+
+    def joint_positions(self, joint_angles=None):
+        """各连杆原点的世界坐标 (L, 3)，不传关节角时使用最近一次正运动学的结果"""
+        if joint_angles is not None:
+            self.link_transforms(joint_angles)
+        return self.transforms[:, :, 3]
+
+    def rest_joint_axes(self):
+        """零关节角时各关节转轴的世界方向 (J, 3)"""
+        transforms = self.link_transforms(np.zeros(self.num_joints))
+        return (transforms[1:, :, :3] @ self.axes[..., np.newaxis])[..., 0]
+
+
+class ManoJointProjection:
+    """45维MANO PCA姿态 -> URDF关节角的仿射映射"""
+
+    def __init__(self, hand, mano_model, link_idxs_path=config_utils.MANO_LINK_IDXS):
+        """
+        :param hand: UrdfHand
+        :param mano_model: mano_numpy.ManoModel（使用其PCA姿态基、平均姿态和蒙皮权重）
+        :param link_idxs_path: 各连杆对应的MANO顶点索引
+        """
+        with open(link_idxs_path, 'r') as f:
+            groups = json.load(f)
+
+        # 连杆顶点组中蒙皮权重之和最大的MANO关节即驱动该连杆的关节
+        axes = hand.rest_joint_axes()
+        projection = np.zeros((3 * (mano_numpy.NUM_JOINTS - 1), hand.num_joints))
+        self.mano_joints = []
+        for i, link in enumerate(hand.joint_children):
+            mano_joint = int(np.argmax(mano_model.weights[groups[link]].sum(axis=0)))
+            self.mano_joints.append(mano_joint)
+            if mano_joint == 0:
+                continue  # 腕关节由全局旋转控制，不属于手指姿态
+            # MANO各关节的轴角定义在父关节坐标系中，零姿态时与世界坐标系一致
+            projection[3 * (mano_joint - 1):3 * mano_joint, i] = axes[i]
+
+        # pca -> 轴角 -> 关节角 合并为 pca @ weights + bias
+        self.weights = mano_model.hands_components @ projection
+        self.bias = mano_model.hands_mean @ projection
+        self.lower, self.upper = hand.lower, hand.upper
+
+    def map(self, hand_pose_pca, out=None):
+        """
+        :param hand_pose_pca: 45维PCA姿态
+        :return: 按 UrdfHand.joint_names 顺序的关节角，限制在URDF关节范围内
+        """
+        out = np.matmul(hand_pose_pca, self.weights, out=out)
+        out += self.bias
+        return np.clip(out, self.lower, self.upper, out=out)
+
+    __call__ = map
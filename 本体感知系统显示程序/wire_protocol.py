@@ -0,0 +1,205 @@
+"""
+外骨骼无线数据帧协议（v1 / v2）
+
+v1（ESP32现有格式，每包一帧）：
+    0xAA | uint16 数据长度(小端) | 24个float32(或float64) | 0x55
+
+v2（可选，每包K帧）：
+    0xA5 0x5A | 版本=2 | 标志位 | uint32 首帧序号 | uint8 帧数K | uint8 通道数 | float32 量化步长
+    | K*通道数 个int16(标志位bit0=1) 或 float32(bit0=0) | uint16 CRC16
+    CRC16为CCITT-FALSE（多项式0x1021，初值0xFFFF），覆盖版本字节到负载末尾。
+    int16负载的真实值 = 量化值 * 量化步长，默认步长为 参考电压/32767（约0.1mV），
+    使ADC满量程恰好落在int16范围内，带宽约为v1的一半。
+    序号按帧递增，接收端据此统计丢帧。
+
+FrameParser 在同一个缓冲区中自动识别两种格式，TCP流和UDP数据报都可以使用。
+"""
+
+import binascii
+import struct
+
+import numpy as np
+
+import config_utils
+
+V1_HEADER = 0xAA
+V1_TAIL = 0x55
+V2_MAGIC = b'\xA5\x5A'
+V2_VERSION = 2
+V2_FLAG_INT16 = 0x1  # 负载为int16量化值
+
+V2_HEADER = struct.Struct('<2sBBIBBf')  # 魔数、版本、标志位、首帧序号、帧数、通道数、量化步长
+V2_CRC = struct.Struct('<H')
+V2_MAX_FRAMES = 64  # 单包最大帧数，超出视为误识别的帧头
+
+DEFAULT_QUANT_STEP = config_utils.REFERENCE_VOLTAGE / 32767  # 默认量化步长 ≈0.1007mV，满量程不被截断
+
+
+def crc16(data):
+    """CRC16-CCITT-FALSE，使用binascii的C实现"""
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def encode_v1(frame, dtype=np.float32):
+    """把一帧24通道数据编码为v1数据包"""
+    payload = np.asarray(frame, dtype=dtype).tobytes()
+    return bytes([V1_HEADER]) + struct.pack('<H', len(payload)) + payload + bytes([V1_TAIL])
+
+
+def encode_v2(frames, seq, quantize=True, quant_step=DEFAULT_QUANT_STEP):
+    """
+    把K帧数据编码为一个v2数据包
+
+    :param frames: (K, 24) 数组
+    :param seq: 第一帧的序号
+    :param quantize: True使用int16量化负载，False使用float32负载
+    :param quant_step: 量化步长
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    if frames.ndim == 1:
+        frames = frames[np.newaxis]
+    num_frames, channels = frames.shape
+    if quantize:
+        payload = np.clip(np.round(frames / quant_step), -32768, 32767).astype('<i2').tobytes()
+        flags = V2_FLAG_INT16
+    else:
+        payload = frames.astype('<f4').tobytes()
+        flags = 0
+        quant_step = 1.0
+    body = V2_HEADER.pack(V2_MAGIC, V2_VERSION, flags, seq & 0xFFFFFFFF, num_frames, channels, quant_step) + payload
+    return body + V2_CRC.pack(crc16(body[2:]))
+
+
+class FrameParser:
+    """
+    v1/v2自动识别的帧解析器
+
+    feed() 追加收到的字节并返回其中全部完整帧，形状为 (N, 24)，通道顺序与发送端一致。
+    """
+
+    def __init__(self, channels=config_utils.TOTAL_CELLS):
+        self.channels = channels
+        self.buffer = bytearray()
+        self.empty = np.empty((0, channels))
+        # 统计信息
+        self.frames_v1 = 0
+        self.frames_v2 = 0
+        self.bytes_received = 0
+        self.crc_errors = 0
+        self.format_errors = 0
+        self.lost_frames = 0  # 根据v2序号推算的丢帧数
+        self.next_seq = None
+
+    def reset_stats(self):
+        """清零统计信息"""
+        self.frames_v1 = self.frames_v2 = self.bytes_received = 0
+        self.crc_errors = self.format_errors = self.lost_frames = 0
+        self.next_seq = None
+
+    def feed(self, data):
+        """追加字节流并解析出全部完整帧"""
+        self.bytes_received += len(data)
+        self.buffer.extend(data)
+        frames = []
+        while True:
+            result = self._extract_packet()
+            if result is None:
+                break
+            if len(result):
+                frames.append(result)
+        if not frames:
+            return self.empty
+        if len(frames) == 1:
+            return frames[0]
+        return np.concatenate(frames)
+
+    def feed_datagram(self, data):
+        """解析一个UDP数据报，残留的不完整数据直接丢弃"""
+        frames = self.feed(data)
+        self.buffer.clear()
+        return frames
+
+    def _find_header(self):
+        """返回最早出现的帧头位置和版本，找不到时返回(-1, None)"""
+        pos_v1 = self.buffer.find(V1_HEADER)
+        pos_v2 = self.buffer.find(V2_MAGIC)
+        if pos_v2 != -1 and (pos_v1 == -1 or pos_v2 < pos_v1):
+            return pos_v2, 2
+        return pos_v1, (1 if pos_v1 != -1 else None)
+
+    def _extract_packet(self):
+        """
+        从缓冲区提取一个数据包
+
+        :return: 数据不足时返回None；帧错误时返回空数组（已丢弃错误字节，可继续解析）；否则返回 (K, 24)
+        """
+        start, version = self._find_header()
+        if start == -1:
+            # 保留最后一个字节，它可能是被拆开的v2魔数的第一个字节
+            del self.buffer[:max(0, len(self.buffer) - 1)]
+            return None
+        if start:
+            del self.buffer[:start]
+        if version == 2:
+            return self._extract_v2()
+        return self._extract_v1()
+
+    def _extract_v1(self):
+        buffer = self.buffer
+        if len(buffer) < 3:
+            return None
+        data_len = buffer[1] | (buffer[2] << 8)
+        itemsize = data_len // self.channels if data_len % self.channels == 0 else 0
+        if itemsize not in (4, 8):  # 长度不合法，0xAA只是负载中的普通字节
+            self.format_errors += 1
+            del buffer[:1]
+            return self.empty
+        total_len = 3 + data_len + 1
+        if len(buffer) < total_len:
+            return None
+        if buffer[total_len - 1] != V1_TAIL:
+            self.format_errors += 1
+            del buffer[:1]
+            return self.empty
+        dtype = '<f4' if itemsize == 4 else '<f8'
+        frame = np.frombuffer(bytes(buffer[3:3 + data_len]), dtype=dtype).astype(np.float64)
+        del buffer[:total_len]
+        self.frames_v1 += 1
+        return frame.reshape(1, self.channels)
+
+    def _extract_v2(self):
+        buffer = self.buffer
+        if len(buffer) < V2_HEADER.size:
+            return None
+        _, version, flags, seq, num_frames, channels, quant_step = V2_HEADER.unpack_from(buffer)
+        if version != V2_VERSION or channels != self.channels or not 0 < num_frames <= V2_MAX_FRAMES:
+            self.format_errors += 1
+            del buffer[:1]
+            return self.empty
+        itemsize = 2 if flags & V2_FLAG_INT16 else 4
+        payload_len = num_frames * channels * itemsize
+        total_len = V2_HEADER.size + payload_len + V2_CRC.size
+        if len(buffer) < total_len:
+            return None
+        packet = bytes(buffer[:total_len])
+        (crc,) = V2_CRC.unpack_from(packet, total_len - V2_CRC.size)
+        if crc != crc16(packet[2:total_len - V2_CRC.size]):
+            self.crc_errors += 1
+            del buffer[:1]
+            return self.empty
+        del buffer[:total_len]
+
+        if flags & V2_FLAG_INT16:
+            frames = np.frombuffer(packet, dtype='<i2', count=num_frames * channels,
+                                   offset=V2_HEADER.size) * float(quant_step)
+        else:
+            frames = np.frombuffer(packet, dtype='<f4', count=num_frames * channels,
+                                   offset=V2_HEADER.size).astype(np.float64)
+
+        if self.next_seq is not None:
+            gap = (seq - self.next_seq) & 0xFFFFFFFF
+            if gap < 0x80000000:  # 序号回退视为发送端重启，不计入丢帧
+                self.lost_frames += gap
+        self.next_seq = (seq + num_frames) & 0xFFFFFFFF
+        self.frames_v2 += num_frames
+        return frames.reshape(num_frames, channels)
@@ -1,8 +1,14 @@
 import os
+import sys
 import numpy as np
 import open3d as o3d
-from smplx import MANO
-import torch
+
+# MANO模型与纯NumPy蒙皮由主程序目录的 mano_numpy 提供，模型文件共用仓库根目录 mano/ 下的 .npz
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(_BASE_DIR, os.pardir, '本体感知系统显示程序'))
+import mano_numpy
+
+MANO_DIR = os.path.join(_BASE_DIR, os.pardir, 'mano')
 
 
 class MANOHandVisualizer:
@@ -11,7 +17,8 @@ class MANOHandVisualizer:
     用于将24维手套数据映射到MANO手部模型并进行3D可视化
     """
 
-    def __init__(self, model_path_right='MANO_RIGHT.pkl', model_path_left='MANO_LEFT.pkl', is_rhand=True):
+    def __init__(self, model_path_right=os.path.join(MANO_DIR, 'MANO_RIGHT.npz'),
+                 model_path_left=os.path.join(MANO_DIR, 'MANO_LEFT.npz'), is_rhand=True):
         """
         初始化MANO手部可视化器
 
@@ -26,9 +33,8 @@ class MANOHandVisualizer:
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Model file {model_path} does not exist.")
 
-        # 加载 MANO 模型
-        # num_pca_comps=45 表示使用45个PCA分量来表示手部姿态
-        self.mano_model = MANO(model_path=model_path, is_rhand=is_rhand, num_pca_comps=45)
+        # 加载 MANO 模型：纯NumPy蒙皮，使用全部45个PCA分量来表示手部姿态
+        self.mano_model = mano_numpy.ManoModel(model_path)
         self.is_rhand = is_rhand  # 保存手部类型信息
 
         # 初始化 Open3D 网格对象：用于存储和显示3D手部网格
@@ -64,16 +70,9 @@ class MANOHandVisualizer:
         重置手部到默认姿态（完全展开状态）
         使用零值参数调用MANO模型生成默认手部形状
         """
-        # 调用MANO模型生成默认手部
-        output = self.mano_model(
-            betas=torch.zeros([1, 10]),  # 形状参数设为零（标准手型）
-            hand_pose=torch.zeros([1, 45]),  # 手部姿态参数设为零（完全展开）
-            global_orient=torch.zeros([1, 3])  # 全局朝向设为零
-        )
-
-        # 提取顶点坐标和面片信息
-        vertices = output.vertices.detach().cpu().numpy()[0]  # 转换为numpy数组
-        faces = self.mano_model.faces.astype(np.int32)  # 获取面片索引
+        # 调用MANO模型生成默认手部：姿态参数设为零（完全展开）
+        vertices = self.mano_model.forward(np.zeros(mano_numpy.NUM_PCA_COMPONENTS))
+        faces = self.mano_model.faces  # 获取面片索引
 
         # 更新网格的顶点和面片信息
         self.mesh.vertices = o3d.utility.Vector3dVector(vertices)
@@ -131,17 +130,8 @@ class MANOHandVisualizer:
             for idx in pca_indices:
                 hand_pose_pca[idx] = angle
 
-        # 转换为torch tensor：为MANO模型准备输入数据
-        hand_pose_tensor = torch.tensor(hand_pose_pca).view(1, -1).float()
-
-        # 调用MANO模型计算新的手部顶点坐标
-        output = self.mano_model(
-            betas=torch.zeros([1, 10]),  # 保持标准手型
-            hand_pose=hand_pose_tensor,  # 使用计算得到的姿态参数
-            global_orient=torch.zeros([1, 3])  # 保持默认朝向
-        )
-        # 提取新的顶点坐标
-        new_vertices = output.vertices.detach().cpu().numpy()[0]
+        # 计算新的手部顶点坐标
+        new_vertices = self.mano_model.forward(hand_pose_pca)
 
         # 更新网格顶点：用新计算的顶点替换原有顶点
         self.mesh.vertices = o3d.utility.Vector3dVector(new_vertices)